@@ -1,21 +1,33 @@
 from __future__ import annotations
-from five_in_row.model import Direction, Coord
+import numpy
+from five_in_row import instrumentation
+from five_in_row.model import Direction, Coord, Player, EMPTY
+from five_in_row.patterns import BLOCKED, OPEN, OWN, RADIUS, POWERS, score_table
 from five_in_row import types as t
 
 if t.TYPE_CHECKING:
-    from five_in_row.model import Player, Board
+    from five_in_row.model import Board
+    from five_in_row.cache import LRUCache
 
 
 class Sequence:
+    """Sequence of moves of a single player.
+
+    Sequence is stored as its first field, direction and length. List of its fields is created only when
+    `fields` are accessed.
+    """
+    __slots__ = ('player', 'direction', 'start', 'length', 'start_open_points', 'end_open_points', '_fields')
+
     required_length = 5
 
-    """Sequence of moves of a single player."""
-    def __init__(self, player: Player, direction: Direction, fields: t.List[Coord]) -> None:
+    def __init__(self, player: Player, direction: Direction, start: Coord, length: int = 1) -> None:
         self.player = player
         self.direction = direction
-        self.fields = fields
+        self.start = start
+        self.length = length
         self.start_open_points = 0
         self.end_open_points = 0
+        self._fields: t.Optional[t.List[Coord]] = None
 
     @property
     def surrounding_open_points(self) -> int:
@@ -33,23 +45,25 @@ class Sequence:
     def closed(self) -> bool:
         return len(self) >= self.required_length
 
-    @property
-    def start(self) -> Coord:
-        """First point of sequence."""
-        return self.fields[0]
-
     @property
     def end(self) -> Coord:
         """Last point of sequence."""
-        return self.fields[-1]
+        return self.start.adjacent(self.direction, self.length - 1)
+
+    @property
+    def fields(self) -> t.List[Coord]:
+        """All points of sequence from start to end."""
+        if self._fields is None:
+            self._fields = [self.start.adjacent(self.direction, step) for step in range(self.length)]
+        return self._fields
 
     def __len__(self) -> int:
         """Number of fields in sequence."""
-        return len(self.fields)
+        return self.length
 
     def __add__(self, sequence: Sequence) -> Sequence:
-        """Sum two sequences together."""
-        return Sequence(self.player, self.direction, self.fields + sequence.fields)
+        """Sum two sequences together. The other sequence has to follow this one."""
+        return Sequence(self.player, self.direction, self.start, self.length + sequence.length)
 
     def __str__(self) -> str:
         """String representation of Sequence."""
@@ -66,19 +80,63 @@ class Sequence:
     def __eq__(self, other: object) -> bool:
         """Return True if given other object is equal sequence."""
         return isinstance(other, Sequence) \
-            and self.fields == other.fields \
+            and self.start == other.start \
+            and self.length == other.length \
             and self.direction is other.direction \
             and self.player is other.player
 
 
 class Analysis:
-    """Analysis of board state."""
+    """Analysis of board state.
+
+    Results can be memoized in given cache. They are keyed by Zobrist hash of the board,
+    so the cache can be shared between analyses and reused when a position repeats.
+    """
 
-    def __init__(self, board: Board) -> None:
+    def __init__(self, board: Board, cache: t.Optional[LRUCache] = None) -> None:
         self.board = board
+        self.cache = cache
+
+    def cached(self, key: t.Tuple[t.Any, ...], compute: t.Callable[[], t.Any]) -> t.Any:
+        """Get result identified by key in current position from cache or compute and cache it."""
+        if self.cache is None:
+            return compute()
+        board, registry = self.board, instrumentation.active
+        key = (board.zobrist_hash, board.min_x, board.max_x, board.min_y, board.max_y) + key
+        try:
+            result = self.cache[key]
+        except KeyError:
+            if registry is not None:
+                registry.count('analysis.cache_misses')
+            result = self.cache[key] = compute()
+            return result
+        if registry is not None:
+            registry.count('analysis.cache_hits')
+        return result
+
+    def find_sequences(self, player: Player, vectorized: bool = False) -> t.List[Sequence]:
+        """Find all sequences belonging to a player.
+
+        With `vectorized` set, all sequences are found at once using whole-array numpy operations on int8 board.
+        Both modes return the same sequences.
+        """
+        return list(self.cached(('sequences', player), lambda: self._find_sequences(player, vectorized)))
+
+    def _find_sequences(self, player: Player, vectorized: bool) -> t.List[Sequence]:
+        """Find all sequences belonging to a player without using cache."""
+        registry = instrumentation.active
+        if registry is None:
+            return self._search_sequences(player, vectorized)
+        with registry.timer('analysis.find_sequences'):
+            sequences = self._search_sequences(player, vectorized)
+        registry.count('analysis.sequences', len(sequences))
+        return sequences
+
+    def _search_sequences(self, player: Player, vectorized: bool) -> t.List[Sequence]:
+        """Find all sequences belonging to a player in chosen mode."""
+        if vectorized:
+            return self._find_sequences_vectorized(player)
 
-    def find_sequences(self, player: Player) -> t.List[Sequence]:
-        """Find all sequences belonging to a player."""
         sequences = []
         for direction in Direction.positive_directions():
             sequences.extend(self._find_directional_sequences(player, direction))
@@ -87,49 +145,72 @@ class Analysis:
             self._detect_open_ends(sequence)
         return sequences
 
-    def find_empty_adjacent_fields(self) -> t.Set[Coord]:
-        """Get all empty coords that are attached to a non-empty coord."""
-        fields = set()
-        for field in self.board.open_fields():
-            for direction in Direction:
-                adjacent_field = field.adjacent(direction)
-                if adjacent_field in self.board and not self.board.is_open(adjacent_field):
-                    fields.add(field)
-        return fields
+    def find_empty_adjacent_fields(self, radius: int = 1) -> t.Set[Coord]:
+        """Get all empty coords within radius from a non-empty coord.
 
-    def get_average_center_distance(self, player: Player) -> float:
-        """Calculate average distance of all players coords from center."""
-        center = Coord(
-            int((self.board.max_x + self.board.min_x) / 2),
-            int((self.board.max_y + self.board.min_y) / 2)
+        Fields are read from the frontier index of the board, which is kept up to date as moves are played.
+        """
+        return set(self.board.frontier(radius))
+
+    def score_cell(self, coord: Coord, player: Player) -> int:
+        """Score of player's stone on given field, sum of scores of shapes it forms in the four lines crossing it.
+
+        Shapes are looked up in precomputed table of all lines of `patterns.LENGTH` fields.
+        """
+        table = score_table()
+        return sum(
+            int(table[self._line_code(coord, player, direction)]) for direction in Direction.positive_directions()
         )
 
-        distances = []
-        for coord, player in self.board.occupied_fields(player):
-            distances.append(coord.distance(center))
-        return (sum(distances) / len(distances)) if distances else 0.0
+    def _line_code(self, coord: Coord, player: Player, direction: Direction) -> int:
+        """Code of line of fields crossing given field in given direction."""
+        board, x, y, dx, dy = self.board, coord.x, coord.y, direction.x, direction.y
+        code = 0
+        for step, power in zip(range(-RADIUS, RADIUS + 1), POWERS):
+            field_x, field_y = x + step * dx, y + step * dy
+            value = board.get_xy(field_x, field_y) if board.contains_xy(field_x, field_y) else player.opponent
+            code += power * (OPEN if value is None else OWN if value is player else BLOCKED)
+        return code
+
+    def score_board(self, player: Player) -> numpy.ndarray:
+        """Scores of player's stone on every field (see `score_cell`) indexed like `board.to_array()`."""
+        fields = self.board.to_array()
+        states = numpy.where(fields == player.code, OWN, numpy.where(fields == EMPTY, OPEN, BLOCKED))
+        table = score_table()
+        scores = numpy.zeros(fields.shape, dtype=numpy.int64)
+        for direction in Direction.positive_directions():
+            scores += table[line_codes(states, direction)]
+        return scores
+
+    def get_average_center_distance(self, player: Player) -> float:
+        """Calculate average distance of all players coords from center."""
+        xs, ys = self.board.occupied_xy(player)
+        if not len(xs):
+            return 0.0
+        center_x = (self.board.max_x + self.board.min_x) // 2
+        center_y = (self.board.max_y + self.board.min_y) // 2
+        return float(numpy.hypot(xs - center_x, ys - center_y).mean())
 
     def _find_directional_sequences(self, player: Player, direction: Direction) -> t.List[Sequence]:
         """Find all sequences belonging to a player in given direction."""
         sequences = []
-        solved_coords = set()
-
         for coord, _ in self.board.occupied_fields(player):
-            if coord not in solved_coords:
-                sequence = self._find_directional_sequence(coord, player, direction)
-                solved_coords.update(sequence.fields)
-                sequences.append(sequence)
+            if self._starts_sequence(coord, player, direction):
+                sequences.append(self._find_directional_sequence(coord, player, direction))
         return sequences
 
+    def _starts_sequence(self, coord: Coord, player: Player, direction: Direction) -> bool:
+        """Returns True if sequence in given direction starts at given Coord."""
+        x, y = coord.x - direction.x, coord.y - direction.y
+        return not self.board.contains_xy(x, y) or self.board.get_xy(x, y) is not player
+
     def _find_directional_sequence(self, start: Coord, player: Player, direction: Direction) -> Sequence:
         """Find sequence belonging to a player in given direction starting at given Coord."""
-        sequence = Sequence(player, direction, [start])
-        adjacent = start.adjacent(direction)
-
-        if adjacent in self.board and self.board[adjacent] == player:
-            sequence += self._find_directional_sequence(adjacent, player, direction)
-
-        return sequence
+        board, dx, dy = self.board, direction.x, direction.y
+        x, y, length = start.x + dx, start.y + dy, 1
+        while board.contains_xy(x, y) and board.get_xy(x, y) is player:
+            x, y, length = x + dx, y + dy, length + 1
+        return Sequence(player, direction, start, length)
 
     def _detect_open_ends(self, sequence: Sequence) -> None:
         """Count number of open squares at the ends of sequence and assign them."""
@@ -146,13 +227,218 @@ class Analysis:
 
     def _count_open_end(self, missing: int, start: Coord, direction: Direction) -> int:
         """Count open squares at given end of sequence."""
-        player = self.board[start]
+        board, x, y = self.board, start.x, start.y
+        player = board.get_xy(x, y)
         if not player:  # IMPOSSSIBLE
             return 0
         free_spaces = 0
         while free_spaces < missing:
-            start = start.adjacent(direction)
-            if start not in self.board or self.board[start] == player.opponent:
+            x, y = x + direction.x, y + direction.y
+            if not board.contains_xy(x, y) or board.get_xy(x, y) is player.opponent:
                 break
             free_spaces += 1
+        if instrumentation.active is not None:
+            instrumentation.active.count('analysis.open_end_steps', min(free_spaces + 1, max(missing, 0)))
         return free_spaces
+
+    def _find_sequences_vectorized(self, player: Player) -> t.List[Sequence]:
+        """Find all sequences belonging to a player using numpy operations."""
+        fields = self.board.to_array()
+        own = fields == player.code
+        free = fields != player.opponent.code
+
+        sequences = []
+        for direction in Direction.positive_directions():
+            sequences.extend(self._find_vectorized_directional_sequences(player, direction, own, free))
+        return sequences
+
+    def _find_vectorized_directional_sequences(
+        self,
+        player: Player,
+        direction: Direction,
+        own: numpy.ndarray,
+        free: numpy.ndarray
+    ) -> t.List[Sequence]:
+        """Find all sequences belonging to a player in given direction using numpy operations."""
+        (ys, xs), lengths, start_open, end_open = directional_runs(own, free, direction)
+
+        sequences = []
+        coord = self.board.coord
+        for x, y, length, start_open_points, end_open_points in zip(
+            xs.tolist(), ys.tolist(), lengths.tolist(), start_open.tolist(), end_open.tolist()
+        ):
+            sequence = Sequence(player, direction, coord(x, y), length)
+            sequence.start_open_points = start_open_points
+            sequence.end_open_points = end_open_points
+            sequences.append(sequence)
+        return sequences
+
+
+class IncrementalAnalysis(Analysis):
+    """Analysis of board state that follows changes of the board instead of rescanning it.
+
+    Sequences of the initial position are found by the vectorized search. A change of a field only rebuilds
+    sequences in the four lines crossing it whose ends are close enough for their open ends to reach the changed
+    field.
+    """
+
+    def __init__(self, board: Board, cache: t.Optional[LRUCache] = None) -> None:
+        super().__init__(board, cache)
+        self._sequences: t.Dict[Player, t.Dict[t.Tuple[Direction, Coord], Sequence]] = {p: {} for p in Player}
+        self._runs: t.Dict[t.Tuple[Direction, Coord], Sequence] = {}
+        self._history: t.List[t.Tuple[Coord, t.Optional[Player]]] = []
+        for player in Player:
+            for sequence in super()._find_sequences(player, True):
+                self._register(sequence)
+        board.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """Stop following changes of the board."""
+        self.board.unsubscribe(self._on_change)
+
+    def find_sequences(self, player: Player, vectorized: bool = False) -> t.List[Sequence]:
+        """Get all sequences belonging to a player in the same order as Analysis does.
+
+        Sequences are already up to date, so neither `vectorized` nor cache is used.
+        """
+        order = {direction: index for index, direction in enumerate(Direction.positive_directions())}
+        return sorted(
+            self._sequences[player].values(),
+            key=lambda sequence: (order[sequence.direction], sequence.start.y, sequence.start.x)
+        )
+
+    def play(self, coord: Coord, player: Player) -> None:
+        """Place player's move on the board."""
+        self._history.append((coord, self.board[coord]))
+        self.board[coord] = player
+
+    def undo(self) -> None:
+        """Take back the last move placed by `play`. Changes made directly on the board are not taken back."""
+        coord, previous = self._history.pop()
+        self.board[coord] = previous
+
+    def _on_change(self, coord: Coord, previous: t.Optional[Player], value: t.Optional[Player]) -> None:
+        """Update sequences crossing changed field."""
+        for direction in Direction.positive_directions():
+            self._update_line(coord, direction)
+
+    def _update_line(self, coord: Coord, direction: Direction) -> None:
+        """Rebuild sequences in given direction affected by change of given field."""
+        window = self._window(coord, direction)
+        for field in window:
+            sequence = self._runs.get((direction, field))
+            if sequence is not None:
+                self._unregister(sequence)
+
+        for field in window:
+            player = self.board[field]
+            if player is not None and (direction, field) not in self._runs:
+                self._register(self._find_run(field, player, direction))
+
+    def _window(self, coord: Coord, direction: Direction) -> t.List[Coord]:
+        """Fields in line whose sequences can be affected by change of given field."""
+        fields = [coord]
+        for step_direction in (direction, direction.reversed):
+            field = coord
+            for _ in range(Sequence.required_length - 1):
+                field = field.adjacent(step_direction)
+                if field not in self.board:
+                    break
+                fields.append(field)
+        return fields
+
+    def _find_run(self, coord: Coord, player: Player, direction: Direction) -> Sequence:
+        """Find whole sequence in given direction crossing given field."""
+        start = coord
+        while not self._starts_sequence(start, player, direction):
+            start = start.adjacent(direction.reversed)
+        sequence = self._find_directional_sequence(start, player, direction)
+        self._detect_open_ends(sequence)
+        return sequence
+
+    def _register(self, sequence: Sequence) -> None:
+        """Start tracking sequence."""
+        self._sequences[sequence.player][(sequence.direction, sequence.start)] = sequence
+        for field in sequence.fields:
+            self._runs[(sequence.direction, field)] = sequence
+
+    def _unregister(self, sequence: Sequence) -> None:
+        """Stop tracking sequence."""
+        del self._sequences[sequence.player][(sequence.direction, sequence.start)]
+        for field in sequence.fields:
+            del self._runs[(sequence.direction, field)]
+
+
+def _shift_slices(delta: int, size: int) -> t.Tuple[slice, slice]:
+    """Target and source slices shifting an axis of given size by delta."""
+    if delta >= 0:
+        return slice(0, size - delta), slice(delta, size)
+    return slice(-delta, size), slice(0, size + delta)
+
+
+def shift(array: numpy.ndarray, direction: Direction, steps: int = 1) -> numpy.ndarray:
+    """Shift array so that every field holds value of the field `steps` away in given direction.
+
+    Fields shifted from outside of the board are zero. Only the last two axes (y, x) are shifted,
+    so the array can hold a stack of boards.
+    """
+    result = numpy.zeros_like(array)
+    height, width = array.shape[-2:]
+    if steps * abs(direction.x) >= width or steps * abs(direction.y) >= height:
+        return result
+    target_y, source_y = _shift_slices(steps * direction.y, height)
+    target_x, source_x = _shift_slices(steps * direction.x, width)
+    result[..., target_y, target_x] = array[..., source_y, source_x]
+    return result
+
+
+def run_lengths(mask: numpy.ndarray, direction: Direction, limit: t.Optional[int] = None) -> numpy.ndarray:
+    """Count consecutive True fields starting at every field and going in given direction.
+
+    Counting stops at `limit` if given.
+    """
+    lengths = mask.astype(numpy.int32)
+    run = mask
+    steps = 1
+    while run.any() and (limit is None or steps < limit):
+        run = run & shift(mask, direction, steps)
+        lengths += run
+        steps += 1
+    return lengths
+
+
+def line_codes(states: numpy.ndarray, direction: Direction) -> numpy.ndarray:
+    """Codes of lines crossing every field in given direction given array of field states.
+
+    Fields out of the board are blocked. Like `shift`, works on the last two axes.
+    """
+    codes = numpy.zeros(states.shape, dtype=numpy.int64)
+    for step, power in zip(range(-RADIUS, RADIUS + 1), POWERS):
+        if step < 0:
+            codes += power * shift(states, direction.reversed, -step)
+        else:
+            codes += power * shift(states, direction, step)
+    return codes
+
+
+def directional_runs(
+    own: numpy.ndarray,
+    free: numpy.ndarray,
+    direction: Direction
+) -> t.Tuple[t.Tuple[numpy.ndarray, ...], numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Runs of own fields in given direction: indices of their starts, lengths and open points on both ends.
+
+    Open points are counted like by `Sequence`, up to the number of points missing to a closed sequence.
+    Like `shift`, works on the last two axes; start indices are given for all axes of the arrays.
+    """
+    starts = own & ~shift(own, direction.reversed)
+    index = numpy.nonzero(starts)
+    lengths = run_lengths(own, direction)[index]
+    missing = numpy.clip(Sequence.required_length - lengths, 0, None)
+
+    max_open = Sequence.required_length - 1
+    open_after = shift(run_lengths(free, direction, max_open), direction)
+    open_before = shift(run_lengths(free, direction.reversed, max_open), direction.reversed)
+    *leading, ys, xs = index
+    end = (*leading, ys + (lengths - 1) * direction.y, xs + (lengths - 1) * direction.x)
+    return index, lengths, numpy.minimum(missing, open_before[index]), numpy.minimum(missing, open_after[end])
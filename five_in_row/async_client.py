@@ -0,0 +1,96 @@
+"""Asynchronous piskvorky.jobs.cz client for playing many games concurrently.
+
+Requires aiohttp (`pip install five-in-row[async]`).
+"""
+from __future__ import annotations
+import asyncio
+import aiohttp
+from five_in_row.client import Client, PayloadEncoder, JSON_HEADERS
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.model import Coord
+
+    T = t.TypeVar('T')
+
+
+class AsyncClient:
+    """Asynchronous piskvorky.jobs.cz client.
+
+    All requests share a pool of at most `connections` keep-alive connections. Every request fails with
+    `asyncio.TimeoutError` when it takes more than `timeout` seconds.
+    """
+
+    base_url = Client.base_url
+
+    def __init__(
+        self,
+        token: str,
+        connections: int = 100,
+        timeout: float = 10.0,
+        base_url: t.Optional[str] = None
+    ) -> None:
+        self.token = token
+        self.payloads = PayloadEncoder(token)
+        self.connections = connections
+        self.timeout = timeout
+        if base_url is not None:
+            self.base_url = base_url
+        self._session: t.Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> AsyncClient:
+        """Use client as a context manager closing connections on exit."""
+        return self
+
+    async def __aexit__(self, *args: t.Any) -> None:
+        """Close connections."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def connect_game(self) -> str:
+        """Connect to new game."""
+        response = await self._post('connect', self.payloads.connect)
+        return str(response['gameToken'])
+
+    async def play_turn(self, game_token: str, coordinate: Coord) -> t.Any:
+        """Play turn in a game."""
+        return await self._post('play', self.payloads.play(game_token, coordinate))
+
+    async def _post(self, path: str, body: bytes) -> t.Any:
+        """Send json request body and return decoded response."""
+        async with self._get_session().post(f'{self.base_url}/{path}', data=body, headers=JSON_HEADERS) as response:
+            return await response.json(content_type=None)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get session, create it within running event loop on first use."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+
+async def run_games(
+    client: AsyncClient,
+    game: t.Callable[[AsyncClient], t.Awaitable[T]],
+    games: int,
+    concurrency: int = 100
+) -> t.List[t.Union[T, BaseException]]:
+    """Play given number of games on one event loop, at most `concurrency` of them at a time.
+
+    `game` is a coroutine function playing a single game with the client. Results of games are returned
+    in the order the games were started; a game that failed is represented by its exception.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def play() -> T:
+        async with semaphore:
+            return await game(client)
+
+    return await asyncio.gather(*(play() for _ in range(games)), return_exceptions=True)
@@ -0,0 +1,169 @@
+"""Analysis of many positions at once.
+
+Positions are stacked into a single (N, H, W) int8 array of player codes, and sequences, scores and shapes of all
+of them are computed by the same array operations, instead of analysing the positions one by one.
+"""
+from __future__ import annotations
+import numpy
+from five_in_row.analysis import Sequence, directional_runs, line_codes
+from five_in_row.engine import WIN_SCORE
+from five_in_row.model import Direction, EMPTY
+from five_in_row.patterns import BLOCKED, OPEN, OWN, Shape, shape_table
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.model import Board, Coord, Player
+
+
+DIRECTIONS = Direction.positive_directions()
+"""Directions of sequences, indexed by the `direction` field of `SEQUENCE`."""
+
+SEQUENCE = numpy.dtype([
+    ('position', '<i4'), ('direction', 'u1'), ('x', '<i4'), ('y', '<i4'),
+    ('length', '<i4'), ('start_open_points', '<i4'), ('end_open_points', '<i4')
+])
+"""Sequence found in a stack of positions, `x` and `y` of its start are indices into `to_array()` of the board."""
+
+
+def stack_boards(boards: t.List[Board]) -> numpy.ndarray:
+    """Stack fields of boards with the same bounds into an (N, H, W) array."""
+    bounds = {(board.min_x, board.max_x, board.min_y, board.max_y) for board in boards}
+    if len(bounds) > 1:
+        raise ValueError('Only boards with the same bounds can be stacked.')
+    return numpy.stack([board.to_array() for board in boards])
+
+
+def stack_moves(board: Board, player: Player, moves: t.List[Coord]) -> numpy.ndarray:
+    """Stack fields of positions after each of player's moves on the board into an (N, H, W) array.
+
+    Like `Board.push`, raises IndexError if a move is out of the board and ValueError if its field is occupied.
+    """
+    fields = board.to_array()
+    xs, ys = _move_indices(board, fields, moves)
+    stack = numpy.repeat(fields[numpy.newaxis], len(moves), axis=0)
+    stack[numpy.arange(len(moves)), ys, xs] = player.code
+    return stack
+
+
+def _move_indices(board: Board, fields: numpy.ndarray, moves: t.List[Coord]) -> t.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Indices of moves into `fields` of the board. Moves are checked to be within the fields and empty."""
+    origin = board.coord(0, 0)
+    xs = numpy.array([move.x - origin.x for move in moves], dtype=numpy.intp)
+    ys = numpy.array([move.y - origin.y for move in moves], dtype=numpy.intp)
+    height, width = fields.shape
+    outside = (xs < 0) | (xs >= width) | (ys < 0) | (ys >= height)
+    if outside.any():
+        move = moves[int(numpy.argmax(outside))]
+        raise IndexError(f'Coordinate <{move.x}:{move.y}> is out of board bounds.')
+    occupied = fields[ys, xs] != EMPTY
+    if occupied.any():
+        raise ValueError(f'Field {moves[int(numpy.argmax(occupied))]} is already occupied.')
+    return xs, ys
+
+
+class BatchAnalysis:
+    """Analysis of a stack of positions played on boards with the same bounds as `board`.
+
+    Results are arrays indexed by position in the stack and are the same as of `Analysis` and `engine.evaluate`
+    of every position on its own.
+    """
+    def __init__(self, board: Board, fields: numpy.ndarray) -> None:
+        self.board = board
+        self.fields = fields
+        self._sequences: t.Dict[Player, numpy.ndarray] = {}
+
+    @classmethod
+    def from_boards(cls, boards: t.List[Board]) -> BatchAnalysis:
+        """Analysis of positions on given boards."""
+        return cls(boards[0], stack_boards(boards))
+
+    @classmethod
+    def from_moves(cls, board: Board, player: Player, moves: t.List[Coord]) -> BatchAnalysis:
+        """Analysis of positions after each of player's moves on the board. The board is not changed."""
+        return cls(board, stack_moves(board, player, moves))
+
+    def __len__(self) -> int:
+        """Number of positions."""
+        return len(self.fields)
+
+    def find_sequences(self, player: Player) -> numpy.ndarray:
+        """Sequences of a player in all positions as an array of `SEQUENCE`s.
+
+        Sequences are ordered by position, then like by `Analysis.find_sequences`.
+        """
+        if player not in self._sequences:
+            self._sequences[player] = self._find_sequences(player)
+        return self._sequences[player]
+
+    def _find_sequences(self, player: Player) -> numpy.ndarray:
+        """Find sequences of a player in all positions without using cache."""
+        own = self.fields == player.code
+        free = self.fields != player.opponent.code
+        parts = []
+        for index, direction in enumerate(DIRECTIONS):
+            (positions, ys, xs), lengths, start_open, end_open = directional_runs(own, free, direction)
+            part = numpy.empty(len(positions), dtype=SEQUENCE)
+            part['position'], part['direction'], part['x'], part['y'] = positions, index, xs, ys
+            part['length'], part['start_open_points'], part['end_open_points'] = lengths, start_open, end_open
+            parts.append(part)
+        sequences = numpy.concatenate(parts)
+        return sequences[numpy.argsort(sequences['position'], kind='stable')]
+
+    def sequences(self, player: Player, position: int) -> t.List[Sequence]:
+        """Sequences of a player in a single position as `Sequence` objects."""
+        found = self.find_sequences(player)
+        start, end = numpy.searchsorted(found['position'], [position, position + 1])
+        sequences = []
+        for _, direction, x, y, length, start_open_points, end_open_points in found[start:end].tolist():
+            sequence = Sequence(player, DIRECTIONS[direction], self.board.coord(x, y), length)
+            sequence.start_open_points = start_open_points
+            sequence.end_open_points = end_open_points
+            sequences.append(sequence)
+        return sequences
+
+    def score_sequences(self, player: Player) -> numpy.ndarray:
+        """Score sequences of a player in every position like `engine.score_sequences`."""
+        found = self.find_sequences(player)
+        lengths = found['length'].astype(numpy.int64)
+        missing = Sequence.required_length - lengths
+        closable = found['start_open_points'] + found['end_open_points'] >= missing
+        values = 10 ** numpy.clip(lengths, 0, Sequence.required_length)
+        values[(found['start_open_points'] > 0) & (found['end_open_points'] > 0)] *= 2
+        scores = numpy.bincount(found['position'][closable], values[closable], minlength=len(self))
+        scores = scores.astype(numpy.int64)
+        closed = numpy.bincount(found['position'][lengths >= Sequence.required_length], minlength=len(self))
+        scores[closed > 0] = WIN_SCORE
+        return scores
+
+    def evaluate(self, player: Player) -> numpy.ndarray:
+        """Score every position from the point of view of given player like `engine.evaluate`."""
+        own = self.score_sequences(player)
+        opponent = self.score_sequences(player.opponent)
+        return numpy.where(
+            opponent >= WIN_SCORE, -WIN_SCORE, numpy.where(own >= WIN_SCORE, WIN_SCORE, own - opponent)
+        )
+
+    def shape_counts(self, player: Player) -> numpy.ndarray:
+        """Number of player's stones forming each shape in every position, counted once per line of every stone.
+
+        Returns an (N, len(Shape)) array indexed by position and `Shape.value`, e.g. stones of an open four
+        add four to the count of `Shape.open_four`.
+        """
+        own = self.fields == player.code
+        states = numpy.where(own, OWN, numpy.where(self.fields == EMPTY, OPEN, BLOCKED))
+        offsets = numpy.arange(len(self))[:, numpy.newaxis, numpy.newaxis] * len(Shape)
+        counts = numpy.zeros(len(self) * len(Shape), dtype=numpy.int64)
+        table = shape_table()
+        for direction in DIRECTIONS:
+            shapes = table[line_codes(states, direction)] + offsets
+            counts += numpy.bincount(shapes[own], minlength=len(counts))
+        return counts.reshape(len(self), len(Shape))
+
+
+def evaluate_moves(board: Board, player: Player, moves: t.List[Coord]) -> t.List[int]:
+    """Score positions after each of player's moves from the player's point of view.
+
+    Results are the same as of `parallel.evaluate_moves`.
+    """
+    scores: t.List[int] = BatchAnalysis.from_moves(board, player, moves).evaluate(player).tolist()
+    return scores
@@ -0,0 +1,171 @@
+"""Opening book of moves played in logged games, stored in a memory-mapped file."""
+from __future__ import annotations
+import numpy
+import os
+from itertools import islice
+from five_in_row.model import Board, BitBoard, Coord, Player, SparseBoard, Symmetries
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.records import GameRecord
+
+
+BOOK_MAGIC = b'5IRBOOK\0'
+"""First bytes of an opening book file."""
+
+HEADER = numpy.dtype([('magic', 'S8'), ('entries', '<u4'), ('max_turns', '<u4')])
+"""Header of an opening book, followed by sorted position hashes and then by entries in the same order."""
+
+ENTRY = numpy.dtype([
+    ('width', '<u2'), ('height', '<u2'), ('player', 'u1'), ('reserved', 'V1'),
+    ('x', '<u2'), ('y', '<u2'), ('games', '<u4'), ('wins', '<u4')
+])
+"""Best move of a player in a position, in normalized coordinates of the canonical form of the board."""
+
+
+class BookMove:
+    """Move stored in an opening book with number of logged games it was played in and won."""
+    def __init__(self, move: Coord, games: int, wins: int) -> None:
+        self.move = move
+        self.games = games
+        self.wins = wins
+
+    def __repr__(self) -> str:
+        """String representation of BookMove."""
+        return f'<{self.move} won {self.wins}/{self.games}>'
+
+
+def winner(game: GameRecord) -> t.Optional[Player]:
+    """Player who completed five with the last move of the game, None if the game didn't end with five."""
+    if not len(game):
+        return None
+    _, player = list(game)[-1]
+    board = BitBoard(game.x_bounds, game.y_bounds)
+    game.replay(board)
+    return player if board.has_line(player) else None
+
+
+class BookBuilder:
+    """Collects moves played in first `max_turns` turns of logged games.
+
+    Positions are identified by their canonical form, so moves played in rotated or reflected positions
+    are counted together.
+    """
+    def __init__(self, max_turns: int = 10) -> None:
+        self.max_turns = max_turns
+        self.games = 0
+        self._moves: t.Dict[t.Tuple[int, int, int, int], t.Dict[t.Tuple[int, int], t.List[int]]] = {}
+
+    def add_game(self, game: GameRecord, result: t.Optional[Player] = None) -> None:
+        """Count opening moves of a game won by given player, by default the one who completed five."""
+        if result is None:
+            result = winner(game)
+        board = Board(game.x_bounds, game.y_bounds)
+        symmetries = board.symmetries()
+        for move, player in islice(game, self.max_turns):
+            canonical_hash, _ = symmetries.canonical()
+            moves = self._moves.setdefault((canonical_hash, board.width, board.height, player.code), {})
+            stats = moves.setdefault(_canonical_move(board, symmetries, move), [0, 0])
+            stats[0] += 1
+            stats[1] += player is result
+            board[move] = player
+        self.games += 1
+
+    def add_games(self, games: t.Iterable[GameRecord]) -> None:
+        """Count opening moves of games, e.g. of a `records.RecordReader`."""
+        for game in games:
+            self.add_game(game)
+
+    def write(self, path: t.Union[str, os.PathLike], min_games: int = 1) -> None:
+        """Write best move of every position played in at least `min_games` games into a book file.
+
+        The best move is the one with the highest ratio of wins, with one win and one loss added to every move
+        so that moves played only a few times don't win by chance.
+        """
+        rows = sorted(
+            (key, _best_move(moves)) for key, moves in self._moves.items()
+            if sum(games for games, _ in moves.values()) >= min_games
+        )
+        header = numpy.array([(BOOK_MAGIC, len(rows), self.max_turns)], dtype=HEADER)
+        hashes = numpy.array([key[0] for key, _ in rows], dtype='<u8')
+        entries = numpy.array([(*key[1:], b'', *move, *stats) for key, (move, stats) in rows], dtype=ENTRY)
+        with open(path, 'wb') as file:
+            file.write(header.tobytes())
+            file.write(hashes.tobytes())
+            file.write(entries.tobytes())
+
+
+def _canonical_move(board: Board, symmetries: Symmetries, move: Coord) -> t.Tuple[int, int]:
+    """Normalized coordinates of a move in the canonical form of the board.
+
+    Positions with symmetries of their own map onto the canonical form by several symmetries; the first of
+    the mapped moves in row order is used, so that equivalent moves are counted together.
+    """
+    canonical_hash, _ = symmetries.canonical()
+    return min(
+        (canonical.y, canonical.x) for canonical in (
+            board.to_canonical(move, symmetry)
+            for symmetry, symmetry_hash in zip(symmetries.symmetries, symmetries.hashes)
+            if symmetry_hash == canonical_hash
+        )
+    )[::-1]
+
+
+def _best_move(moves: t.Dict[t.Tuple[int, int], t.List[int]]) -> t.Tuple[t.Tuple[int, int], t.List[int]]:
+    """Move with the highest smoothed ratio of wins, more played one on a tie."""
+    return max(moves.items(), key=lambda item: ((item[1][1] + 1) / (item[1][0] + 2), item[1][0], item[0]))
+
+
+class OpeningBook:
+    """Lookup of best moves in a book file written by `BookBuilder`.
+
+    The file is memory-mapped and positions are found by binary search over sorted hashes, so opening the book
+    takes constant time and a lookup reads only a few pages of it.
+    """
+    def __init__(self, path: t.Union[str, os.PathLike]) -> None:
+        self.path = path
+        self._data = numpy.memmap(path, dtype=numpy.uint8, mode='r')
+        if self._data.size < HEADER.itemsize or bytes(self._data[:len(BOOK_MAGIC)]) != BOOK_MAGIC:
+            raise ValueError(f'{path} is not an opening book.')
+        header = self._data[:HEADER.itemsize].view(HEADER)[0]
+        entries, self.max_turns = int(header['entries']), int(header['max_turns'])
+        start = HEADER.itemsize + entries * 8
+        if self._data.size < start + entries * ENTRY.itemsize:
+            raise ValueError(f'{path} is truncated.')
+        self._hashes = self._data[HEADER.itemsize:start].view('<u8')
+        self._entries = self._data[start:start + entries * ENTRY.itemsize].view(ENTRY)
+
+    def __enter__(self) -> OpeningBook:
+        """Use book as a context manager."""
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        """Release the file."""
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory-mapped file."""
+        del self._data, self._hashes, self._entries
+
+    def __len__(self) -> int:
+        """Number of positions in the book."""
+        return len(self._hashes)
+
+    def lookup(self, board: Board, player: Player) -> t.Optional[BookMove]:
+        """Best move of a player in the position on the board, None if the position is not in the book.
+
+        Raises ValueError for a SparseBoard, which has no symmetries to find the canonical position by.
+        """
+        if isinstance(board, SparseBoard):
+            raise ValueError('SparseBoard has no fixed bounds to be rotated or reflected.')
+        if numpy.count_nonzero(board.to_array()) >= self.max_turns:
+            return None
+        symmetries = Symmetries(board)
+        symmetries.close()
+        canonical_hash, symmetry = symmetries.canonical()
+        key = numpy.uint64(canonical_hash)
+        start, end = self._hashes.searchsorted(key), self._hashes.searchsorted(key, side='right')
+        for width, height, code, _, x, y, games, wins in self._entries[start:end].tolist():
+            if (width, height, code) == (board.width, board.height, player.code):
+                return BookMove(board.from_canonical(Coord(x, y), symmetry), games, wins)
+        return None
@@ -0,0 +1,54 @@
+"""Bounded caches of analysis results."""
+from __future__ import annotations
+from collections import OrderedDict
+from five_in_row import types as t
+
+
+class LRUCache:
+    """Mapping of limited size that evicts least recently used items.
+
+    Lookups are counted in `hits` and `misses`, removals of items over the size limit in `evictions`.
+    """
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: OrderedDict[t.Any, t.Any] = OrderedDict()
+
+    def __getitem__(self, key: t.Any) -> t.Any:
+        """Get cached item and mark it as recently used."""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: t.Any, value: t.Any) -> None:
+        """Cache item and evict the least recently used one if the cache is full."""
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key: t.Any) -> bool:
+        """Returns True if item is cached. Doesn't count as a lookup."""
+        return key in self._items
+
+    def __len__(self) -> int:
+        """Number of cached items."""
+        return len(self._items)
+
+    def clear(self) -> None:
+        """Remove all cached items and reset counters."""
+        self._items.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> t.Dict[str, int]:
+        """Cache counters."""
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
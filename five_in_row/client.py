@@ -1,18 +1,43 @@
 from __future__ import annotations
 import requests
 import json
+import time
+from five_in_row import instrumentation
 from five_in_row.model import Coord
 from five_in_row import types as t
 
 
+class PayloadEncoder:
+    """Encoder of json request bodies with user token encoded only once."""
+    def __init__(self, token: str) -> None:
+        self.prefix = ('{"userToken": ' + json.dumps(token)).encode('utf-8')
+        self.connect = self.prefix + b'}'
+        self._game_token = ''
+        self._encoded_game_token = b'""'
+
+    def play(self, game_token: str, coordinate: Coord) -> bytes:
+        """Body of play request."""
+        if game_token != self._game_token:
+            self._game_token, self._encoded_game_token = game_token, json.dumps(game_token).encode('utf-8')
+        return b'%s, "gameToken": %s, "positionX": %d, "positionY": %d}' % (
+            self.prefix, self._encoded_game_token, coordinate.x, coordinate.y
+        )
+
+
 class JsonAuth(requests.auth.AuthBase):
-    """Json body authentication."""
+    """Json body authentication.
+
+    Bodies encoded by `PayloadEncoder` already contain the token and are sent unchanged.
+    """
     def __init__(self, token: str) -> None:
         self.token = token
+        self._prefix = PayloadEncoder(token).prefix
 
     def __call__(self, req: requests.PreparedRequest) -> requests.PreparedRequest:
         """Set token to json body."""
         data = req.body
+        if isinstance(data, bytes) and data.startswith(self._prefix):
+            return req
         if isinstance(data, bytes):
             data = str(data, 'utf-8')
         body = json.loads(str(data)) if req.body else {}
@@ -21,12 +46,16 @@ class JsonAuth(requests.auth.AuthBase):
         return req
 
 
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
 class Client:
     """Piskvorky.jobs.cz client."""
 
     base_url = 'https://piskvorky.jobs.cz/api/v1'
 
     def __init__(self, token: str) -> None:
+        self.payloads = PayloadEncoder(token)
         self.session = self._create_session(token)
 
     def _create_session(self, token: str) -> requests.Session:
@@ -38,14 +67,35 @@ class Client:
 
     def connect_game(self) -> str:
         """Connect to new game."""
-        req = self.session.post(f'{self.base_url}/connect')
+        req = self.session.post(f'{self.base_url}/connect', data=self.payloads.connect, headers=JSON_HEADERS)
         return req.json()['gameToken']
 
     def play_turn(self, game_token: str, coordinate: Coord) -> t.Any:
         """Play turn in a game."""
-        req = self.session.post(f'{self.base_url}/play', json={
-            'gameToken': game_token,
-            'positionX': coordinate.x,
-            'positionY': coordinate.y
-        })
+        if instrumentation.active is not None:
+            return self._play_turn_instrumented(instrumentation.active, game_token, coordinate)
+        req = self.session.post(
+            f'{self.base_url}/play',
+            data=self.payloads.play(game_token, coordinate),
+            headers=JSON_HEADERS
+        )
         return req.json()
+
+    def _play_turn_instrumented(
+        self,
+        registry: instrumentation.Registry,
+        game_token: str,
+        coordinate: Coord
+    ) -> t.Any:
+        """Play turn timing encoding of request and decoding of response separately from the network round trip."""
+        start = time.perf_counter()
+        data = self.payloads.play(game_token, coordinate)
+        sent = time.perf_counter()
+        req = self.session.post(f'{self.base_url}/play', data=data, headers=JSON_HEADERS)
+        received = time.perf_counter()
+        result = req.json()
+        end = time.perf_counter()
+        registry.time('client.play_turn', end - start)
+        registry.time('client.play_turn.network', received - sent)
+        registry.time('client.play_turn.serialization', sent - start + end - received)
+        return result
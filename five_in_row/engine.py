@@ -0,0 +1,295 @@
+"""Move search engine."""
+from __future__ import annotations
+import time
+from enum import Enum
+from five_in_row.analysis import IncrementalAnalysis, Sequence
+from five_in_row.cache import LRUCache
+from five_in_row.model import Coord, Player
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.analysis import Analysis
+    from five_in_row.book import OpeningBook
+    from five_in_row.model import Board
+    from five_in_row.threats import ThreatSearch
+
+
+WIN_SCORE = 1000000
+"""Score of a won position."""
+
+O_TO_MOVE_KEY = 0xD6E8FEB86659FD93
+"""Key folded into position hash when o is on move, so the same stones with a different player on move differ."""
+
+
+def score_sequences(sequences: t.List[Sequence]) -> int:
+    """Score sequences of a single player.
+
+    Only sequences that can still be closed count. Longer sequences and sequences open on both ends are worth more.
+    """
+    score = 0
+    for sequence in sequences:
+        if sequence.closed:
+            return WIN_SCORE
+        if sequence.closable:
+            value = 10 ** (Sequence.required_length - sequence.missing_points)
+            if sequence.start_open_points and sequence.end_open_points:
+                value *= 2
+            score += value
+    return score
+
+
+def evaluate(analysis: Analysis, player: Player) -> int:
+    """Score position from the point of view of given player. Uses cache of the analysis if it has one."""
+    score: int = analysis.cached(('evaluation', player), lambda: _evaluate(analysis, player))
+    return score
+
+
+def _evaluate(analysis: Analysis, player: Player) -> int:
+    """Score position from the point of view of given player without using cache."""
+    own = score_sequences(analysis.find_sequences(player))
+    opponent = score_sequences(analysis.find_sequences(player.opponent))
+    if opponent >= WIN_SCORE:
+        return -WIN_SCORE
+    if own >= WIN_SCORE:
+        return WIN_SCORE
+    return own - opponent
+
+
+class Bound(Enum):
+    """Relation of stored score to the real score of a position."""
+    exact = 0
+    lower = 1
+    upper = 2
+
+
+class TableEntry:
+    """Search result stored in transposition table."""
+    def __init__(
+        self,
+        key: int,
+        depth: int,
+        score: int,
+        bound: Bound,
+        move: t.Optional[Coord],
+        generation: int
+    ) -> None:
+        self.key = key
+        self.depth = depth
+        self.score = score
+        self.bound = bound
+        self.move = move
+        self.generation = generation
+
+
+class TranspositionTable:
+    """Fixed-size table of search results indexed by position hash.
+
+    Every hash maps to a single slot. An entry is replaced by a result searched at least as deep,
+    or by any result when the entry is left over from an older search.
+    """
+    def __init__(self, size: int = 2 ** 16) -> None:
+        self.size = size
+        self.generation = 0
+        self._slots: t.List[t.Optional[TableEntry]] = [None] * size
+
+    def new_search(self) -> None:
+        """Mark all stored entries as old."""
+        self.generation += 1
+
+    def get(self, key: int) -> t.Optional[TableEntry]:
+        """Get entry stored for given position hash."""
+        entry = self._slots[key % self.size]
+        return entry if entry is not None and entry.key == key else None
+
+    def put(self, key: int, depth: int, score: int, bound: Bound, move: t.Optional[Coord]) -> None:
+        """Store search result of a position."""
+        index = key % self.size
+        current = self._slots[index]
+        if current is None or current.generation != self.generation or depth >= current.depth:
+            self._slots[index] = TableEntry(key, depth, score, bound, move, self.generation)
+
+
+class SearchTimeout(Exception):
+    """Search ran out of time."""
+
+
+class Engine:
+    """Iterative deepening negamax search with alpha-beta pruning and transposition table.
+
+    Search deepens until `max_depth` is reached or `time_limit` (in seconds) runs out. Best move of the deepest
+    completed iteration is returned, or the best move searched so far if not even the first iteration completed.
+    Moves of the root are searched with fields crowded by most stones first. Positions are identified by Zobrist
+    hash of the board and the player on move. Evaluations of positions are memoized in `cache` if given.
+
+    Analysis of the board follows the board between searches, so the board is scanned only on the first search
+    of a game. Call `close` to stop following the board.
+
+    With `threat_search` set, a forced win found by the threat search is played without the full-width search.
+    The threat search runs within the same time limit on the analysis of the engine. Threats are memoized in `cache`,
+    or in a cache of `threat_search.cache_size` positions if no cache is given.
+    With `book` set, moves of positions found in the opening book are played without any search.
+    """
+    def __init__(
+        self,
+        max_depth: int = 4,
+        time_limit: float = 1.0,
+        table_size: int = 2 ** 16,
+        cache: t.Optional[LRUCache] = None,
+        threat_search: t.Optional[ThreatSearch] = None,
+        book: t.Optional[OpeningBook] = None
+    ) -> None:
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.table = TranspositionTable(table_size)
+        self.cache = cache
+        self.threat_search = threat_search
+        self.book = book
+        self.depth = 0
+        self.nodes = 0
+        self._followed: t.Optional[IncrementalAnalysis] = None
+
+    def best_move(self, board: Board, player: Player) -> Coord:
+        """Find best move of a player. Raises ValueError if the board is full."""
+        self.depth = self.nodes = 0
+        self._deadline = time.monotonic() + self.time_limit
+        move = self._book_move(board, player)
+        if move is not None:
+            return move
+        self._board = board
+        self._analysis = self._follow(board)
+        move = self._forced_win(board, player)
+        if move is not None:
+            return move
+        self.table.new_search()
+        return self._deepen(board, player)
+
+    def close(self) -> None:
+        """Stop following the board of the last search."""
+        if self._followed is not None:
+            self._followed.close()
+            self._followed = None
+
+    def _follow(self, board: Board) -> IncrementalAnalysis:
+        """Analysis following the board, the board is analysed if it is not followed yet."""
+        if self._followed is None or self._followed.board is not board:
+            self.close()
+            cache = self.cache
+            if cache is None and self.threat_search is not None:
+                cache = LRUCache(self.threat_search.cache_size)
+            self._followed = IncrementalAnalysis(board, cache)
+        return self._followed
+
+    def _book_move(self, board: Board, player: Player) -> t.Optional[Coord]:
+        """Move from the opening book."""
+        if self.book is not None:
+            book_move = self.book.lookup(board, player)
+            if book_move is not None:
+                return book_move.move
+        return None
+
+    def _forced_win(self, board: Board, player: Player) -> t.Optional[Coord]:
+        """Forced win found by the threat search within the time limit, using analysis of the engine."""
+        if self.threat_search is not None:
+            return self.threat_search.find_win(board, player, self._deadline, self._analysis)
+        return None
+
+    def _deepen(self, board: Board, player: Player) -> Coord:
+        """Run searches with increasing depth and return best move of the deepest finished one."""
+        moves = board.frontier().ordered()
+        if not moves:
+            return self._opening_move(board)
+        best = self._partial_best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best, score = self._search_root(moves, depth, player)
+            except SearchTimeout:
+                break
+            self.depth = depth
+            if abs(score) >= WIN_SCORE:  # game is decided, deeper search won't change the result
+                break
+        return best if self.depth else self._partial_best
+
+    @staticmethod
+    def _opening_move(board: Board) -> Coord:
+        """Center of an empty board. Raises ValueError if the board has stones but no open field next to them."""
+        if len(board.occupied_xy()[0]):
+            raise ValueError('Board is full, there is no move to play.')
+        return Coord((board.min_x + board.max_x + 1) // 2, (board.min_y + board.max_y + 1) // 2)
+
+    def _search_root(self, moves: t.List[Coord], depth: int, player: Player) -> t.Tuple[Coord, int]:
+        """Search all moves from the root position and return the best one with its score."""
+        alpha = -WIN_SCORE * 2
+        best = moves[0]
+        for move in self._ordered(moves, player):
+            score = -self._play(move, player, depth - 1, -WIN_SCORE * 2, -alpha)
+            if score > alpha:
+                alpha, best = score, move
+                if not self.depth:
+                    self._partial_best = move
+        self.table.put(self._key(player), depth, alpha, Bound.exact, best)
+        return best, alpha
+
+    def _negamax(self, depth: int, alpha: int, beta: int, player: Player) -> int:
+        """Score position from the point of view of player on move."""
+        self.nodes += 1
+        if time.monotonic() > self._deadline:
+            raise SearchTimeout()
+
+        entry = self.table.get(self._key(player))
+        if entry is not None and entry.depth >= depth and self._is_usable(entry, alpha, beta):
+            return entry.score
+
+        score = evaluate(self._analysis, player)
+        if abs(score) >= WIN_SCORE:  # prefer quicker wins and slower losses
+            return score + depth if score > 0 else score - depth
+        moves = self._candidates() if depth else []
+        if not moves:
+            return score
+
+        return self._search_moves(moves, depth, alpha, beta, player)
+
+    def _search_moves(self, moves: t.List[Coord], depth: int, alpha: int, beta: int, player: Player) -> int:
+        """Search moves of a position and store the result in transposition table."""
+        original_alpha = alpha
+        best = moves[0]
+        for move in self._ordered(moves, player):
+            score = -self._play(move, player, depth - 1, -beta, -alpha)
+            if score > alpha:
+                alpha, best = score, move
+            if alpha >= beta:
+                break
+        bound = Bound.upper if alpha <= original_alpha else Bound.lower if alpha >= beta else Bound.exact
+        self.table.put(self._key(player), depth, alpha, bound, best)
+        return alpha
+
+    def _play(self, move: Coord, player: Player, depth: int, alpha: int, beta: int) -> int:
+        """Play move, score resulting position from the point of view of the opponent and take the move back."""
+        self._analysis.play(move, player)
+        try:
+            return self._negamax(depth, alpha, beta, player.opponent)
+        finally:
+            self._analysis.undo()
+
+    def _candidates(self) -> t.List[Coord]:
+        """Moves worth considering in current position."""
+        return sorted(self._analysis.find_empty_adjacent_fields(), key=lambda coord: (coord.y, coord.x))
+
+    def _key(self, player: Player) -> int:
+        """Key of current position with given player on move in transposition table."""
+        return self._board.zobrist_hash ^ (O_TO_MOVE_KEY if player is Player.o else 0)
+
+    def _ordered(self, moves: t.List[Coord], player: Player) -> t.List[Coord]:
+        """Order moves of player on move so that the best move found previously is searched first."""
+        entry = self.table.get(self._key(player))
+        if entry is None or entry.move not in moves:
+            return moves
+        return [entry.move] + [move for move in moves if move != entry.move]
+
+    @staticmethod
+    def _is_usable(entry: TableEntry, alpha: int, beta: int) -> bool:
+        """Returns True if stored score decides the position within given window."""
+        if entry.bound is Bound.lower:
+            return entry.score >= beta
+        if entry.bound is Bound.upper:
+            return entry.score <= alpha
+        return True
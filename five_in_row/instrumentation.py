@@ -0,0 +1,104 @@
+"""Opt-in counters and timings of hot paths.
+
+Instrumentation is disabled unless a `Registry` is activated by `instrument`. Instrumented code checks `active`
+once per call, so disabled instrumentation costs a single attribute lookup.
+"""
+from __future__ import annotations
+import time
+from collections import Counter
+from contextlib import contextmanager
+from five_in_row import types as t
+
+
+class Histogram:
+    """Distribution of durations in seconds.
+
+    Durations are counted in power-of-two buckets of microseconds, bucket `n` counts durations shorter
+    than `n` microseconds and at least half as long.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets: t.Counter[int] = Counter()
+
+    def add(self, seconds: float) -> None:
+        """Record single duration."""
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[1 << int(seconds * 1e6).bit_length()] += 1
+
+    @property
+    def mean(self) -> float:
+        """Mean duration in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> t.Dict[str, t.Any]:
+        """Summary of the histogram."""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'buckets_us': dict(sorted(self.buckets.items()))
+        }
+
+
+class Registry:
+    """Named counters and timing histograms."""
+    def __init__(self) -> None:
+        self.counters: t.Counter[str] = Counter()
+        self.timings: t.Dict[str, Histogram] = {}
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increase counter."""
+        self.counters[name] += value
+
+    def time(self, name: str, seconds: float) -> None:
+        """Record duration into histogram."""
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = Histogram()
+        histogram.add(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> t.Iterator[None]:
+        """Record duration of the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.time(name, time.perf_counter() - start)
+
+    def dump(self) -> t.Dict[str, t.Any]:
+        """All counters and summaries of timings, e.g. to be logged as json."""
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'timings': {name: self.timings[name].as_dict() for name in sorted(self.timings)}
+        }
+
+    def reset(self) -> None:
+        """Clear all counters and timings."""
+        self.counters.clear()
+        self.timings.clear()
+
+
+active: t.Optional[Registry] = None
+"""Registry collecting stats, None when instrumentation is disabled."""
+
+
+@contextmanager
+def instrument(registry: t.Optional[Registry] = None) -> t.Iterator[Registry]:
+    """Collect stats of code run within the block into given or new registry."""
+    global active
+    if registry is None:
+        registry = Registry()
+    previous, active = active, registry
+    try:
+        yield registry
+    finally:
+        active = previous
@@ -0,0 +1,289 @@
+"""Monte Carlo tree search with random playouts."""
+from __future__ import annotations
+import math
+import time
+from random import Random
+from five_in_row import instrumentation
+from five_in_row.model import Coord, Direction, Player, zobrist_key
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.model import Board
+
+
+LINES = [(direction.x, direction.y) for direction in Direction.positive_directions()]
+"""Steps along the four lines crossing a field."""
+
+
+def wins_at(board: Board, coord: Coord, player: Player, length: int = 5) -> bool:
+    """Returns True if player's stone on coord is part of a line of at least `length` stones.
+
+    Only the four lines crossing coord are read, so checking the last move of a game is enough to detect its end.
+    """
+    for dx, dy in LINES:
+        if 1 + _run_length(board, coord, player, dx, dy) + _run_length(board, coord, player, -dx, -dy) >= length:
+            return True
+    return False
+
+
+def _run_length(board: Board, coord: Coord, player: Player, dx: int, dy: int) -> int:
+    """Number of consecutive stones of a player next to coord in given direction, coord not included."""
+    x, y, count = coord.x + dx, coord.y + dy, 0
+    try:
+        while board.get_xy(x, y) is player:
+            x, y, count = x + dx, y + dy, count + 1
+    except IndexError:  # line ends at the edge of the board
+        pass
+    return count
+
+
+class Neighbourhood:
+    """Empty fields within `radius` fields from a stone, like `Analysis.find_empty_adjacent_fields`.
+
+    Moves are played on the board by `play` and taken back by `undo`, which keep the fields up to date.
+    Fields are stored in a list, so a random one is chosen in constant time.
+    """
+    def __init__(self, board: Board, radius: int = 1) -> None:
+        self.board = board
+        self.moves: t.List[Coord] = []
+        self._index: t.Dict[t.Tuple[int, int], int] = {}
+        self._offsets = [
+            (dx, dy) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1) if dx or dy
+        ]
+        self._history: t.List[t.Tuple[Coord, bool, t.List[Coord]]] = []
+        for coord, _ in sorted(board.occupied_fields(), key=lambda field: (field[0].y, field[0].x)):
+            self._add_neighbours(coord)
+
+    def play(self, move: Coord, player: Player) -> None:
+        """Place player's move on the board."""
+        self.board.push(move, player)
+        was_open = (move.x, move.y) in self._index
+        if was_open:
+            self._remove(move)
+        self._history.append((move, was_open, self._add_neighbours(move)))
+
+    def undo(self) -> None:
+        """Take back the last move."""
+        move, was_open, added = self._history.pop()
+        for coord in reversed(added):
+            self._remove(coord)
+        if was_open:
+            self._add(move)
+        self.board.pop()
+
+    @property
+    def depth(self) -> int:
+        """Number of moves played and not taken back yet."""
+        return len(self._history)
+
+    def rewind(self, depth: int = 0) -> None:
+        """Take back moves until only `depth` moves are left."""
+        while len(self._history) > depth:
+            self.undo()
+
+    def _add_neighbours(self, coord: Coord) -> t.List[Coord]:
+        """Add empty fields around coord that are not known yet and return them."""
+        added = []
+        for dx, dy in self._offsets:
+            x, y = coord.x + dx, coord.y + dy
+            if (x, y) not in self._index and self.board.contains_xy(x, y) and self.board.get_xy(x, y) is None:
+                neighbour = Coord(x, y)
+                self._add(neighbour)
+                added.append(neighbour)
+        return added
+
+    def _add(self, coord: Coord) -> None:
+        """Add field to the end of the list."""
+        self._index[coord.x, coord.y] = len(self.moves)
+        self.moves.append(coord)
+
+    def _remove(self, coord: Coord) -> None:
+        """Remove field by moving the last field of the list to its place."""
+        index = self._index.pop((coord.x, coord.y))
+        last = self.moves.pop()
+        if index < len(self.moves):
+            self.moves[index] = last
+            self._index[last.x, last.y] = index
+
+
+class Node:
+    """Position in the search tree, reached by a move of `player`.
+
+    `wins` are counted from the point of view of `player`, a draw counts as half of a win. `winner` is set
+    if the move completed five.
+    """
+    __slots__ = ('player', 'parent', 'children', 'untried', 'visits', 'wins', 'winner')
+
+    def __init__(self, player: Player, parent: t.Optional[Node] = None, winner: t.Optional[Player] = None) -> None:
+        self.player = player
+        self.parent = parent
+        self.children: t.Dict[Coord, Node] = {}
+        self.untried: t.Optional[t.List[Coord]] = None
+        self.visits = 0
+        self.wins = 0.0
+        self.winner = winner
+
+    def select(self, exploration: float) -> t.Tuple[Coord, Node]:
+        """Move to the child with the highest upper confidence bound of its wins and the child."""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children.items(),
+            key=lambda item: item[1].wins / item[1].visits + exploration * math.sqrt(log_visits / item[1].visits)
+        )
+
+    def most_visited(self) -> t.Tuple[Coord, Node]:
+        """Move to the child visited most often and the child."""
+        return max(self.children.items(), key=lambda item: item[1].visits)
+
+
+class MCTS:
+    """Move search using Monte Carlo tree search with upper confidence bounds (UCT).
+
+    Every iteration descends the tree, adds a single node and finishes the game by a random playout. Moves of
+    the tree and of playouts are restricted to empty fields within `radius` from stones. A game ends once
+    the last move completes five, or as a draw after `playout_depth` playout moves.
+
+    Search runs `iterations` iterations or until `time_limit` (in seconds) runs out, whichever comes first;
+    at least one of them must be set. When the position of the next search was reached by a reply explored
+    in the previous one, the subtree of the reply is reused. Number of playouts and duration of the last search
+    are kept in `playouts` and `elapsed`.
+    """
+    def __init__(
+        self,
+        time_limit: t.Optional[float] = 1.0,
+        iterations: t.Optional[int] = None,
+        exploration: float = 1.4,
+        radius: int = 1,
+        playout_depth: int = 60,
+        seed: t.Optional[int] = None
+    ) -> None:
+        if time_limit is None and iterations is None:
+            raise ValueError('Either time_limit or iterations has to be set.')
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.exploration = exploration
+        self.radius = radius
+        self.playout_depth = playout_depth
+        self.random = Random(seed)
+        self.playouts = 0
+        self.playout_moves = 0
+        self.elapsed = 0.0
+        self.reused_visits = 0
+        self._root: t.Optional[Node] = None
+        self._root_hash = 0
+
+    @property
+    def playouts_per_second(self) -> float:
+        """Playout throughput of the last search."""
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def best_move(self, board: Board, player: Player) -> Coord:
+        """Find best move of a player. The board is left unchanged."""
+        start = time.perf_counter()
+        self.playouts = self.playout_moves = 0
+        neighbourhood = Neighbourhood(board, self.radius)
+        if not neighbourhood.moves:
+            self._root = None
+            return self._fallback_move(board)
+        root = self._reused_root(board, player)
+        self.reused_visits = root.visits
+        self._search(root, neighbourhood, start)
+        move, best = root.most_visited()
+        best.parent = None
+        self._root, self._root_hash = best, board.zobrist_hash ^ zobrist_key(move.x, move.y, player)
+        self.elapsed = time.perf_counter() - start
+        if instrumentation.active is not None:
+            instrumentation.active.count('mcts.playouts', self.playouts)
+            instrumentation.active.count('mcts.playout_moves', self.playout_moves)
+            instrumentation.active.time('mcts.search', self.elapsed)
+        return move
+
+    @staticmethod
+    def _fallback_move(board: Board) -> Coord:
+        """Move on a board without empty fields next to stones: center of an empty board, any open field otherwise.
+
+        Raises ValueError if the board is full.
+        """
+        if not len(board.occupied_xy()[0]):
+            return Coord((board.min_x + board.max_x + 1) // 2, (board.min_y + board.max_y + 1) // 2)
+        for move in board.open_fields():
+            return move
+        raise ValueError('Board is full, there is no move to play.')
+
+    def _reused_root(self, board: Board, player: Player) -> Node:
+        """Node of the previous search reached by the opponent's reply, new node if the reply was not explored."""
+        if self._root is not None:
+            for move, child in self._root.children.items():
+                if child.winner is None and self._root_hash ^ zobrist_key(move.x, move.y, child.player) == \
+                        board.zobrist_hash:
+                    child.parent = None
+                    return child
+        return Node(player.opponent)
+
+    def _search(self, root: Node, neighbourhood: Neighbourhood, start: float) -> None:
+        """Run iterations until the budget runs out. At least one iteration is run, so the root has a child."""
+        deadline = None if self.time_limit is None else start + self.time_limit
+        self._iterate(root, neighbourhood)
+        iterations = 1
+        while (self.iterations is None or iterations < self.iterations) and \
+                (deadline is None or time.perf_counter() < deadline):
+            self._iterate(root, neighbourhood)
+            iterations += 1
+
+    def _iterate(self, root: Node, neighbourhood: Neighbourhood) -> None:
+        """Select a leaf, expand it, finish the game by a random playout and propagate the result."""
+        try:
+            node = self._select(root, neighbourhood)
+            if node.winner is None:
+                node = self._expand(node, neighbourhood)
+            winner = node.winner if node.winner is not None else self._playout(node.player.opponent, neighbourhood)
+        finally:
+            neighbourhood.rewind()
+        self._backpropagate(node, winner)
+
+    def _select(self, root: Node, neighbourhood: Neighbourhood) -> Node:
+        """Descend through fully expanded nodes to a node with unexplored moves or to the end of a game."""
+        node = root
+        while node.winner is None and node.untried == [] and node.children:
+            move, node = node.select(self.exploration)
+            neighbourhood.play(move, node.player)
+        return node
+
+    def _expand(self, node: Node, neighbourhood: Neighbourhood) -> Node:
+        """Play a random unexplored move of a node and add its child, the node itself if it has no moves."""
+        if node.untried is None:
+            node.untried = list(neighbourhood.moves)
+            self.random.shuffle(node.untried)
+        if not node.untried:
+            return node
+        move = node.untried.pop()
+        player = node.player.opponent
+        neighbourhood.play(move, player)
+        child = node.children[move] = Node(player, node, player if wins_at(neighbourhood.board, move, player) else None)
+        return child
+
+    def _playout(self, player: Player, neighbourhood: Neighbourhood) -> t.Optional[Player]:
+        """Play random moves starting with given player and return the winner, None for a draw."""
+        self.playouts += 1
+        for _ in range(self.playout_depth):
+            if not neighbourhood.moves:
+                return None
+            move = self.random.choice(neighbourhood.moves)
+            neighbourhood.play(move, player)
+            self.playout_moves += 1
+            if wins_at(neighbourhood.board, move, player):
+                return player
+            player = player.opponent
+        return None
+
+    @staticmethod
+    def _backpropagate(node: Node, winner: t.Optional[Player]) -> None:
+        """Count result of a game in the node and all its ancestors."""
+        current: t.Optional[Node] = node
+        while current is not None:
+            current.visits += 1
+            if winner is None:
+                current.wins += 0.5
+            elif winner is current.player:
+                current.wins += 1
+            current = current.parent
@@ -1,19 +1,43 @@
 from __future__ import annotations
+import copy
 import numpy
 from enum import Enum
+from functools import lru_cache
+from five_in_row import instrumentation
 from five_in_row import types as t
 import math
 
 
 class Coord:
-    """Game board coordinates."""
+    """Game board coordinates.
+
+    Coords are immutable. Coords created by a `CoordPool` are interned and their adjacent Coords
+    are taken from the same pool.
+    """
+    __slots__ = ('x', 'y', '_hash', '_pool')
+
+    x: int
+    y: int
+    _hash: int
+    _pool: t.Optional[CoordPool]
+
     def __init__(self, x: int, y: int) -> None:
-        self.x = x
-        self.y = y
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+        object.__setattr__(self, '_hash', hash((x, y)))
+        object.__setattr__(self, '_pool', None)
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        """Coords can't be modified."""
+        raise AttributeError('Coord is immutable.')
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        """Pickle Coord by its coordinates."""
+        return Coord, (self.x, self.y)
 
     def __hash__(self) -> int:
         """Hash of coordinates."""
-        return hash((self.x, self.y))
+        return self._hash
 
     def __repr__(self) -> str:
         """String representation of coordinates."""
@@ -21,17 +45,63 @@ class Coord:
 
     def __eq__(self, other: object) -> bool:
         """Returns True if given object is Coord pointing to the same square."""
-        return isinstance(other, Coord) and self.x == other.x and self.y == other.y
+        return self is other or isinstance(other, Coord) and self.x == other.x and self.y == other.y
 
-    def adjacent(self, direction: Direction) -> Coord:
-        """Returns adjacent Coord in given direction."""
-        return Coord(self.x + direction.x, self.y + direction.y)
+    def adjacent(self, direction: Direction, distance: int = 1) -> Coord:
+        """Returns Coord given number of fields away in given direction, adjacent one by default."""
+        x, y, pool = self.x + direction.x * distance, self.y + direction.y * distance, self._pool
+        if pool is not None:
+            return pool.get(x, y)
+        return Coord(x, y)
 
     def distance(self, coord: Coord) -> float:
         """Calculate distance from to another Coord."""
         return math.sqrt(pow(abs(self.x - coord.x), 2) + pow(abs(self.y - coord.y), 2))
 
 
+class CoordPool:
+    """Interned Coords of all fields within given bounds.
+
+    Coords are created on their first use, so creating a pool of a large board is cheap.
+    Use `coord_pool` to share pools between boards of the same size.
+    """
+    def __init__(self, x_bounds: t.Tuple[int, int], y_bounds: t.Tuple[int, int]) -> None:
+        self.min_x, self.max_x = x_bounds
+        self.min_y, self.max_y = y_bounds
+        self._width = self.max_x - self.min_x + 1
+        self._coords: t.Dict[int, Coord] = {}
+        self._all: t.Optional[t.List[Coord]] = None
+
+    def get(self, x: int, y: int) -> Coord:
+        """Get interned Coord. Coords out of bounds are created anew."""
+        if self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y:
+            index = (y - self.min_y) * self._width + x - self.min_x
+            coord = self._coords.get(index)
+            if coord is None:
+                coord = self._coords[index] = Coord(x, y)
+                object.__setattr__(coord, '_pool', self)
+            return coord
+        return Coord(x, y)
+
+    def __iter__(self) -> t.Iterator[Coord]:
+        """Iterate over all interned Coords row by row. All Coords are created on the first iteration."""
+        if self._all is None:
+            get = self.get
+            xs = range(self.min_x, self.max_x + 1)
+            self._all = [get(x, y) for y in range(self.min_y, self.max_y + 1) for x in xs]
+        return iter(self._all)
+
+    def __len__(self) -> int:
+        """Number of fields within bounds of the pool."""
+        return self._width * (self.max_y - self.min_y + 1)
+
+
+@lru_cache(maxsize=16)
+def coord_pool(x_bounds: t.Tuple[int, int], y_bounds: t.Tuple[int, int]) -> CoordPool:
+    """Get shared pool of Coords within given bounds."""
+    return CoordPool(x_bounds, y_bounds)
+
+
 class Direction(Enum):
     """Direction on a board."""
 
@@ -70,6 +140,58 @@ class Direction(Enum):
         return [cls.left, cls.up_left, cls.up, cls.down_left]
 
 
+class Symmetry(Enum):
+    """Rotation or reflection of a board.
+
+    Value is a tuple (swap axes, flip X, flip Y) of operations applied in this order. Rotations are clockwise
+    with Y axis pointing down. Symmetries swapping axes map a board of size (width, height) onto (height, width).
+    """
+
+    identity = (False, False, False)
+    rotate_90 = (True, True, False)
+    rotate_180 = (False, True, True)
+    rotate_270 = (True, False, True)
+    flip_x = (False, True, False)
+    flip_y = (False, False, True)
+    transpose = (True, False, False)
+    anti_transpose = (True, True, True)
+
+    @property
+    def swaps_axes(self) -> bool:
+        """Returns True if the symmetry swaps X and Y axes."""
+        return self.value[0]
+
+    @property
+    def inverse(self) -> Symmetry:
+        """Symmetry mapping transformed board back."""
+        swap, flip_x, flip_y = self.value
+        return Symmetry((swap, flip_y, flip_x)) if swap else self
+
+    def shape(self, width: int, height: int) -> t.Tuple[int, int]:
+        """Size of transformed board of given size."""
+        return (height, width) if self.swaps_axes else (width, height)
+
+    def apply(self, x: int, y: int, width: int, height: int) -> t.Tuple[int, int]:
+        """Map normalized coordinates of a board of given size."""
+        swap, flip_x, flip_y = self.value
+        if swap:
+            x, y, width, height = y, x, height, width
+        return (width - 1 - x if flip_x else x), (height - 1 - y if flip_y else y)
+
+    def direction(self, direction: Direction) -> Direction:
+        """Map direction."""
+        swap, flip_x, flip_y = self.value
+        dx, dy = (direction.y, direction.x) if swap else (direction.x, direction.y)
+        return Direction((-dx if flip_x else dx, -dy if flip_y else dy))
+
+    def transform(self, array: numpy.ndarray) -> numpy.ndarray:
+        """Transformed view of an array indexed by [y, x], without copying it."""
+        swap, flip_x, flip_y = self.value
+        if swap:
+            array = array.T
+        return array[::-1 if flip_y else 1, ::-1 if flip_x else 1]
+
+
 class Player(Enum):
     """Player symbol."""
     x = '˟'
@@ -85,42 +207,130 @@ class Player(Enum):
             return Player.o
         return Player.x
 
+    @property
+    def code(self) -> int:
+        """Numeric code of player used in int8 board arrays."""
+        return 1 if self is Player.x else 2
+
+
+EMPTY = 0
+"""Numeric code of an empty field used in int8 board arrays."""
+
+PLAYERS = (None, Player.x, Player.o)
+"""Players indexed by their numeric code."""
+
+_UINT64 = 2 ** 64 - 1
+
+
+@lru_cache(maxsize=2 ** 18)
+def zobrist_key(x: int, y: int, player: Player) -> int:
+    """Pseudo-random 64-bit key of a player's move on given coordinates.
+
+    Keys are derived from the coordinates using splitmix64, so they are the same for every board and process.
+    """
+    value = ((x & 0x3FFFFFFF) << 32 | (y & 0x3FFFFFFF) << 2 | player.code) + 0x9E3779B97F4A7C15
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _UINT64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _UINT64
+    return value ^ (value >> 31)
+
 
 class Board:
-    """Playing board."""
+    """Playing board.
+
+    Board keeps 64-bit Zobrist hash of its fields in `zobrist_hash`. The hash is updated on every change of a field.
+    Moves placed by `push` can be taken back by `pop`, so a search can try moves on a single board.
+    """
     def __init__(self, x_bounds: t.Tuple[int, int], y_bounds: t.Tuple[int, int]) -> None:
         self.min_x, self.max_x = x_bounds
         self.min_y, self.max_y = y_bounds
-        self._fields = numpy.full((self.height, self.width), None)
+        self._listeners: t.List[t.Callable[[Coord, t.Optional[Player], t.Optional[Player]], None]] = []
+        self.zobrist_hash = 0
+        self._origin_x, self._origin_y = self.min_x, self.min_y
+        self._coords = coord_pool(tuple(x_bounds), tuple(y_bounds))
+        self._frontiers: t.Dict[int, Frontier] = {}
+        self._symmetries: t.Optional[Symmetries] = None
+        self._moves: t.List[t.Tuple[Coord, Player]] = []
+        self._shared = False
+        self._allocate()
+
+    def _allocate(self) -> None:
+        """Allocate storage for board fields."""
+        self._fields = numpy.zeros((self.height, self.width), dtype=numpy.int8)
+
+    def _copy_storage(self) -> None:
+        """Replace storage shared with a snapshot by a copy of it."""
+        self._fields = self._fields.copy()
+
+    def _get(self, x: int, y: int) -> t.Optional[Player]:
+        """Read field from storage using normalized coordinates."""
+        return PLAYERS[self._fields[y, x]]
+
+    def _set(self, x: int, y: int, value: t.Optional[Player]) -> None:
+        """Write field to storage using normalized coordinates."""
+        self._fields[y, x] = value.code if value else EMPTY
+
+    def to_array(self) -> numpy.ndarray:
+        """Read-only int8 array of player codes indexed by normalized [y, x]."""
+        fields = self._fields.view()
+        fields.flags.writeable = False
+        return fields
 
     def __str__(self) -> str:
         """String representation of playing board."""
         result = ''
-        for row in self._fields:
-            for field in row:
+        for y in range(self.height):
+            for x in range(self.width):
+                field = self._get(x, y)
                 result += '·' if field is None else str(field)
             result += '\n'
         return result
 
     def fields(self) -> t.Iterator[t.Tuple[Coord, t.Optional[Player]]]:
         """Iterate over all fields in format (Coord, Player)."""
-        for y in range(self._fields.shape[0]):
-            for x in range(self._fields.shape[1]):
-                coord = Coord(x, y)
-                yield coord, self[coord]
+        for coord, code in zip(self._coords, self._scan().ravel().tolist()):
+            yield coord, PLAYERS[code]
+
+    def coord(self, x: int, y: int) -> Coord:
+        """Get interned Coord of the field at index [y, x] of `to_array()`."""
+        return self._coords.get(x + self._origin_x, y + self._origin_y)
+
+    def occupied_xy(self, player: t.Optional[Player] = None) -> t.Tuple[numpy.ndarray, numpy.ndarray]:
+        """X and Y coordinates of all occupied fields (of given player) as two int arrays, row by row."""
+        fields = self._scan()
+        return self._xy(fields != EMPTY if player is None else fields == player.code)
+
+    def open_xy(self) -> t.Tuple[numpy.ndarray, numpy.ndarray]:
+        """X and Y coordinates of all open fields as two int arrays, row by row."""
+        return self._xy(self._scan() == EMPTY)
+
+    def _scan(self) -> numpy.ndarray:
+        """Fields from `to_array()` counted as scanned cells when instrumentation is active."""
+        fields = self.to_array()
+        if instrumentation.active is not None:
+            instrumentation.active.count('board.cells_scanned', fields.size)
+        return fields
+
+    def _xy(self, mask: numpy.ndarray) -> t.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Coordinates of fields selected by boolean mask of `to_array()`."""
+        ys, xs = numpy.nonzero(mask)
+        origin = self.coord(0, 0)
+        return xs + origin.x, ys + origin.y
 
     def occupied_fields(self, player: Player = None) -> t.Iterator[t.Tuple[Coord, Player]]:
-        """Iterate over all occupied fields in format (Coord, Player)."""
-        for coord, _player in self.fields():
-            if _player is not None:
-                if player is None or player is _player:
-                    yield coord, _player
+        """Iterate over all occupied fields in format (Coord, Player) row by row.
+
+        Occupied fields are found in a single pass over `to_array()`, Coords are created as they are iterated.
+        """
+        fields = self._scan()
+        ys, xs = numpy.nonzero(fields != EMPTY if player is None else fields == player.code)
+        for x, y, code in zip(xs.tolist(), ys.tolist(), fields[ys, xs].tolist()):
+            yield self.coord(x, y), Player.x if code == Player.x.code else Player.o
 
     def open_fields(self) -> t.Iterator[Coord]:
-        """Iterate over open fields"""
-        for coord, player in self.fields():
-            if player is None:
-                yield coord
+        """Iterate over open fields row by row."""
+        ys, xs = numpy.nonzero(self._scan() == EMPTY)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            yield self.coord(x, y)
 
     def is_open(self, coord: Coord) -> bool:
         """Returns True if given coordinate is empty."""
@@ -137,27 +347,469 @@ class Board:
         return abs(self.min_y - self.max_y) + 1
 
     def _normalize_coord(self, coord: Coord) -> t.Tuple[int, int]:
-        """Map coordinate to <0;with> range."""
-        return coord.x - self.min_x, coord.y - self.min_y
-
-    def _denormalize_coord(self, coord: Coord) -> t.Tuple[int, int]:
-        """Map coordinate to <min;max> range."""
-        return coord.x + self.min_x, coord.y + self.min_y
+        """Map board coordinate to index of storage, starting at 0."""
+        return coord.x - self._origin_x, coord.y - self._origin_y
+
+    def contains_xy(self, x: int, y: int) -> bool:
+        """Returns True if given coordinates are in bounds."""
+        return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
+
+    def get_xy(self, x: int, y: int) -> t.Optional[Player]:
+        """Get field value by coordinates, without creating a Coord."""
+        if not self.contains_xy(x, y):
+            raise IndexError(f'Coordinate <{x}:{y}> is out of board bounds.')
+        return self._get(x - self._origin_x, y - self._origin_y)
+
+    def set_xy(self, x: int, y: int, value: t.Optional[Player]) -> None:
+        """Set field value by coordinates. Coord of the field is created only if there are listeners."""
+        if not self.contains_xy(x, y):
+            raise IndexError(f'Coordinate <{x}:{y}> is out of board bounds.')
+        normalized_x, normalized_y = x - self._origin_x, y - self._origin_y
+        previous = self._get(normalized_x, normalized_y)
+        if self._shared:
+            self._copy_storage()
+            self._shared = False
+        self._set(normalized_x, normalized_y, value)
+        if previous is not None:
+            self.zobrist_hash ^= zobrist_key(x, y, previous)
+        if value is not None:
+            self.zobrist_hash ^= zobrist_key(x, y, value)
+        if self._listeners:
+            self._notify(self._coords.get(x, y), previous, value)
+
+    def _notify(self, coord: Coord, previous: t.Optional[Player], value: t.Optional[Player]) -> None:
+        """Call all listeners with changed field."""
+        for listener in self._listeners:
+            listener(coord, previous, value)
 
     def __getitem__(self, coord: Coord) -> t.Optional[Player]:
         """Get field value."""
-        if coord not in self:
-            raise IndexError(f'Coordinate {coord} is out of board bounds.')
-        denormalized = self._denormalize_coord(coord)
-        return self._fields[denormalized[1], denormalized[0]]
+        return self.get_xy(coord.x, coord.y)
 
-    def __setitem__(self, coord: Coord, value: Player) -> None:
+    def __setitem__(self, coord: Coord, value: t.Optional[Player]) -> None:
         """Set field value."""
-        if coord not in self:
-            raise IndexError(f'Coordinate {coord} is out of board bounds.')
-        normalized = self._normalize_coord(coord)
-        self._fields[normalized[1], normalized[0]] = value
+        self.set_xy(coord.x, coord.y, value)
+
+    def push(self, coord: Coord, player: Player) -> None:
+        """Place player's move on an empty field, so that it can be taken back by `pop`."""
+        if self[coord] is not None:
+            raise ValueError(f'Field {coord} is already occupied.')
+        self.set_xy(coord.x, coord.y, player)
+        self._moves.append((coord, player))
+
+    def pop(self) -> t.Tuple[Coord, Player]:
+        """Take back the last move placed by `push` and return it."""
+        if not self._moves:
+            raise IndexError('There is no move to take back.')
+        coord, player = self._moves.pop()
+        self.set_xy(coord.x, coord.y, None)
+        return coord, player
+
+    @property
+    def moves(self) -> t.List[t.Tuple[Coord, Player]]:
+        """Moves placed by `push` and not taken back yet, oldest first."""
+        return list(self._moves)
+
+    def snapshot(self) -> Board:
+        """Copy of the board sharing storage of fields with it until either of them is changed.
+
+        Zobrist hash and moves placed by `push` are copied. Listeners are not, frontiers and symmetries
+        of the snapshot are built on its first use.
+        """
+        snapshot = copy.copy(self)
+        snapshot._listeners, snapshot._frontiers, snapshot._symmetries = [], {}, None
+        snapshot._moves = list(self._moves)
+        self._shared = snapshot._shared = True
+        return snapshot
+
+    def frontier(self, radius: int = 1) -> Frontier:
+        """Live index of empty fields within given Chebyshev distance from any stone.
+
+        The index is built on first use and then kept up to date on every change of a field.
+        """
+        frontier = self._frontiers.get(radius)
+        if frontier is None:
+            frontier = self._frontiers[radius] = Frontier(self, radius)
+        return frontier
+
+    def symmetries(self) -> Symmetries:
+        """Live Zobrist hashes of the board transformed by each of its symmetries.
+
+        The hashes are built on first use and then kept up to date on every change of a field.
+        """
+        if self._symmetries is None:
+            self._symmetries = Symmetries(self)
+        return self._symmetries
+
+    def canonical(self) -> t.Tuple[int, Symmetry]:
+        """Canonical hash of the position, equal for all its rotations and reflections, and symmetry mapping
+        the board onto its canonical form.
+
+        Use (hash, width, height) of the canonical form as a key of caches of positions.
+        """
+        return self.symmetries().canonical()
+
+    def canonical_array(self) -> numpy.ndarray:
+        """View of `to_array()` transformed into canonical form."""
+        return self.canonical()[1].transform(self.to_array())
+
+    def to_canonical(self, coord: Coord, symmetry: Symmetry) -> Coord:
+        """Map Coord of the board to normalized Coord of the board transformed by given symmetry."""
+        return Coord(*symmetry.apply(*self._normalize_coord(coord), self.width, self.height))
+
+    def from_canonical(self, coord: Coord, symmetry: Symmetry) -> Coord:
+        """Map normalized Coord of the board transformed by given symmetry back to Coord of the board."""
+        x, y = symmetry.inverse.apply(coord.x, coord.y, *symmetry.shape(self.width, self.height))
+        return self.coord(x, y)
+
+    def subscribe(self, listener: t.Callable[[Coord, t.Optional[Player], t.Optional[Player]], None]) -> None:
+        """Call listener with (Coord, previous Player, new Player) after every change of a field."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: t.Callable[[Coord, t.Optional[Player], t.Optional[Player]], None]) -> None:
+        """Stop calling listener on field changes."""
+        self._listeners.remove(listener)
 
     def __contains__(self, coord: Coord) -> bool:
         """Returns True if giver coord is in bounds."""
-        return (self.min_x <= coord.x <= self.max_x) and (self.min_y <= coord.y <= self.max_y)
+        return self.contains_xy(coord.x, coord.y)
+
+
+class Frontier:
+    """Empty fields within `radius` fields (in any direction) from a stone.
+
+    For each field near a stone the index counts stones within the radius, so playing or removing a stone
+    updates only the (2 * radius + 1) ** 2 fields around it. Use `Board.frontier` to get an index of a board.
+    """
+    def __init__(self, board: Board, radius: int = 1) -> None:
+        self.board = board
+        self.radius = radius
+        self._offsets = [
+            (dx, dy) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1) if dx or dy
+        ]
+        self._counts: t.Dict[Coord, int] = {}
+        self._stones: t.Set[Coord] = set()
+        self._fields: t.Set[Coord] = set()
+        for coord, _ in board.occupied_fields():
+            self._add_stone(coord)
+        board.subscribe(self._update)
+
+    def _neighbours(self, coord: Coord) -> t.Iterator[Coord]:
+        """Fields on the board within radius from given field."""
+        get, board = self.board._coords.get, self.board
+        for dx, dy in self._offsets:
+            neighbour = get(coord.x + dx, coord.y + dy)
+            if neighbour in board:
+                yield neighbour
+
+    def _update(self, coord: Coord, previous: t.Optional[Player], value: t.Optional[Player]) -> None:
+        """Update index after change of a field."""
+        if previous is None and value is not None:
+            self._add_stone(coord)
+        elif previous is not None and value is None:
+            self._remove_stone(coord)
+
+    def _add_stone(self, coord: Coord) -> None:
+        """Count new stone in its neighbourhood."""
+        counts, stones, fields = self._counts, self._stones, self._fields
+        stones.add(coord)
+        fields.discard(coord)
+        for neighbour in self._neighbours(coord):
+            counts[neighbour] = counts.get(neighbour, 0) + 1
+            if neighbour not in stones:
+                fields.add(neighbour)
+
+    def _remove_stone(self, coord: Coord) -> None:
+        """Discount removed stone from its neighbourhood."""
+        counts, fields = self._counts, self._fields
+        self._stones.discard(coord)
+        for neighbour in self._neighbours(coord):
+            counts[neighbour] -= 1
+            if not counts[neighbour]:
+                del counts[neighbour]
+                fields.discard(neighbour)
+        if coord in counts:
+            fields.add(coord)
+
+    def count(self, coord: Coord) -> int:
+        """Number of stones within radius from given field."""
+        return self._counts.get(coord, 0)
+
+    def ordered(self) -> t.List[Coord]:
+        """Fields of the frontier ordered by number of stones around them, most crowded first, then row by row."""
+        counts = self._counts
+        return sorted(self._fields, key=lambda coord: (-counts[coord], coord.y, coord.x))
+
+    def __contains__(self, coord: Coord) -> bool:
+        """Returns True if given field is in the frontier."""
+        return coord in self._fields
+
+    def __iter__(self) -> t.Iterator[Coord]:
+        """Iterate over fields of the frontier in arbitrary order."""
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        """Number of fields in the frontier."""
+        return len(self._fields)
+
+
+class Symmetries:
+    """Zobrist hashes of a board transformed by each of its symmetries.
+
+    Keys of stones are taken at their transformed normalized coordinates, so a position and all its rotations
+    and reflections share the minimal hash. Square boards have 8 symmetries, other boards only the 4 not
+    swapping axes. Changing a field updates every hash with its key. Use `Board.symmetries` to get hashes of a board.
+    """
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self.symmetries = [
+            symmetry for symmetry in Symmetry if board.width == board.height or not symmetry.swaps_axes
+        ]
+        self.hashes = [0] * len(self.symmetries)
+        self._operations = [symmetry.value for symmetry in self.symmetries]
+        self._last_x, self._last_y = board.width - 1, board.height - 1
+        fields = board.to_array()
+        for y, x in zip(*numpy.nonzero(fields)):
+            self._toggle(int(x), int(y), Player.x if fields[y, x] == Player.x.code else Player.o)
+        board.subscribe(self._update)
+
+    def _toggle(self, x: int, y: int, player: Player) -> None:
+        """Add or remove key of player's stone at normalized coordinates to every hash."""
+        hashes, xs, ys = self.hashes, (x, self._last_x - x), (y, self._last_y - y)
+        for index, (swap, flip_x, flip_y) in enumerate(self._operations):
+            if swap:
+                hashes[index] ^= zobrist_key(ys[flip_x], xs[flip_y], player)
+            else:
+                hashes[index] ^= zobrist_key(xs[flip_x], ys[flip_y], player)
+
+    def _update(self, coord: Coord, previous: t.Optional[Player], value: t.Optional[Player]) -> None:
+        """Update hashes after change of a field."""
+        x, y = self.board._normalize_coord(coord)
+        if previous is not None:
+            self._toggle(x, y, previous)
+        if value is not None:
+            self._toggle(x, y, value)
+
+    def close(self) -> None:
+        """Stop updating hashes on changes of the board."""
+        self.board.unsubscribe(self._update)
+
+    def canonical(self) -> t.Tuple[int, Symmetry]:
+        """Minimal hash and symmetry transforming the board into the position of that hash."""
+        index = min(range(len(self.hashes)), key=self.hashes.__getitem__)
+        return self.hashes[index], self.symmetries[index]
+
+
+class BitBoard(Board):
+    """Playing board storing fields of each player in bitmasks of rows.
+
+    Every row of a player is a Python int with a bit per field, so reading and writing a field takes a few
+    operations on a small int. Bitboards of whole board used for line detection are built from the rows, each
+    row followed by a padding bit that is never set, so shifting a bitboard horizontally never wraps into
+    a neighbouring row.
+    """
+    def _allocate(self) -> None:
+        """Allocate empty rows, indexed by player code."""
+        self._stride = self.width + 1
+        self._rows: t.List[t.List[int]] = [[], [0] * self.height, [0] * self.height]
+
+    def _copy_storage(self) -> None:
+        """Replace rows shared with a snapshot by a copy of them."""
+        self._rows = [[], list(self._rows[1]), list(self._rows[2])]
+
+    def _get(self, x: int, y: int) -> t.Optional[Player]:
+        """Read field from rows using normalized coordinates."""
+        bit = 1 << x
+        if self._rows[1][y] & bit:
+            return PLAYERS[1]
+        if self._rows[2][y] & bit:
+            return PLAYERS[2]
+        return None
+
+    def _set(self, x: int, y: int, value: t.Optional[Player]) -> None:
+        """Write field to rows using normalized coordinates."""
+        bit = 1 << x
+        x_rows, o_rows = self._rows[1], self._rows[2]
+        if value is None:
+            x_rows[y] &= ~bit
+            o_rows[y] &= ~bit
+        elif value is PLAYERS[1]:
+            x_rows[y] |= bit
+            o_rows[y] &= ~bit
+        else:
+            o_rows[y] |= bit
+            x_rows[y] &= ~bit
+
+    def bits(self, player: Player) -> int:
+        """Bitboard of fields occupied by given player, rows packed `width + 1` bits apart."""
+        bits = 0
+        for row in reversed(self._rows[player.code]):
+            bits = bits << self._stride | row
+        return bits
+
+    def occupied_fields(self, player: t.Optional[Player] = None) -> t.Iterator[t.Tuple[Coord, Player]]:
+        """Iterate over all occupied fields in format (Coord, Player) walking only the set bits."""
+        for y, (x_row, o_row) in enumerate(zip(self._rows[1], self._rows[2])):
+            mask = x_row | o_row if player is None else x_row if player is Player.x else o_row
+            while mask:
+                lowest = mask & -mask
+                yield self.coord(lowest.bit_length() - 1, y), Player.x if x_row & lowest else Player.o
+                mask ^= lowest
+
+    def to_array(self) -> numpy.ndarray:
+        """Int8 array of player codes indexed by normalized [y, x]."""
+        size = (self.width + 7) // 8
+        fields = numpy.zeros((self.height, self.width), dtype=numpy.int8)
+        for player in Player:
+            rows = b''.join(row.to_bytes(size, 'little') for row in self._rows[player.code])
+            packed = numpy.frombuffer(rows, dtype=numpy.uint8).reshape(self.height, size)
+            bits = numpy.unpackbits(packed, axis=1, bitorder='little')[:, :self.width]
+            fields[bits.astype(bool)] = player.code
+        return fields
+
+    def line_starts(self, player: Player, direction: Direction, length: int) -> int:
+        """Bitmask of fields where a line of given length of player's fields starts in given direction."""
+        return self._line_starts(self.bits(player), direction, length)
+
+    def has_line(self, player: Player, length: int = 5) -> bool:
+        """Returns True if player has a line of at least given length in any direction."""
+        bits = self.bits(player)
+        return any(self._line_starts(bits, direction, length) for direction in Direction.positive_directions())
+
+    def _line_starts(self, bits: int, direction: Direction, length: int) -> int:
+        """Bitmask of fields where a line of given length of set bits starts in given direction."""
+        shift = direction.x + direction.y * self._stride
+        mask = bits
+        for step in range(1, length):
+            offset = shift * step
+            mask &= bits >> offset if offset > 0 else bits << -offset
+        return mask
+
+
+class SparseBoard(Board):
+    """Playing board without fixed bounds.
+
+    Fields are stored in square int8 tiles allocated lazily as stones appear, so memory and iteration over occupied
+    fields scale with the number of stones. Bounds track the extent of occupied fields and every Coord is
+    on the board. `fields`, `open_fields` and `to_array` cover the extent grown by `margin` fields on each side,
+    so open ends of all sequences fit into them.
+    """
+    margin = 4
+
+    def __init__(self, tile_size: int = 16) -> None:
+        self.tile_size = tile_size
+        super().__init__((0, 0), (0, 0))
+
+    def _allocate(self) -> None:
+        """Start with no tiles."""
+        self._tiles: t.Dict[t.Tuple[int, int], numpy.ndarray] = {}
+        self.stones = 0
+
+    def _copy_storage(self) -> None:
+        """Replace tiles shared with a snapshot by a copy of them."""
+        self._tiles = {key: tile.copy() for key, tile in self._tiles.items()}
+
+    def _get(self, x: int, y: int) -> t.Optional[Player]:
+        """Read field from its tile."""
+        tile = self._tiles.get((x // self.tile_size, y // self.tile_size))
+        return None if tile is None else PLAYERS[tile[y % self.tile_size, x % self.tile_size]]
+
+    def _set(self, x: int, y: int, value: t.Optional[Player]) -> None:
+        """Write field to its tile, allocate the tile if needed."""
+        key = (x // self.tile_size, y // self.tile_size)
+        tile = self._tiles.get(key)
+        if tile is None:
+            if value is None:
+                return
+            tile = self._tiles[key] = numpy.zeros((self.tile_size, self.tile_size), dtype=numpy.int8)
+        previous = tile[y % self.tile_size, x % self.tile_size]
+        tile[y % self.tile_size, x % self.tile_size] = value.code if value else EMPTY
+        if value is not None and previous == EMPTY:
+            self._add_stone(x, y)
+        elif value is None and previous != EMPTY:
+            self._remove_stone(x, y)
+
+    def _add_stone(self, x: int, y: int) -> None:
+        """Extend bounds to contain new stone."""
+        self.stones += 1
+        if self.stones == 1:
+            self.min_x = self.max_x = x
+            self.min_y = self.max_y = y
+        else:
+            self.min_x, self.max_x = min(self.min_x, x), max(self.max_x, x)
+            self.min_y, self.max_y = min(self.min_y, y), max(self.max_y, y)
+
+    def _remove_stone(self, x: int, y: int) -> None:
+        """Shrink bounds if removed stone was on their edge."""
+        self.stones -= 1
+        if x in (self.min_x, self.max_x) or y in (self.min_y, self.max_y):
+            xs, ys, _ = self._occupied()
+            self.min_x, self.max_x = (int(xs.min()), int(xs.max())) if self.stones else (0, 0)
+            self.min_y, self.max_y = (int(ys.min()), int(ys.max())) if self.stones else (0, 0)
+
+    def _occupied(self) -> t.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """Coordinates and player codes of all stones ordered row by row."""
+        xs, ys, codes = [numpy.empty(0, dtype=numpy.int64)], [numpy.empty(0, dtype=numpy.int64)], [numpy.empty(0)]
+        for (tile_x, tile_y), tile in self._tiles.items():
+            tile_ys, tile_xs = numpy.nonzero(tile)
+            xs.append(tile_xs + tile_x * self.tile_size)
+            ys.append(tile_ys + tile_y * self.tile_size)
+            codes.append(tile[tile_ys, tile_xs])
+        x, y, code = numpy.concatenate(xs), numpy.concatenate(ys), numpy.concatenate(codes)
+        order = numpy.lexsort((x, y))
+        return x[order], y[order], code[order]
+
+    def contains_xy(self, x: int, y: int) -> bool:
+        """Every coord is on the board."""
+        return True
+
+    def symmetries(self) -> Symmetries:
+        """Board without fixed bounds has no symmetries."""
+        raise ValueError('SparseBoard has no fixed bounds to be rotated or reflected.')
+
+    def __str__(self) -> str:
+        """String representation of occupied extent of the board."""
+        result = ''
+        for y in range(self.min_y, self.max_y + 1):
+            for x in range(self.min_x, self.max_x + 1):
+                field = self._get(x, y)
+                result += '·' if field is None else str(field)
+            result += '\n'
+        return result
+
+    def fields(self) -> t.Iterator[t.Tuple[Coord, t.Optional[Player]]]:
+        """Iterate over fields of the extent grown by margin in format (Coord, Player)."""
+        for y in range(self.min_y - self.margin, self.max_y + self.margin + 1):
+            for x in range(self.min_x - self.margin, self.max_x + self.margin + 1):
+                yield Coord(x, y), self._get(x, y)
+
+    def occupied_fields(self, player: t.Optional[Player] = None) -> t.Iterator[t.Tuple[Coord, Player]]:
+        """Iterate over all occupied fields in format (Coord, Player) without visiting empty fields."""
+        for x, y, code in zip(*self._occupied()):
+            if player is None or code == player.code:
+                yield Coord(int(x), int(y)), Player.x if code == Player.x.code else Player.o
+
+    def occupied_xy(self, player: t.Optional[Player] = None) -> t.Tuple[numpy.ndarray, numpy.ndarray]:
+        """X and Y coordinates of all occupied fields (of given player) as two int arrays, read from tiles."""
+        xs, ys, codes = self._occupied()
+        if player is None:
+            return xs, ys
+        mine = codes == player.code
+        return xs[mine], ys[mine]
+
+    def coord(self, x: int, y: int) -> Coord:
+        """Get Coord of the field at index [y, x] of `to_array()`."""
+        return Coord(x + self.min_x - self.margin, y + self.min_y - self.margin)
+
+    def to_array(self) -> numpy.ndarray:
+        """Int8 array of player codes of the extent grown by margin."""
+        origin_x, origin_y = self.min_x - self.margin, self.min_y - self.margin
+        fields = numpy.zeros((self.height + 2 * self.margin, self.width + 2 * self.margin), dtype=numpy.int8)
+        height, width = fields.shape
+        for (tile_x, tile_y), tile in self._tiles.items():
+            x, y = tile_x * self.tile_size - origin_x, tile_y * self.tile_size - origin_y
+            start_x, start_y = max(x, 0), max(y, 0)
+            end_x, end_y = min(x + self.tile_size, width), min(y + self.tile_size, height)
+            if start_x < end_x and start_y < end_y:
+                fields[start_y:end_y, start_x:end_x] = tile[start_y - y:end_y - y, start_x - x:end_x - x]
+        return fields
@@ -0,0 +1,83 @@
+"""Parallel evaluation of candidate moves."""
+from __future__ import annotations
+import math
+import os
+import numpy
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from five_in_row.analysis import Analysis
+from five_in_row.engine import evaluate
+from five_in_row.model import Board, PLAYERS
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.model import Coord, Player
+
+    PackedBoard = t.Tuple[t.Tuple[int, int], t.Tuple[int, int], bytes]
+
+
+def pack_board(board: Board) -> PackedBoard:
+    """Compact picklable representation of a board: bounds and bytes of int8 player codes of `to_array()`."""
+    codes = board.to_array()
+    height, width = codes.shape
+    first, last = board.coord(0, 0), board.coord(width - 1, height - 1)
+    return (first.x, last.x), (first.y, last.y), codes.tobytes()
+
+
+def unpack_board(packed: PackedBoard) -> Board:
+    """Create board from its packed representation."""
+    x_bounds, y_bounds, fields = packed
+    board = Board(x_bounds, y_bounds)
+    codes = numpy.frombuffer(fields, dtype=numpy.int8).reshape(board.height, board.width)
+    for y, x in zip(*numpy.nonzero(codes)):
+        board[board.coord(int(x), int(y))] = PLAYERS[codes[y, x]]
+    return board
+
+
+def evaluate_moves(board: Board, player: Player, moves: t.List[Coord]) -> t.List[int]:
+    """Score positions after each of player's moves from the player's point of view."""
+    analysis = Analysis(board)
+    scores = []
+    for move in moves:
+        board.push(move, player)
+        try:
+            scores.append(evaluate(analysis, player))
+        finally:
+            board.pop()
+    return scores
+
+
+def _evaluate_packed_moves(packed: PackedBoard, player: Player, moves: t.List[Coord]) -> t.List[int]:
+    """Score moves on a packed board. Runs in worker process."""
+    return evaluate_moves(unpack_board(packed), player, moves)
+
+
+class ParallelEvaluator:
+    """Scores candidate moves in a pool of worker processes.
+
+    Moves are split into chunks of `chunksize` moves, each chunk is scored by a single worker.
+    By default there are about four chunks per worker. Results are the same as of `evaluate_moves`.
+    """
+    def __init__(self, workers: t.Optional[int] = None, chunksize: t.Optional[int] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._executor = ProcessPoolExecutor(self.workers)
+
+    def __enter__(self) -> ParallelEvaluator:
+        """Use evaluator as a context manager closing the pool on exit."""
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        """Close the pool."""
+        self.close()
+
+    def close(self) -> None:
+        """Shut down worker processes."""
+        self._executor.shutdown()
+
+    def evaluate_moves(self, board: Board, player: Player, moves: t.List[Coord]) -> t.List[int]:
+        """Score positions after each of player's moves from the player's point of view."""
+        chunksize = self.chunksize or max(1, math.ceil(len(moves) / (self.workers * 4)))
+        chunks = [moves[i:i + chunksize] for i in range(0, len(moves), chunksize)]
+        results = self._executor.map(_evaluate_packed_moves, repeat(pack_board(board)), repeat(player), chunks)
+        return [score for chunk in results for score in chunk]
@@ -0,0 +1,98 @@
+"""Lookup tables classifying lines of fields around a cell."""
+from __future__ import annotations
+import numpy
+from enum import Enum
+from functools import lru_cache
+from five_in_row import types as t
+
+
+BLOCKED = 0
+"""State of a field occupied by the opponent or out of the board."""
+
+OPEN = 1
+"""State of an empty field."""
+
+OWN = 2
+"""State of a field occupied by the player."""
+
+RADIUS = 4
+"""Number of fields on each side of the cell a line covers."""
+
+LENGTH = 2 * RADIUS + 1
+"""Number of fields of a line. Every five crossing the cell fits into it."""
+
+POWERS = [3 ** index for index in range(LENGTH)]
+"""Weights of fields of a line in its code, the field `RADIUS` steps backwards first."""
+
+
+class Shape(Enum):
+    """Best shape a player's stone on a cell forms in a line, stronger shapes have higher value."""
+    none = 0
+    one = 1
+    two = 2
+    three = 3
+    open_three = 4
+    four = 5
+    open_four = 6
+    five = 7
+
+
+SHAPE_SCORES = {
+    Shape.none: 0,
+    Shape.one: 1,
+    Shape.two: 10,
+    Shape.three: 100,
+    Shape.open_three: 1000,
+    Shape.four: 1000,
+    Shape.open_four: 100000,
+    Shape.five: 1000000,
+}
+"""Score of each shape."""
+
+
+def line_code(states: t.List[int]) -> int:
+    """Code of a line given states of its fields."""
+    return sum(state * power for state, power in zip(states, POWERS))
+
+
+@lru_cache(maxsize=None)
+def shape_table() -> numpy.ndarray:
+    """Shape values indexed by line code.
+
+    The center of a line is considered player's stone unless it is blocked, so the table gives the shape of
+    an existing stone as well as of a move to an empty cell.
+    """
+    codes = numpy.arange(3 ** LENGTH)
+    states = codes[:, numpy.newaxis] // numpy.array(POWERS) % 3
+    states[:, RADIUS] = numpy.where(states[:, RADIUS] == BLOCKED, BLOCKED, OWN)
+    shapes = numpy.zeros(len(codes), dtype=numpy.uint8)
+    for shape, found in _shapes(states):
+        numpy.maximum(shapes, found * numpy.uint8(shape.value), out=shapes)
+    shapes[states[:, RADIUS] == BLOCKED] = Shape.none.value
+    shapes.flags.writeable = False
+    return shapes
+
+
+def _shapes(states: numpy.ndarray) -> t.Iterator[t.Tuple[Shape, numpy.ndarray]]:
+    """Masks of lines in which the center forms each shape."""
+    for start in range(RADIUS + 1):
+        window = states[:, start:start + 5]
+        own = (window == OWN).sum(axis=1)
+        free = (window != BLOCKED).all(axis=1)
+        for shape, stones in ((Shape.five, 5), (Shape.four, 4), (Shape.three, 3), (Shape.two, 2), (Shape.one, 1)):
+            yield shape, free & (own == stones)
+    for start in range(RADIUS):
+        ends = (states[:, start] == OPEN) & (states[:, start + 5] == OPEN)
+        inner = states[:, start + 1:start + 5]
+        own = (inner == OWN).sum(axis=1)
+        free = ends & (inner != BLOCKED).all(axis=1)
+        yield Shape.open_four, free & (own == 4)
+        yield Shape.open_three, free & (own == 3)
+
+
+@lru_cache(maxsize=None)
+def score_table() -> numpy.ndarray:
+    """Shape scores indexed by line code."""
+    scores = numpy.array([SHAPE_SCORES[shape] for shape in Shape], dtype=numpy.int64)[shape_table()]
+    scores.flags.writeable = False
+    return scores
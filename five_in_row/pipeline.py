@@ -0,0 +1,131 @@
+"""Streaming analysis of every position of many games."""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from five_in_row.analysis import IncrementalAnalysis
+from five_in_row.model import Board, Player
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from concurrent.futures import Future
+    from five_in_row.analysis import Sequence
+    from five_in_row.model import Coord
+
+    Moves = t.Iterable[t.Tuple[Coord, Player]]
+
+
+class PositionAnalysis:
+    """Analysis of a position reached by a move of a game."""
+    def __init__(
+        self,
+        game: int,
+        turn: int,
+        move: Coord,
+        player: Player,
+        sequences: t.Dict[Player, t.List[Sequence]],
+        center_distances: t.Dict[Player, float]
+    ) -> None:
+        self.game = game
+        self.turn = turn
+        self.move = move
+        self.player = player
+        self.sequences = sequences
+        self.center_distances = center_distances
+
+    def __repr__(self) -> str:
+        """String representation of PositionAnalysis."""
+        return f'<game {self.game} turn {self.turn}: {self.player} {self.move}>'
+
+
+def analyse_game(analysis: IncrementalAnalysis, moves: Moves, game: int = 0) -> t.Iterator[PositionAnalysis]:
+    """Play moves on empty board of the analysis one by one and analyse position after each of them.
+
+    The board is emptied again when the generator finishes or is closed.
+    """
+    played = 0
+    try:
+        for move, player in moves:
+            analysis.play(move, player)
+            played += 1
+            yield PositionAnalysis(
+                game,
+                played,
+                move,
+                player,
+                {p: analysis.find_sequences(p) for p in Player},
+                {p: analysis.get_average_center_distance(p) for p in Player}
+            )
+    finally:
+        for _ in range(played):
+            analysis.undo()
+
+
+def analyse_games(
+    games: t.Iterable[Moves],
+    x_bounds: t.Tuple[int, int],
+    y_bounds: t.Tuple[int, int],
+    workers: int = 0,
+    chunksize: int = 16
+) -> t.Iterator[PositionAnalysis]:
+    """Lazily analyse every position of every game, in order of games and moves.
+
+    Games are iterables of (Coord, Player) moves, e.g. `records.GameRecord`s, played on a board of given bounds.
+    All games are replayed on a single reused board. With `workers` set, chunks of `chunksize` games are analysed
+    in worker processes, only a few chunks ahead of the consumer, so memory use doesn't grow with number of games.
+    """
+    if workers:
+        return _analyse_games_in_workers(games, x_bounds, y_bounds, workers, chunksize)
+    return _analyse_games(games, x_bounds, y_bounds)
+
+
+def _analyse_games(
+    games: t.Iterable[Moves],
+    x_bounds: t.Tuple[int, int],
+    y_bounds: t.Tuple[int, int],
+    first_game: int = 0
+) -> t.Iterator[PositionAnalysis]:
+    """Analyse every position of games one by one on a single board."""
+    analysis = IncrementalAnalysis(Board(x_bounds, y_bounds))
+    try:
+        for game, moves in enumerate(games, first_game):
+            yield from analyse_game(analysis, moves, game)
+    finally:
+        analysis.close()
+
+
+def _analyse_chunk(
+    games: t.List[t.List[t.Tuple[Coord, Player]]],
+    x_bounds: t.Tuple[int, int],
+    y_bounds: t.Tuple[int, int],
+    first_game: int
+) -> t.List[PositionAnalysis]:
+    """Analyse every position of a chunk of games. Runs in worker process."""
+    return list(_analyse_games(games, x_bounds, y_bounds, first_game))
+
+
+def _analyse_games_in_workers(
+    games: t.Iterable[Moves],
+    x_bounds: t.Tuple[int, int],
+    y_bounds: t.Tuple[int, int],
+    workers: int,
+    chunksize: int
+) -> t.Iterator[PositionAnalysis]:
+    """Analyse chunks of games in worker processes keeping at most two chunks per worker in flight."""
+    pending: t.Deque[Future[t.List[PositionAnalysis]]] = deque()
+    games = iter(games)
+    with ProcessPoolExecutor(workers) as executor:
+        try:
+            first_game = 0
+            chunk = [list(moves) for moves in islice(games, chunksize)]
+            while chunk:
+                pending.append(executor.submit(_analyse_chunk, chunk, x_bounds, y_bounds, first_game))
+                first_game += len(chunk)
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+                chunk = [list(moves) for moves in islice(games, chunksize)]
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,252 @@
+"""Compact binary serialization of boards and files of game records."""
+from __future__ import annotations
+import numpy
+import os
+from five_in_row.model import Board, Coord, Player, PLAYERS
+from five_in_row import types as t
+
+
+BOARD_MAGIC = b'5IR2'
+"""First bytes of a serialized board."""
+
+RECORDS_MAGIC = b'5IRGAME2'
+"""First and last bytes of a file of game records."""
+
+PACKED = 0
+"""Board encoding storing every field in 2 bits, four fields per byte row by row."""
+
+MOVES = 1
+"""Board encoding storing list of occupied fields."""
+
+BOARD_HEADER = numpy.dtype([
+    ('magic', 'S4'), ('encoding', 'u1'), ('reserved', 'V3'),
+    ('min_x', '<i4'), ('max_x', '<i4'), ('min_y', '<i4'), ('max_y', '<i4')
+])
+"""Header of a serialized board."""
+
+MOVE = numpy.dtype([('x', '<u2'), ('y', '<u2'), ('player', 'u1')])
+"""Offsets of a single move from the minimum bounds stored in the header, and player code of the move."""
+
+MAX_OFFSET = numpy.iinfo(numpy.uint16).max
+"""Largest offset of a move from the minimum bounds."""
+
+RECORD_HEADER = numpy.dtype([('min_x', '<i4'), ('max_x', '<i4'), ('min_y', '<i4'), ('max_y', '<i4'), ('moves', '<u4')])
+"""Header of a game record, followed by its moves."""
+
+FOOTER = numpy.dtype([('index', '<u8'), ('records', '<u8'), ('magic', 'S8')])
+"""Footer of a file of game records pointing to index of record offsets."""
+
+
+def dump_board(board: Board) -> bytes:
+    """Serialize board into bytes.
+
+    The shorter of two encodings is used: 2 bits per field, or a list of occupied fields for sparsely
+    filled boards whose fields fit into `MOVE`. Bounds of `board.to_array()` are stored in the header.
+    """
+    codes = board.to_array()
+    height, width = codes.shape
+    first, last = board.coord(0, 0), board.coord(width - 1, height - 1)
+    ys, xs = numpy.nonzero(codes)
+    if len(xs) * MOVE.itemsize < (codes.size + 3) // 4 and max(width, height) <= MAX_OFFSET + 1:
+        encoding, payload = MOVES, _encode_moves(xs, ys, codes[ys, xs]).tobytes()
+    else:
+        encoding, payload = PACKED, _pack(codes)
+    header = numpy.array([(BOARD_MAGIC, encoding, b'', first.x, last.x, first.y, last.y)], dtype=BOARD_HEADER)
+    return header.tobytes() + payload
+
+
+def load_board(data: bytes, board: t.Optional[Board] = None) -> Board:
+    """Place stones of a serialized board on given empty board or on a new Board of stored bounds.
+
+    Fields are read from `data` using `numpy.frombuffer`, without copying it.
+    """
+    header = numpy.frombuffer(data, dtype=BOARD_HEADER, count=1)[0]
+    if header['magic'] != BOARD_MAGIC:
+        raise ValueError('Data is not a serialized board.')
+    x_bounds, y_bounds = (int(header['min_x']), int(header['max_x'])), (int(header['min_y']), int(header['max_y']))
+    if board is None:
+        board = Board(x_bounds, y_bounds)
+    if header['encoding'] == MOVES:
+        moves = numpy.frombuffer(data, dtype=MOVE, offset=BOARD_HEADER.itemsize)
+        _place_moves(board, moves, x_bounds[0], y_bounds[0])
+    else:
+        width, height = x_bounds[1] - x_bounds[0] + 1, y_bounds[1] - y_bounds[0] + 1
+        codes = _unpack(numpy.frombuffer(data, dtype=numpy.uint8, offset=BOARD_HEADER.itemsize), width, height)
+        ys, xs = numpy.nonzero(codes)
+        _place(board, xs + x_bounds[0], ys + y_bounds[0], codes[ys, xs])
+    return board
+
+
+def _pack(codes: numpy.ndarray) -> bytes:
+    """Pack int8 player codes into 2 bits each."""
+    flat = numpy.zeros((codes.size + 3) // 4 * 4, dtype=numpy.uint8)
+    flat[:codes.size] = codes.ravel()
+    quads = flat.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6).astype(numpy.uint8).tobytes()
+
+
+def _unpack(packed: numpy.ndarray, width: int, height: int) -> numpy.ndarray:
+    """Unpack 2-bit player codes into array of given size."""
+    quads = numpy.stack([packed >> shift & 3 for shift in (0, 2, 4, 6)], axis=1)
+    return quads.ravel()[:width * height].reshape(height, width)
+
+
+def _encode_moves(xs: numpy.ndarray, ys: numpy.ndarray, codes: numpy.ndarray) -> numpy.ndarray:
+    """Encode moves given by offsets from the minimum bounds into an array of `MOVE` records.
+
+    Raises ValueError if an offset is negative or does not fit into `MOVE`.
+    """
+    if len(xs) and (min(xs.min(), ys.min()) < 0 or max(xs.max(), ys.max()) > MAX_OFFSET):
+        raise ValueError(f'Moves have to be within {MAX_OFFSET} fields from the minimum bounds.')
+    moves = numpy.empty(len(xs), dtype=MOVE)
+    moves['x'], moves['y'], moves['player'] = xs, ys, codes
+    return moves
+
+
+def _place_moves(board: Board, moves: numpy.ndarray, min_x: int, min_y: int) -> None:
+    """Place `MOVE` records on the board, offsets are counted from given minimum bounds."""
+    _place(board, moves['x'].astype(numpy.int64) + min_x, moves['y'].astype(numpy.int64) + min_y, moves['player'])
+
+
+def _place(board: Board, xs: numpy.ndarray, ys: numpy.ndarray, codes: numpy.ndarray) -> None:
+    """Place stones on board."""
+    for x, y, code in zip(xs.tolist(), ys.tolist(), codes.tolist()):
+        board[Coord(x, y)] = PLAYERS[code]
+
+
+class GameRecord:
+    """Moves of a single game played on a board of given bounds.
+
+    Moves are kept in a numpy array of `MOVE` records, which can be a view into a memory-mapped file.
+    """
+    def __init__(self, x_bounds: t.Tuple[int, int], y_bounds: t.Tuple[int, int], moves: numpy.ndarray) -> None:
+        self.x_bounds = x_bounds
+        self.y_bounds = y_bounds
+        self.moves = moves
+
+    @classmethod
+    def from_moves(
+        cls,
+        x_bounds: t.Tuple[int, int],
+        y_bounds: t.Tuple[int, int],
+        moves: t.List[t.Tuple[Coord, Player]]
+    ) -> GameRecord:
+        """Create record from list of played moves.
+
+        Raises ValueError if a move is out of the bounds or further than `MAX_OFFSET` from the minimum bounds.
+        """
+        xs = numpy.array([coord.x - x_bounds[0] for coord, _ in moves], dtype=numpy.int64)
+        ys = numpy.array([coord.y - y_bounds[0] for coord, _ in moves], dtype=numpy.int64)
+        codes = numpy.array([player.code for _, player in moves], dtype=numpy.uint8)
+        if len(xs) and (xs.max() > x_bounds[1] - x_bounds[0] or ys.max() > y_bounds[1] - y_bounds[0]):
+            raise ValueError('Moves have to be within bounds of the record.')
+        return cls(x_bounds, y_bounds, _encode_moves(xs, ys, codes))
+
+    def __len__(self) -> int:
+        """Number of moves."""
+        return len(self.moves)
+
+    def __iter__(self) -> t.Iterator[t.Tuple[Coord, Player]]:
+        """Iterate over moves in format (Coord, Player)."""
+        min_x, min_y = self.x_bounds[0], self.y_bounds[0]
+        for x, y, code in self.moves.tolist():
+            yield Coord(x + min_x, y + min_y), Player.x if code == Player.x.code else Player.o
+
+    def __eq__(self, other: object) -> bool:
+        """Returns True if given object is record of the same game."""
+        return isinstance(other, GameRecord) \
+            and self.x_bounds == other.x_bounds \
+            and self.y_bounds == other.y_bounds \
+            and numpy.array_equal(self.moves, other.moves)
+
+    def replay(self, board: t.Optional[Board] = None) -> Board:
+        """Play all moves on given empty board or on a new Board of recorded bounds."""
+        if board is None:
+            board = Board(self.x_bounds, self.y_bounds)
+        _place_moves(board, self.moves, self.x_bounds[0], self.y_bounds[0])
+        return board
+
+
+class RecordWriter:
+    """Writes game records one by one into a file.
+
+    Records are streamed to the file as they are written. Closing the writer appends index of record offsets,
+    which `RecordReader` uses for random access.
+    """
+    def __init__(self, path: t.Union[str, os.PathLike]) -> None:
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(RECORDS_MAGIC)
+        self._offsets: t.List[int] = []
+
+    def __enter__(self) -> RecordWriter:
+        """Use writer as a context manager closing the file on exit."""
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        """Close the file."""
+        self.close()
+
+    def write(self, record: GameRecord) -> None:
+        """Append record to the file."""
+        self._offsets.append(self._file.tell())
+        header = numpy.array([(*record.x_bounds, *record.y_bounds, len(record))], dtype=RECORD_HEADER)
+        self._file.write(header.tobytes())
+        self._file.write(record.moves.astype(MOVE, copy=False).tobytes())
+
+    def close(self) -> None:
+        """Write index of records and close the file."""
+        if self._file.closed:
+            return
+        index = self._file.tell()
+        self._file.write(numpy.array(self._offsets, dtype='<u8').tobytes())
+        self._file.write(numpy.array([(index, len(self._offsets), RECORDS_MAGIC)], dtype=FOOTER).tobytes())
+        self._file.close()
+
+
+class RecordReader:
+    """Random access to game records in a file written by `RecordWriter`.
+
+    The file is memory-mapped, so opening it takes constant time and moves of records are read
+    from the page cache without copying.
+    """
+    def __init__(self, path: t.Union[str, os.PathLike]) -> None:
+        self.path = path
+        self._data = numpy.memmap(path, dtype=numpy.uint8, mode='r')
+        if self._data.size < len(RECORDS_MAGIC) + FOOTER.itemsize \
+                or bytes(self._data[:len(RECORDS_MAGIC)]) != RECORDS_MAGIC:
+            raise ValueError(f'{path} is not a file of game records.')
+        footer = self._data[-FOOTER.itemsize:].view(FOOTER)[0]
+        if footer['magic'] != RECORDS_MAGIC:
+            raise ValueError(f'{path} is truncated, writer was not closed.')
+        self._offsets = self._data[int(footer['index']):][:int(footer['records']) * 8].view('<u8')
+
+    def __enter__(self) -> RecordReader:
+        """Use reader as a context manager."""
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        """Release the file."""
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory-mapped file. Records read before keep their moves."""
+        del self._data, self._offsets
+
+    def __len__(self) -> int:
+        """Number of records in the file."""
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> GameRecord:
+        """Get record by its position in the file."""
+        offset = int(self._offsets[index])
+        header = self._data[offset:offset + RECORD_HEADER.itemsize].view(RECORD_HEADER)[0]
+        start = offset + RECORD_HEADER.itemsize
+        moves = self._data[start:start + int(header['moves']) * MOVE.itemsize].view(MOVE)
+        x_bounds, y_bounds = (int(header['min_x']), int(header['max_x'])), (int(header['min_y']), int(header['max_y']))
+        return GameRecord(x_bounds, y_bounds, moves)
+
+    def __iter__(self) -> t.Iterator[GameRecord]:
+        """Iterate over records in order they were written."""
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,366 @@
+"""Threats and threat-space search for forced wins."""
+from __future__ import annotations
+import time
+from collections import Counter
+from enum import Enum
+from five_in_row.analysis import IncrementalAnalysis
+from five_in_row.cache import LRUCache
+from five_in_row.engine import SearchTimeout
+from five_in_row.model import Coord, Player
+from five_in_row import types as t
+
+if t.TYPE_CHECKING:
+    from five_in_row.analysis import Analysis, Sequence
+    from five_in_row.model import Board, Direction
+
+    Window = t.Tuple[Direction, t.List[Coord], t.List[t.Optional[Player]]]
+    Threats = t.Dict[t.Tuple[Direction, t.FrozenSet[Coord]], 'Threat']
+
+
+MAX_WINDOW = 6
+"""Number of fields of the longest line a threat is recognized in."""
+
+
+class ThreatType(Enum):
+    """Kind of threat, stronger threats have higher value."""
+    open_three = 1
+    four = 2
+    open_four = 3
+    five = 4
+
+
+class Threat:
+    """Stones of a player in a line that force the opponent to respond.
+
+    `gains` are empty fields where the player upgrades the threat to a five (four, open four) or to an open four
+    (open three). `defences` are empty fields where the opponent can stop the threat.
+    """
+    def __init__(
+        self,
+        player: Player,
+        kind: ThreatType,
+        direction: Direction,
+        stones: t.List[Coord],
+        gains: t.Set[Coord],
+        defences: t.Set[Coord]
+    ) -> None:
+        self.player = player
+        self.kind = kind
+        self.direction = direction
+        self.stones = stones
+        self.gains = gains
+        self.defences = defences
+
+    def __repr__(self) -> str:
+        """String representation of Threat."""
+        return f'<{self.kind.name} {self.player} {self.direction.name}: {",".join(str(s) for s in self.stones)}>'
+
+
+def _row_order(coord: Coord) -> t.Tuple[int, int]:
+    """Sort key ordering fields row by row."""
+    return coord.y, coord.x
+
+
+def _check_deadline(deadline: t.Optional[float]) -> None:
+    """Raise SearchTimeout if deadline (a `time.monotonic()` value) has passed."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise SearchTimeout()
+
+
+def _windows(analysis: Analysis, player: Player, length: int, deadline: t.Optional[float] = None) -> t.List[Window]:
+    """Lines of given length on the board containing player's stones and no opponent's stones.
+
+    Lines are memoized in cache of the analysis if it has one. Scanning the board raises SearchTimeout once
+    `deadline` passes.
+    """
+    windows: t.List[Window] = analysis.cached(
+        ('threat_windows', player, length), lambda: list(_find_windows(analysis, player, length, deadline))
+    )
+    return windows
+
+
+def _find_windows(
+    analysis: Analysis,
+    player: Player,
+    length: int,
+    deadline: t.Optional[float]
+) -> t.Iterator[Window]:
+    """Find lines of given length on the board containing player's stones and no opponent's stones."""
+    seen, opponent, margin = set(), player.opponent, MAX_WINDOW - length
+    for direction, fields, values in _lines(analysis, player, deadline):
+        _check_deadline(deadline)
+        for first in range(margin, len(fields) - length - margin + 1):
+            last = first + length
+            if (direction, fields[first]) not in seen and opponent not in values[first:last]:
+                seen.add((direction, fields[first]))
+                yield direction, fields[first:last], values[first:last]
+
+
+def _lines(analysis: Analysis, player: Player, deadline: t.Optional[float]) -> t.List[Window]:
+    """Fields of all player's sequences extended on both ends so that they cover all windows containing them.
+
+    Lines are memoized in cache of the analysis if it has one.
+    """
+    lines: t.List[Window] = analysis.cached(('threat_lines', player), lambda: _find_lines(analysis, player, deadline))
+    return lines
+
+
+def _find_lines(analysis: Analysis, player: Player, deadline: t.Optional[float]) -> t.List[Window]:
+    """Extend all player's sequences, checking the deadline after each of them."""
+    lines = []
+    for sequence in analysis.find_sequences(player):
+        _check_deadline(deadline)
+        lines.append(_line(analysis.board, player, sequence))
+    return lines
+
+
+def _line(board: Board, player: Player, sequence: Sequence) -> Window:
+    """Fields of a sequence extended on both ends and their values.
+
+    Fields out of the board are blocked, just like fields of the opponent.
+    """
+    start, dx, dy = sequence.start, sequence.direction.x, sequence.direction.y
+    fields, values, margin = [], [], MAX_WINDOW - 1
+    get, contains, blocked = board.get_xy, board.contains_xy, player.opponent
+    for step in range(-margin, len(sequence) + margin):
+        x, y = start.x + step * dx, start.y + step * dy
+        fields.append(Coord(x, y))
+        values.append(get(x, y) if contains(x, y) else blocked)
+    return sequence.direction, fields, values
+
+
+def winning_moves(analysis: Analysis, player: Player, deadline: t.Optional[float] = None) -> t.Set[Coord]:
+    """Empty fields where player completes a five. Raises SearchTimeout once `deadline` passes."""
+    return {
+        field
+        for _, fields, values in _windows(analysis, player, 5, deadline) if values.count(None) == 1
+        for field in _empty(fields, values)
+    }
+
+
+def four_moves(analysis: Analysis, player: Player, deadline: t.Optional[float] = None) -> t.Set[Coord]:
+    """Empty fields where player creates a four (including an open four). Raises SearchTimeout once `deadline`
+    passes.
+    """
+    return set(_four_move_counts(analysis, player, deadline))
+
+
+def three_moves(analysis: Analysis, player: Player, deadline: t.Optional[float] = None) -> t.Set[Coord]:
+    """Empty fields where player creates an open three. Raises SearchTimeout once `deadline` passes."""
+    return set(_three_move_counts(analysis, player, deadline))
+
+
+def _four_move_counts(analysis: Analysis, player: Player, deadline: t.Optional[float] = None) -> t.Dict[Coord, int]:
+    """Number of fours player creates by playing on each empty field."""
+    return Counter(
+        field
+        for _, fields, values in _windows(analysis, player, 5, deadline) if values.count(None) == 2
+        for field in _empty(fields, values)
+    )
+
+
+def _three_move_counts(
+    analysis: Analysis,
+    player: Player,
+    deadline: t.Optional[float] = None
+) -> t.Dict[Coord, int]:
+    """Number of open threes player creates by playing on each empty field."""
+    return Counter(
+        field
+        for _, fields, values in _windows(analysis, player, 6, deadline) if _is_open(values) and values.count(None) == 4
+        for field in _empty(fields[1:-1], values[1:-1])
+    )
+
+
+def _empty(fields: t.List[Coord], values: t.List[t.Optional[Player]]) -> t.List[Coord]:
+    """Empty fields of a window."""
+    return [field for field, value in zip(fields, values) if value is None]
+
+
+def _is_open(values: t.List[t.Optional[Player]]) -> bool:
+    """Returns True if both ends of a window are empty."""
+    return values[0] is None and values[-1] is None
+
+
+def find_threats(analysis: Analysis, player: Player, deadline: t.Optional[float] = None) -> t.List[Threat]:
+    """Find all threats of a player, the strongest first.
+
+    Broken patterns such as X_XXX (four) or X_XX (open three) are recognized as well. Raises SearchTimeout once
+    `deadline` (a `time.monotonic()` value) passes.
+    """
+    threats: Threats = {}
+    for sequence in analysis.find_sequences(player):
+        if sequence.closed:
+            _add_threat(threats, Threat(player, ThreatType.five, sequence.direction, sequence.fields, set(), set()))
+    for direction, fields, values in _windows(analysis, player, 5, deadline):
+        _add_four(threats, player, direction, fields, values)
+    for direction, fields, values in _windows(analysis, player, 6, deadline):
+        if _is_open(values):
+            _add_open_threat(threats, player, direction, fields, values)
+    return sorted(threats.values(), key=lambda threat: (-threat.kind.value, _row_order(threat.stones[0])))
+
+
+def _add_four(
+    threats: Threats,
+    player: Player,
+    direction: Direction,
+    fields: t.List[Coord],
+    values: t.List[t.Optional[Player]]
+) -> None:
+    """Add four found in a window of five fields."""
+    empty = set(_empty(fields, values))
+    if len(empty) == 1:
+        stones = [field for field in fields if field not in empty]
+        _add_threat(threats, Threat(player, ThreatType.four, direction, stones, empty, set(empty)))
+
+
+def _add_open_threat(
+    threats: Threats,
+    player: Player,
+    direction: Direction,
+    fields: t.List[Coord],
+    values: t.List[t.Optional[Player]]
+) -> None:
+    """Add open four or open three found in a window with both ends empty."""
+    empty = set(_empty(fields, values))
+    stones = [field for field in fields if field not in empty]
+    if len(stones) == 4:
+        _add_threat(threats, Threat(player, ThreatType.open_four, direction, stones, empty, set(empty)))
+    elif len(stones) == 3:
+        gains = empty - {fields[0], fields[-1]}
+        _add_threat(threats, Threat(player, ThreatType.open_three, direction, stones, gains, empty))
+
+
+def _add_threat(threats: Threats, threat: Threat) -> None:
+    """Add threat, replace weaker threat of the same stones, merge with threat of the same kind and stones.
+
+    Threats are added from the weakest pattern lines up, so a weaker threat never follows a stronger one.
+    """
+    key = (threat.direction, frozenset(threat.stones))
+    current = threats.get(key)
+    if current is None or current.kind.value < threat.kind.value:
+        threats[key] = threat
+    else:
+        current.gains |= threat.gains
+        current.defences |= threat.defences
+
+
+class ThreatSearch:
+    """Search for a forced win using only threatening moves.
+
+    The attacker plays only moves creating a five, a four or (with `threes` set) an open three. The defender
+    answers by blocking the threat or by a four of its own. A win is proven when every defence loses within
+    `max_depth` moves of the attacker. Shorter wins are searched first and moves creating more threats
+    at once are tried first. Search gives up when `time_limit` (in seconds) runs out. Threats of
+    the last `cache_size` positions visited by a search are memoized.
+    """
+    def __init__(
+        self,
+        max_depth: int = 8,
+        time_limit: float = 1.0,
+        threes: bool = True,
+        cache_size: int = 4096
+    ) -> None:
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.threes = threes
+        self.cache_size = cache_size
+        self.nodes = 0
+        self.timed_out = False
+
+    def find_win(
+        self,
+        board: Board,
+        player: Player,
+        deadline: t.Optional[float] = None,
+        analysis: t.Optional[IncrementalAnalysis] = None
+    ) -> t.Optional[Coord]:
+        """Find move starting a forced win of a player.
+
+        Search stops when `time_limit` runs out or at `deadline` (a `time.monotonic()` value), whichever comes
+        first. Given `analysis` of the board is used instead of analysing the board again, threats are then
+        memoized in its cache. Returns None if there is no forced win within `max_depth` threats or if time ran
+        out (`timed_out` is set).
+        """
+        self._deadline = time.monotonic() + self.time_limit
+        if deadline is not None:
+            self._deadline = min(self._deadline, deadline)
+        self._analysis = analysis if analysis is not None else IncrementalAnalysis(board, LRUCache(self.cache_size))
+        self._refuted: t.Set[t.Tuple[int, Player, int]] = set()
+        self.nodes = 0
+        self.timed_out = False
+        try:
+            return self._deepen(player)
+        except SearchTimeout:
+            self.timed_out = True
+            return None
+        finally:
+            if analysis is None:
+                self._analysis.close()
+
+    def _deepen(self, attacker: Player) -> t.Optional[Coord]:
+        """Search for wins within increasing number of threats."""
+        for depth in range(1, self.max_depth + 1):
+            move = self._attack(attacker, depth)
+            if move is not None:
+                return move
+        return None
+
+    def _attack(self, attacker: Player, depth: int) -> t.Optional[Coord]:
+        """Find attacker's move winning by force within given number of threats."""
+        self.nodes += 1
+        _check_deadline(self._deadline)
+        wins = winning_moves(self._analysis, attacker, self._deadline)
+        if wins:
+            return min(wins, key=_row_order)
+        key = (self._analysis.board.zobrist_hash, attacker, depth)
+        if depth == 0 or key in self._refuted:
+            return None
+        for move in self._attacking_moves(attacker):
+            if self._play(move, attacker, lambda: self._defend(attacker, depth - 1)):
+                return move
+        self._refuted.add(key)
+        return None
+
+    def _attacking_moves(self, attacker: Player) -> t.List[Coord]:
+        """Threatening moves of attacker, fours first. When defender threatens five, only the blocking move."""
+        fours = _four_move_counts(self._analysis, attacker, self._deadline)
+        threes = _three_move_counts(self._analysis, attacker, self._deadline) if self.threes else {}
+        moves = sorted(fours, key=lambda move: (-fours[move] - threes.get(move, 0), _row_order(move)))
+        moves += sorted(threes.keys() - fours.keys(), key=lambda move: (-threes[move], _row_order(move)))
+        forced = winning_moves(self._analysis, attacker.opponent, self._deadline)
+        if forced:
+            return [move for move in moves if move in forced] if len(forced) == 1 else []
+        return moves
+
+    def _defend(self, attacker: Player, depth: int) -> bool:
+        """Returns True if attacker wins against every defence of the threats on board.
+
+        Defender has no five to complete, attacker threatens only after blocking it.
+        """
+        defender = attacker.opponent
+        defences = self._defences(attacker)
+        return bool(defences) and all(
+            self._play(move, defender, lambda: self._attack(attacker, depth) is not None)
+            for move in sorted(defences, key=_row_order)
+        )
+
+    def _defences(self, attacker: Player) -> t.Set[Coord]:
+        """Moves of defender worth considering against attacker's threats.
+
+        A four must be blocked. Without fours, all threats are open threes which can also be answered by a four.
+        """
+        wins = winning_moves(self._analysis, attacker, self._deadline)
+        if wins:
+            return wins
+        threats = find_threats(self._analysis, attacker, self._deadline)
+        defences = {field for threat in threats for field in threat.defences}
+        return defences | four_moves(self._analysis, attacker.opponent, self._deadline) if defences else defences
+
+    def _play(self, move: Coord, player: Player, search: t.Callable[[], bool]) -> bool:
+        """Play move, run search in resulting position and take the move back."""
+        self._analysis.play(move, player)
+        try:
+            return search()
+        finally:
+            self._analysis.undo()
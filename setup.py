@@ -50,6 +50,7 @@ def main() -> None:
                 'pytest-mock',
                 'pytest-benchmark',
                 'requests-mock',
+                'aiohttp',
                 'mypy',
                 'flake8',
                 'flake8-colors',
@@ -58,6 +59,9 @@ def main() -> None:
                 'flake8-todo',
                 'twine',
             ],
+            'async': [
+                'aiohttp'
+            ],
             'examples': [
                 'notebook',
                 'pandas'
@@ -1,106 +1,135 @@
+import pickle
 import pytest
-from five_in_row.model import Player, Coord, Board, Direction
-from five_in_row.analysis import Sequence, Analysis
-from random import shuffle
+import numpy
+from five_in_row.model import Player, Coord, Board, BitBoard, SparseBoard, Direction
+from five_in_row.analysis import Sequence, Analysis, IncrementalAnalysis, shift, run_lengths, line_codes
+from five_in_row.patterns import SHAPE_SCORES, Shape, OPEN, OWN, BLOCKED, LENGTH
+from five_in_row.cache import LRUCache
+from random import shuffle, Random
+from tests.factories import random_board
 
 
 @pytest.mark.unit
 class TestSequence:
     def test_attributes(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         assert s.player is Player.x
         assert s.direction is Direction.right
         assert s.fields == [Coord(0, 0), Coord(1, 0)]
 
     def test_sequence_length(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         assert len(s) == 2
 
     def test_sequence_to_string(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         assert str(s) == '(Direction.right: <0:0>,<1:0>) <0-0>'
 
     def test_sequence_with_open_ends_to_string(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         s.start_open_points = 3
         s.end_open_points = 5
         assert str(s) == '(Direction.right: <0:0>,<1:0>) <3-5 closable>'
 
     def test_sequence_repre(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         assert s.__repr__() == '(Direction.right: <0:0>,<1:0>) <0-0>'
 
     def test_sequence_repre_with_open_ends(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         s.start_open_points = 3
         s.end_open_points = 5
         assert s.__repr__() == '(Direction.right: <0:0>,<1:0>) <3-5 closable>'
 
     def test_detect_start_end_of_sequence(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 3)
         assert s.start == Coord(0, 0)
         assert s.end == Coord(2, 0)
 
     def test_count_missing_points(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 3)
         assert s.missing_points == 2
 
     def test_count_missing_points_complete_sequence(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0), Coord(3, 0), Coord(4, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 5)
         assert s.missing_points == 0
 
     def test_count_open_points(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 3)
         s.start_open_points = 3
         s.end_open_points = 5
         assert s.surrounding_open_points == 8
 
     def test_complete_sequence_is_closable_and_closed(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0), Coord(3, 0), Coord(4, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 5)
         assert s.closable
         assert s.closed
 
     def test_incomplete_sequence_is_closable(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 3)
         s.start_open_points = 3
         s.end_open_points = 5
         assert s.closable
 
     def test_incomplete_sequence_is_not_closable(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0), Coord(2, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 3)
         assert not s.closable
 
     def test_detect_start_end_of_sequence_of_single_point_sequence(self):
-        s = Sequence(Player.x, Direction.right, [Coord(0, 0)])
+        s = Sequence(Player.x, Direction.right, Coord(0, 0))
         assert s.start == Coord(0, 0)
         assert s.end == Coord(0, 0)
 
     def test_sum_sequences(self):
-        s1 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
-        s2 = Sequence(Player.x, Direction.right, [Coord(2, 0), Coord(3, 0)])
+        s1 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        s2 = Sequence(Player.x, Direction.right, Coord(2, 0), 2)
         s3 = s1 + s2
         assert s3.fields == [Coord(0, 0), Coord(1, 0), Coord(2, 0), Coord(3, 0)]
         assert s3.player is Player.x
         assert s3.direction is Direction.right
 
     def test_sequence_equal(self):
-        s1 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
-        s2 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s1 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        s2 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
         assert s1 == s2
 
     def test_sequence_not_equal_with_different_player(self):
-        s1 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
-        s2 = Sequence(Player.o, Direction.right, [Coord(0, 0), Coord(1, 0)])
+        s1 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        s2 = Sequence(Player.o, Direction.right, Coord(0, 0), 2)
         assert s1 != s2
 
     def test_sequence_not_equal_with_different_coordinates(self):
-        s1 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
-        s2 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(0, 1)])
+        s1 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        s2 = Sequence(Player.x, Direction.right, Coord(0, 1), 2)
         assert s1 != s2
 
+    def test_sequence_not_equal_with_different_length(self):
+        s1 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        s2 = Sequence(Player.x, Direction.right, Coord(0, 0), 3)
+        assert s1 != s2
+
+    def test_fields_created_lazily(self):
+        s = Sequence(Player.x, Direction.down_left, Coord(5, 0), 3)
+        assert s._fields is None
+        assert s.fields == [Coord(5, 0), Coord(4, 1), Coord(3, 2)]
+        assert s.fields is s.fields
+        assert s.end == Coord(3, 2)
+
+    def test_slotted(self):
+        s = Sequence(Player.x, Direction.right, Coord(0, 0))
+        with pytest.raises(AttributeError):
+            s.other = 1
+
+    def test_pickle(self):
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 4)
+        s.end_open_points = 1
+        copy = pickle.loads(pickle.dumps(s))
+        assert copy == s
+        assert copy.end_open_points == 1
+
     def test_sequence_not_equal_with_different_direction(self):
-        s1 = Sequence(Player.x, Direction.right, [Coord(0, 0), Coord(1, 0)])
-        s2 = Sequence(Player.x, Direction.left, [Coord(0, 0), Coord(1, 0)])
+        s1 = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        s2 = Sequence(Player.x, Direction.left, Coord(0, 0), 2)
         assert s1 != s2
 
 
@@ -117,24 +146,23 @@ class TestAnalysis:
         a = Analysis(b)
 
         assert a.find_sequences(Player.x) == [
-            Sequence(Player.x, Direction.right, [Coord(10, 5), Coord(11, 5), Coord(12, 5), Coord(13, 5), Coord(14, 5)]),
-            Sequence(Player.x, Direction.right, [Coord(11, 6)]),
-            Sequence(Player.x, Direction.down_right, [Coord(10, 5), Coord(11, 6)]),
-            Sequence(Player.x, Direction.down_right, [Coord(11, 5)]),
-            Sequence(Player.x, Direction.down_right, [Coord(12, 5)]),
-            Sequence(Player.x, Direction.down_right, [Coord(13, 5)]),
-            Sequence(Player.x, Direction.down_right, [Coord(14, 5)]),
-            Sequence(Player.x, Direction.down, [Coord(10, 5)]),
-            Sequence(Player.x, Direction.down, [Coord(11, 5), Coord(11, 6)]),
-            Sequence(Player.x, Direction.down, [Coord(12, 5)]),
-            Sequence(Player.x, Direction.down, [Coord(13, 5)]),
-            Sequence(Player.x, Direction.down, [Coord(14, 5)]),
-            Sequence(Player.x, Direction.up_right, [Coord(10, 5)]),
-            Sequence(Player.x, Direction.up_right, [Coord(11, 5)]),
-            Sequence(Player.x, Direction.up_right, [Coord(12, 5)]),
-            Sequence(Player.x, Direction.up_right, [Coord(13, 5)]),
-            Sequence(Player.x, Direction.up_right, [Coord(14, 5)]),
-            Sequence(Player.x, Direction.up_right, [Coord(11, 6), Coord(12, 5)])
+            Sequence(Player.x, Direction.right, Coord(10, 5), 5),
+            Sequence(Player.x, Direction.right, Coord(11, 6)),
+            Sequence(Player.x, Direction.down_right, Coord(10, 5), 2),
+            Sequence(Player.x, Direction.down_right, Coord(11, 5)),
+            Sequence(Player.x, Direction.down_right, Coord(12, 5)),
+            Sequence(Player.x, Direction.down_right, Coord(13, 5)),
+            Sequence(Player.x, Direction.down_right, Coord(14, 5)),
+            Sequence(Player.x, Direction.down, Coord(10, 5)),
+            Sequence(Player.x, Direction.down, Coord(11, 5), 2),
+            Sequence(Player.x, Direction.down, Coord(12, 5)),
+            Sequence(Player.x, Direction.down, Coord(13, 5)),
+            Sequence(Player.x, Direction.down, Coord(14, 5)),
+            Sequence(Player.x, Direction.up_right, Coord(10, 5)),
+            Sequence(Player.x, Direction.up_right, Coord(11, 5)),
+            Sequence(Player.x, Direction.up_right, Coord(13, 5)),
+            Sequence(Player.x, Direction.up_right, Coord(14, 5)),
+            Sequence(Player.x, Direction.up_right, Coord(11, 6), 2)
         ]
 
     def test_sequence_detection_on_edge(self):
@@ -143,10 +171,10 @@ class TestAnalysis:
         a = Analysis(b)
 
         assert a.find_sequences(Player.x) == [
-            Sequence(Player.x, Direction.right, [Coord(1, 1)]),
-            Sequence(Player.x, Direction.down_right, [Coord(1, 1)]),
-            Sequence(Player.x, Direction.down, [Coord(1, 1)]),
-            Sequence(Player.x, Direction.up_right, [Coord(1, 1)])
+            Sequence(Player.x, Direction.right, Coord(1, 1)),
+            Sequence(Player.x, Direction.down_right, Coord(1, 1)),
+            Sequence(Player.x, Direction.down, Coord(1, 1)),
+            Sequence(Player.x, Direction.up_right, Coord(1, 1))
         ]
 
     def test_sequence_detection_surrounded_by_oponnent(self):
@@ -158,10 +186,10 @@ class TestAnalysis:
         a = Analysis(b)
 
         assert a.find_sequences(Player.x) == [
-            Sequence(Player.x, Direction.right, [Coord(0, 0)]),
-            Sequence(Player.x, Direction.down_right, [Coord(0, 0)]),
-            Sequence(Player.x, Direction.down, [Coord(0, 0)]),
-            Sequence(Player.x, Direction.up_right, [Coord(0, 0)])
+            Sequence(Player.x, Direction.right, Coord(0, 0)),
+            Sequence(Player.x, Direction.down_right, Coord(0, 0)),
+            Sequence(Player.x, Direction.down, Coord(0, 0)),
+            Sequence(Player.x, Direction.up_right, Coord(0, 0))
         ]
 
     def test_sequence_opennes_detection(self):
@@ -219,6 +247,24 @@ class TestAnalysis:
             Coord(16, 14)
         ])
 
+    def test_find_empty_fields_within_radius(self):
+        b = Board((0, 30), (0, 30))
+        b[Coord(15, 15)] = Player.x
+        a = Analysis(b)
+
+        fields = a.find_empty_adjacent_fields(radius=2)
+        assert len(fields) == 24
+        assert Coord(13, 17) in fields
+
+    def test_find_empty_adjacent_fields_follows_moves(self):
+        b = Board((0, 30), (0, 30))
+        a = Analysis(b)
+        assert a.find_empty_adjacent_fields() == set()
+        b[Coord(0, 0)] = Player.x
+        assert a.find_empty_adjacent_fields() == {Coord(1, 0), Coord(0, 1), Coord(1, 1)}
+        b[Coord(0, 0)] = None
+        assert a.find_empty_adjacent_fields() == set()
+
     def test_average_distance_no_fields(self):
         b = Board((0, 30), (0, 30))
         a = Analysis(b)
@@ -244,6 +290,213 @@ class TestAnalysis:
         assert a.get_average_center_distance(Player.x) == pytest.approx(5.222100)
 
 
+@pytest.mark.unit
+class TestCachedAnalysis:
+    def test_cached_sequences(self):
+        cache = LRUCache()
+        b = Board((0, 5), (0, 5))
+        b[Coord(1, 1)] = Player.x
+        a = Analysis(b, cache)
+
+        first = a.find_sequences(Player.x)
+        assert a.find_sequences(Player.x) == first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_cache_follows_position(self):
+        cache = LRUCache()
+        b = Board((0, 5), (0, 5))
+        a = Analysis(b, cache)
+        assert a.find_sequences(Player.x) == []
+        b[Coord(1, 1)] = Player.x
+        assert a.find_sequences(Player.x) == Analysis(b).find_sequences(Player.x)
+        b[Coord(1, 1)] = None
+        assert a.find_sequences(Player.x) == []
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_cache_shared_between_transpositions(self):
+        cache = LRUCache()
+        b1 = Board((0, 5), (0, 5))
+        b1[Coord(1, 1)] = Player.x
+        b1[Coord(2, 1)] = Player.o
+        b2 = Board((0, 5), (0, 5))
+        b2[Coord(2, 1)] = Player.o
+        b2[Coord(1, 1)] = Player.x
+        Analysis(b1, cache).find_sequences(Player.o)
+        Analysis(b2, cache).find_sequences(Player.o)
+        assert cache.hits == 1
+
+    def test_cache_distinguishes_board_bounds(self):
+        cache = LRUCache()
+        Analysis(Board((0, 5), (0, 5)), cache).find_sequences(Player.o)
+        Analysis(Board((0, 6), (0, 5)), cache).find_sequences(Player.o)
+        assert cache.hits == 0
+
+
+@pytest.mark.unit
+class TestVectorizedAnalysis:
+    @pytest.mark.parametrize('board_class', [Board, BitBoard])
+    @pytest.mark.parametrize('seed', range(20))
+    def test_same_sequences_as_recursive(self, board_class, seed):
+        random = Random(seed)
+        b = random_board(seed, (0, random.randint(0, 12)), (0, random.randint(0, 12)), board_class=board_class)
+        a = Analysis(b)
+
+        for player in Player:
+            expected = a.find_sequences(player)
+            assert_same_sequences(a.find_sequences(player, vectorized=True), expected)
+
+    def test_empty_board(self):
+        a = Analysis(Board((0, 5), (0, 5)))
+        assert a.find_sequences(Player.x, vectorized=True) == []
+
+    @pytest.mark.parametrize('direction, expected', [
+        (Direction.right, [[2, 3, 0], [5, 6, 0]]),
+        (Direction.left, [[0, 1, 2], [0, 4, 5]]),
+        (Direction.down, [[4, 5, 6], [0, 0, 0]]),
+        (Direction.up_right, [[0, 0, 0], [2, 3, 0]]),
+    ])
+    def test_shift(self, direction, expected):
+        array = numpy.array([[1, 2, 3], [4, 5, 6]])
+        assert shift(array, direction).tolist() == expected
+
+    def test_shift_out_of_board(self):
+        array = numpy.array([[1, 2, 3], [4, 5, 6]])
+        assert shift(array, Direction.down, 2).tolist() == [[0, 0, 0], [0, 0, 0]]
+
+    def test_shift_stacked_boards(self):
+        array = numpy.array([[[1, 2]], [[3, 4]]])
+        assert shift(array, Direction.right).tolist() == [[[2, 0]], [[4, 0]]]
+
+    def test_run_lengths(self):
+        mask = numpy.array([[True, True, False, True, True, True]])
+        assert run_lengths(mask, Direction.right).tolist() == [[2, 1, 0, 3, 2, 1]]
+        assert run_lengths(mask, Direction.left).tolist() == [[1, 2, 0, 1, 2, 3]]
+        assert run_lengths(mask, Direction.right, limit=2).tolist() == [[2, 1, 0, 2, 2, 1]]
+
+
+@pytest.mark.unit
+class TestPatternScores:
+    def test_score_cell(self):
+        b = Board((0, 14), (0, 14))
+        for x in (2, 3, 5):
+            b[Coord(x, 7)] = Player.x
+        a = Analysis(b)
+        one = SHAPE_SCORES[Shape.one]
+        assert a.score_cell(Coord(4, 7), Player.x) == SHAPE_SCORES[Shape.open_four] + 3 * one
+        assert a.score_cell(Coord(3, 7), Player.x) == SHAPE_SCORES[Shape.open_three] + 3 * one
+        assert a.score_cell(Coord(4, 7), Player.o) == SHAPE_SCORES[Shape.one] * 3
+
+    def test_score_cell_near_edge(self):
+        b = Board((0, 14), (0, 14))
+        for x in (0, 1, 2):
+            b[Coord(x, 0)] = Player.x
+        a = Analysis(b)
+        assert a.score_cell(Coord(3, 0), Player.x) == SHAPE_SCORES[Shape.four] + 2 * SHAPE_SCORES[Shape.one]
+
+    def test_score_opponents_stone(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.o
+        assert Analysis(b).score_cell(Coord(7, 7), Player.x) == 0
+
+    @pytest.mark.parametrize('board_class', [Board, BitBoard])
+    @pytest.mark.parametrize('seed', range(5))
+    def test_score_board_same_as_score_cell(self, board_class, seed):
+        random = Random(seed)
+        x_bounds, y_bounds = (0, random.randint(5, 12)), (0, random.randint(5, 12))
+        b = random_board(seed, x_bounds, y_bounds, fill=0.4, board_class=board_class)
+        a = Analysis(b)
+        for player in Player:
+            scores = a.score_board(player)
+            assert scores.shape == (b.height, b.width)
+            for coord, _ in b.fields():
+                assert scores[coord.y, coord.x] == a.score_cell(coord, player)
+
+    def test_score_sparse_board(self):
+        b = SparseBoard()
+        for x in (-20, -19, -18):
+            b[Coord(x, 30)] = Player.x
+        a = Analysis(b)
+        scores = a.score_board(Player.x)
+        assert scores[b.margin, b.margin + 3] == a.score_cell(Coord(-17, 30), Player.x)
+        assert scores.max() == SHAPE_SCORES[Shape.open_four] + 3 * SHAPE_SCORES[Shape.one]
+
+    def test_line_codes(self):
+        states = numpy.array([[OWN, OPEN, BLOCKED]])
+        codes = line_codes(states, Direction.right)
+        center = 3 ** (LENGTH // 2)
+        assert codes.tolist() == [[
+            OWN * center + OPEN * center * 3,
+            OWN * center // 3 + OPEN * center,
+            OWN * center // 9 + OPEN * center // 3 + BLOCKED * center
+        ]]
+
+
+def assert_same_sequences(sequences, expected):
+    assert sequences == expected
+    assert [(s.start_open_points, s.end_open_points) for s in sequences] == \
+        [(s.start_open_points, s.end_open_points) for s in expected]
+
+
+@pytest.mark.unit
+class TestIncrementalAnalysis:
+    def test_initial_sequences(self):
+        b = Board((0, 5), (0, 5))
+        b[Coord(1, 1)] = Player.x
+        b[Coord(2, 2)] = Player.x
+        b[Coord(3, 3)] = Player.o
+        a = IncrementalAnalysis(b)
+
+        for player in Player:
+            assert_same_sequences(a.find_sequences(player), Analysis(b).find_sequences(player))
+
+    def test_follows_board_changes(self):
+        b = Board((0, 10), (0, 10))
+        a = IncrementalAnalysis(b)
+        b[Coord(5, 5)] = Player.x
+        b[Coord(6, 5)] = Player.x
+        b[Coord(7, 5)] = Player.o
+
+        assert a.find_sequences(Player.x)[0] == Sequence(Player.x, Direction.right, Coord(5, 5), 2)
+        assert a.find_sequences(Player.x)[0].end_open_points == 0
+        for player in Player:
+            assert_same_sequences(a.find_sequences(player), Analysis(b).find_sequences(player))
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_random_plays_and_undos(self, seed):
+        random = Random(seed)
+        b = Board((0, 9), (0, 9))
+        a = IncrementalAnalysis(b)
+        fields = [coord for coord, _ in b.fields()]
+        random.shuffle(fields)
+
+        for i, coord in enumerate(fields[:60]):
+            a.play(coord, Player.x if i % 2 else Player.o)
+            if random.random() < 0.3:
+                a.undo()
+            for player in Player:
+                assert_same_sequences(a.find_sequences(player), Analysis(b).find_sequences(player))
+
+    def test_undo_restores_board(self):
+        b = Board((0, 5), (0, 5))
+        a = IncrementalAnalysis(b)
+        a.play(Coord(1, 1), Player.x)
+        a.play(Coord(1, 1), Player.o)
+        a.undo()
+        assert b[Coord(1, 1)] is Player.x
+        a.undo()
+        assert b.is_open(Coord(1, 1))
+        assert a.find_sequences(Player.x) == []
+        with pytest.raises(IndexError):
+            a.undo()
+
+    def test_close_stops_following_board(self):
+        b = Board((0, 5), (0, 5))
+        a = IncrementalAnalysis(b)
+        a.close()
+        b[Coord(1, 1)] = Player.x
+        assert a.find_sequences(Player.x) == []
+
+
 @pytest.mark.performance
 class TestAnalysisPerformance:
     def test_50x50_analisys(self, benchmark):
@@ -256,3 +509,51 @@ class TestAnalysisPerformance:
         a = Analysis(b)
 
         benchmark(a.find_sequences, Player.x)
+
+    def test_50x50_vectorized_analisys(self, benchmark):
+        b = Board((0, 49), (0, 49))
+        fields = list(b.open_fields())
+        shuffle(fields)
+        for i, coord in enumerate(fields):  # fill board with random plays
+            b[coord] = Player.x if i % 2 else Player.o
+
+        a = Analysis(b)
+
+        benchmark(a.find_sequences, Player.x, vectorized=True)
+
+    def test_50x50_score_cells(self, benchmark):
+        b = Board((0, 49), (0, 49))
+        fields = list(b.open_fields())
+        shuffle(fields)
+        for i, coord in enumerate(fields[:len(fields) // 2]):
+            b[coord] = Player.x if i % 2 else Player.o
+
+        a = Analysis(b)
+
+        benchmark(lambda: [a.score_cell(coord, Player.x) for coord, _ in b.fields()])
+
+    def test_50x50_score_board(self, benchmark):
+        b = Board((0, 49), (0, 49))
+        fields = list(b.open_fields())
+        shuffle(fields)
+        for i, coord in enumerate(fields[:len(fields) // 2]):
+            b[coord] = Player.x if i % 2 else Player.o
+
+        a = Analysis(b)
+
+        benchmark(a.score_board, Player.x)
+
+    def test_50x50_incremental_move(self, benchmark):
+        b = Board((0, 49), (0, 49))
+        fields = list(b.open_fields())
+        shuffle(fields)
+        for i, coord in enumerate(fields[:-1]):  # fill board with random plays
+            b[coord] = Player.x if i % 2 else Player.o
+
+        a = IncrementalAnalysis(b)
+
+        def play_and_undo():
+            a.play(fields[-1], Player.x)
+            a.undo()
+
+        benchmark(play_and_undo)
@@ -0,0 +1,118 @@
+import pytest
+import asyncio
+from itertools import count
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from five_in_row.async_client import AsyncClient, run_games
+from five_in_row.model import Coord
+
+
+def stand_in_app(delay=0.0):
+    """Local stand-in for piskvorky.jobs.cz api recording received requests."""
+    app = web.Application()
+    requests = []
+    games = count(1)
+
+    async def connect(request):
+        requests.append(await request.json())
+        return web.json_response({'statusCode': 201, 'gameToken': f'game-{next(games)}'})
+
+    async def play(request):
+        body = await request.json()
+        requests.append(body)
+        await asyncio.sleep(delay)
+        return web.json_response({'statusCode': 201, 'x': body['positionX'], 'y': body['positionY']})
+
+    app.router.add_post('/api/v1/connect', connect)
+    app.router.add_post('/api/v1/play', play)
+    return app, requests
+
+
+def run_with_server(app, test):
+    async def run():
+        async with TestServer(app) as server:
+            return await test(str(server.make_url('/api/v1')))
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestAsyncClient:
+    def test_connect_game(self):
+        app, requests = stand_in_app()
+
+        async def test(url):
+            async with AsyncClient('user_key', base_url=url) as client:
+                return await client.connect_game()
+
+        assert run_with_server(app, test) == 'game-1'
+        assert requests == [{'userToken': 'user_key'}]
+
+    def test_play_turn(self):
+        app, requests = stand_in_app()
+
+        async def test(url):
+            async with AsyncClient('user_key', base_url=url) as client:
+                return await client.play_turn('game_token', Coord(1, 2))
+
+        assert run_with_server(app, test) == {'statusCode': 201, 'x': 1, 'y': 2}
+        assert requests == [{
+            'gameToken': 'game_token',
+            'positionX': 1,
+            'positionY': 2,
+            'userToken': 'user_key'
+        }]
+
+    def test_request_timeout(self):
+        app, requests = stand_in_app(delay=1.0)
+
+        async def test(url):
+            async with AsyncClient('user_key', timeout=0.05, base_url=url) as client:
+                return await client.play_turn('game_token', Coord(1, 2))
+
+        with pytest.raises(asyncio.TimeoutError):
+            run_with_server(app, test)
+
+    def test_close_unused_client(self):
+        asyncio.run(AsyncClient('user_key').close())
+
+    def test_default_base_url(self):
+        assert AsyncClient('user_key').base_url == 'https://piskvorky.jobs.cz/api/v1'
+
+
+@pytest.mark.unit
+class TestRunGames:
+    def test_runs_all_games(self):
+        app, requests = stand_in_app(delay=0.01)
+
+        async def game(client):
+            token = await client.connect_game()
+            for x in range(3):
+                await client.play_turn(token, Coord(x, 0))
+            return token
+
+        async def test(url):
+            async with AsyncClient('user_key', connections=5, base_url=url) as client:
+                return await run_games(client, game, 20, concurrency=10)
+
+        assert sorted(run_with_server(app, test)) == sorted(f'game-{i}' for i in range(1, 21))
+        assert len(requests) == 20 * 4
+
+    def test_bounded_concurrency(self):
+        running = []
+        peak = []
+
+        async def game(client):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        asyncio.run(run_games(AsyncClient('user_key'), game, 10, concurrency=3))
+        assert max(peak) == 3
+
+    def test_failed_game_result(self):
+        async def game(client):
+            raise ValueError('lost')
+
+        results = asyncio.run(run_games(AsyncClient('user_key'), game, 2))
+        assert [type(result) for result in results] == [ValueError, ValueError]
@@ -0,0 +1,163 @@
+import numpy
+import pytest
+from five_in_row.model import Player, Coord, Board, Direction
+from five_in_row.analysis import Analysis, Sequence
+from five_in_row.batch import BatchAnalysis, SEQUENCE, stack_boards, stack_moves, evaluate_moves
+from five_in_row.engine import WIN_SCORE, evaluate, score_sequences
+from five_in_row.parallel import evaluate_moves as evaluate_moves_one_by_one
+from five_in_row.patterns import Shape, shape_table
+from tests.factories import random_board
+
+
+X_BOUNDS, Y_BOUNDS = (-5, 9), (3, 14)
+
+
+def candidate_moves(board):
+    return sorted(Analysis(board).find_empty_adjacent_fields(), key=lambda c: (c.y, c.x))
+
+
+def shape_counts(board, player):
+    analysis = Analysis(board)
+    counts = [0] * len(Shape)
+    for coord, _ in board.occupied_fields(player):
+        for direction in Direction.positive_directions():
+            counts[shape_table()[analysis._line_code(coord, player, direction)]] += 1
+    return counts
+
+
+@pytest.mark.unit
+class TestStack:
+    def test_stack_boards(self):
+        boards = [random_board(seed, X_BOUNDS, Y_BOUNDS, stones=40) for seed in range(3)]
+        stack = stack_boards(boards)
+        assert stack.shape == (3, 12, 15)
+        for fields, b in zip(stack, boards):
+            assert (fields == b.to_array()).all()
+
+    def test_stack_boards_with_different_bounds(self):
+        with pytest.raises(ValueError):
+            stack_boards([Board((0, 9), (0, 9)), Board((1, 10), (0, 9))])
+
+    def test_stack_moves(self):
+        b = random_board(1, X_BOUNDS, Y_BOUNDS, stones=40)
+        moves = candidate_moves(b)
+        stack = stack_moves(b, Player.x, moves)
+        assert stack.shape == (len(moves), 12, 15)
+        for fields, move in zip(stack, moves):
+            b[move] = Player.x
+            assert (fields == b.to_array()).all()
+            b[move] = None
+
+    def test_stack_occupied_field(self):
+        b = Board(X_BOUNDS, Y_BOUNDS)
+        b[Coord(2, 5)] = Player.o
+        with pytest.raises(ValueError):
+            stack_moves(b, Player.x, [Coord(1, 5), Coord(2, 5)])
+
+    @pytest.mark.parametrize('move', [Coord(-6, 3), Coord(10, 3), Coord(0, 2), Coord(0, 15)])
+    def test_stack_move_out_of_bounds(self, move):
+        with pytest.raises(IndexError):
+            stack_moves(Board(X_BOUNDS, Y_BOUNDS), Player.x, [Coord(0, 5), move])
+
+
+@pytest.mark.unit
+class TestBatchAnalysis:
+    @pytest.mark.parametrize('player', list(Player))
+    def test_sequences_match_analysis(self, player):
+        boards = [random_board(seed, X_BOUNDS, Y_BOUNDS, stones=40) for seed in range(6)]
+        batch = BatchAnalysis.from_boards(boards)
+        assert len(batch) == 6
+        for position, b in enumerate(boards):
+            expected = Analysis(b).find_sequences(player, vectorized=True)
+            sequences = batch.sequences(player, position)
+            assert sequences == expected
+            assert [(s.start_open_points, s.end_open_points) for s in sequences] == [
+                (s.start_open_points, s.end_open_points) for s in expected
+            ]
+
+    def test_find_sequences(self):
+        b = Board(X_BOUNDS, Y_BOUNDS)
+        for x in range(3):
+            b[Coord(x, 5)] = Player.x
+        b[Coord(3, 5)] = Player.o
+        found = BatchAnalysis.from_boards([Board(X_BOUNDS, Y_BOUNDS), b]).find_sequences(Player.x)
+        assert found.dtype == SEQUENCE
+        right = found[found['direction'] == 0]
+        assert right.tolist() == [(1, 0, 5, 2, 3, 2, 0)]
+
+    def test_find_sequences_is_cached(self):
+        batch = BatchAnalysis.from_boards([random_board(1, X_BOUNDS, Y_BOUNDS, stones=40)])
+        assert batch.find_sequences(Player.x) is batch.find_sequences(Player.x)
+
+    @pytest.mark.parametrize('player', list(Player))
+    def test_score_sequences_match_engine(self, player):
+        boards = [random_board(seed, X_BOUNDS, Y_BOUNDS, stones=80) for seed in range(8)]
+        for y in range(3, 8):
+            boards[3][Coord(2, y)] = player
+        scores = BatchAnalysis.from_boards(boards).score_sequences(player)
+        expected = [score_sequences(Analysis(b).find_sequences(player)) for b in boards]
+        assert scores.tolist() == expected
+        assert WIN_SCORE in expected
+
+    @pytest.mark.parametrize('player', list(Player))
+    def test_evaluate_matches_engine(self, player):
+        boards = [random_board(seed, X_BOUNDS, Y_BOUNDS, stones=60) for seed in range(10)]
+        scores = BatchAnalysis.from_boards(boards).evaluate(player)
+        assert scores.tolist() == [evaluate(Analysis(b), player) for b in boards]
+
+    def test_shape_counts(self):
+        boards = [random_board(seed, X_BOUNDS, Y_BOUNDS, stones=40) for seed in range(4)]
+        counts = BatchAnalysis.from_boards(boards).shape_counts(Player.o)
+        assert counts.shape == (4, len(Shape))
+        assert counts.tolist() == [shape_counts(b, Player.o) for b in boards]
+
+    def test_open_four_shape_counts(self):
+        b = Board(X_BOUNDS, Y_BOUNDS)
+        for x in range(4):
+            b[Coord(x, 8)] = Player.x
+        counts = BatchAnalysis.from_boards([b]).shape_counts(Player.x)
+        assert counts[0, Shape.open_four.value] == 4
+        assert counts[0, Shape.one.value] == 12
+
+    def test_from_moves_leaves_board_unchanged(self):
+        b = random_board(2, X_BOUNDS, Y_BOUNDS, stones=40)
+        before = b.to_array().copy()
+        BatchAnalysis.from_moves(b, Player.x, candidate_moves(b)).evaluate(Player.x)
+        assert (b.to_array() == before).all()
+
+
+@pytest.mark.unit
+class TestEvaluateMoves:
+    @pytest.mark.parametrize('seed', range(4))
+    def test_same_as_one_by_one(self, seed):
+        b = random_board(seed, X_BOUNDS, Y_BOUNDS, stones=30)
+        moves = candidate_moves(b)
+        assert evaluate_moves(b, Player.o, moves) == evaluate_moves_one_by_one(b, Player.o, moves)
+
+    def test_winning_move_scores_best(self):
+        b = Board(X_BOUNDS, Y_BOUNDS)
+        for x in range(4):
+            b[Coord(x, 4)] = Player.x
+        moves = [Coord(4, 4), Coord(-1, 4), Coord(0, 10)]
+        scores = evaluate_moves(b, Player.x, moves)
+        assert scores[:2] == [WIN_SCORE, WIN_SCORE]
+        assert scores[2] < WIN_SCORE
+
+    @pytest.mark.parametrize('move', [Coord(-5, 3), Coord(9, 15)])
+    def test_invalid_move_fails_like_one_by_one(self, move):
+        b = Board(X_BOUNDS, Y_BOUNDS)
+        b[Coord(-5, 3)] = Player.o
+        with pytest.raises(Exception) as one_by_one:
+            evaluate_moves_one_by_one(b, Player.x, [move])
+        with pytest.raises(one_by_one.type, match=str(one_by_one.value)):
+            evaluate_moves(b, Player.x, [move])
+
+    def test_no_moves(self):
+        assert evaluate_moves(random_board(1, X_BOUNDS, Y_BOUNDS, stones=40), Player.x, []) == []
+
+    def test_sequence_fields(self):
+        b = Board(X_BOUNDS, Y_BOUNDS)
+        b[Coord(-5, 3)] = Player.x
+        sequences = BatchAnalysis.from_moves(b, Player.x, [Coord(-4, 4)]).sequences(Player.x, 0)
+        assert Sequence(Player.x, Direction.down_right, Coord(-5, 3), 2) in sequences
+        assert numpy.all([s.player is Player.x for s in sequences])
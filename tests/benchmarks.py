@@ -0,0 +1,131 @@
+import pytest
+from itertools import islice
+from five_in_row.model import Player, Coord
+from five_in_row.analysis import Analysis
+from five_in_row.batch import evaluate_moves as evaluate_moves_batch
+from five_in_row.parallel import evaluate_moves
+from five_in_row.client import Client
+from five_in_row.mcts import MCTS
+from tests.factories import random_board
+
+SIZES = [15, 50, 200]
+FILL_RATIOS = [0.1, 0.5]
+CANDIDATES = 32
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f'{size}x{size}')
+def size(request):
+    return request.param
+
+
+@pytest.fixture(params=FILL_RATIOS, ids=lambda ratio: f'fill{int(ratio * 100)}')
+def board(request, size):
+    return random_board(0, (0, size - 1), (0, size - 1), fill=request.param)
+
+
+@pytest.mark.performance
+class TestBoardBenchmarks:
+    def test_getitem(self, benchmark, board):
+        coords = [Coord(x, y) for x in range(board.width) for y in range(board.height)][::7]
+
+        def get_items():
+            for coord in coords:
+                board[coord]
+
+        benchmark(get_items)
+
+    def test_setitem(self, benchmark, board):
+        coords = [coord for coord in board.open_fields()][::7]
+
+        def set_items():
+            for coord in coords:
+                board[coord] = Player.x
+            for coord in coords:
+                board[coord] = None
+
+        benchmark(set_items)
+
+    def test_setitem_with_symmetries(self, benchmark, board):
+        coords = [coord for coord in board.open_fields()][::7]
+        board.symmetries()
+
+        def set_items():
+            for coord in coords:
+                board[coord] = Player.x
+            for coord in coords:
+                board[coord] = None
+
+        benchmark(set_items)
+
+    def test_push_pop(self, benchmark, board):
+        coords = [coord for coord in board.open_fields()][::7]
+
+        def push_pop():
+            for coord in coords:
+                board.push(coord, Player.x)
+            for _ in coords:
+                board.pop()
+
+        benchmark(push_pop)
+
+    def test_snapshot(self, benchmark, board):
+        coord = next(board.open_fields())
+
+        def snapshot_and_play():
+            board.snapshot()[coord] = Player.x
+
+        benchmark(snapshot_and_play)
+
+    def test_canonical(self, benchmark, board):
+        board.symmetries()
+        benchmark(board.canonical_array)
+
+    def test_fields(self, benchmark, board):
+        benchmark(lambda: list(board.fields()))
+
+    def test_occupied_fields(self, benchmark, board):
+        benchmark(lambda: list(board.occupied_fields()))
+
+
+@pytest.mark.performance
+class TestAnalysisBenchmarks:
+    def test_find_sequences(self, benchmark, board):
+        benchmark(Analysis(board).find_sequences, Player.x)
+
+    def test_find_sequences_vectorized(self, benchmark, board):
+        benchmark(Analysis(board).find_sequences, Player.x, vectorized=True)
+
+    def test_find_empty_adjacent_fields(self, benchmark, board):
+        benchmark(Analysis(board).find_empty_adjacent_fields)
+
+    def test_get_average_center_distance(self, benchmark, board):
+        benchmark(Analysis(board).get_average_center_distance, Player.x)
+
+    def test_evaluate_moves(self, benchmark, board):
+        moves = list(islice(board.open_fields(), CANDIDATES))
+        benchmark(evaluate_moves, board, Player.x, moves)
+
+    def test_evaluate_moves_batch(self, benchmark, board):
+        moves = list(islice(board.open_fields(), CANDIDATES))
+        benchmark(evaluate_moves_batch, board, Player.x, moves)
+
+
+@pytest.mark.performance
+class TestMCTSBenchmarks:
+    def test_best_move(self, benchmark, board):
+        mcts = MCTS(time_limit=None, iterations=200, seed=0)
+        benchmark(mcts.best_move, board, Player.x)
+        benchmark.extra_info['playouts_per_second'] = mcts.playouts_per_second
+
+
+@pytest.mark.performance
+class TestClientBenchmarks:
+    def test_play_turn(self, benchmark, requests_mock):
+        requests_mock.post('https://piskvorky.jobs.cz/api/v1/play', text='{"statusCode": 201}')
+        client = Client('user_key')
+        benchmark(client.play_turn, 'game_token', Coord(1, 1))
+
+    def test_connect_game(self, benchmark, requests_mock):
+        requests_mock.post('https://piskvorky.jobs.cz/api/v1/connect', text='{"gameToken": "game_token"}')
+        client = Client('user_key')
+        benchmark(client.connect_game)
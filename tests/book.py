@@ -0,0 +1,157 @@
+import pytest
+import numpy
+from random import Random
+from five_in_row.model import Player, Coord, Board, SparseBoard, Symmetry
+from five_in_row.records import GameRecord
+from five_in_row.book import BookBuilder, OpeningBook, winner
+
+
+def game(moves):
+    return GameRecord.from_moves(
+        (0, 14), (0, 14), [(Coord(x, y), Player.x if i % 2 == 0 else Player.o) for i, (x, y) in enumerate(moves)]
+    )
+
+
+def x_wins(moves=9):
+    return game([(2 + i // 2, 3 + i % 2 * 2) for i in range(moves)])
+
+
+def o_wins():
+    return game([(0, i) if i % 2 == 0 else (5 + i // 2, 5) for i in range(10)])
+
+
+def random_opening(seed, moves=6):
+    random = Random(seed)
+    fields = [(x, y) for x in range(5, 10) for y in range(5, 10)]
+    random.shuffle(fields)
+    return game(fields[:moves])
+
+
+def rotated(x, y):
+    return Coord(*Symmetry.rotate_90.apply(x, y, 15, 15))
+
+
+@pytest.fixture
+def book(tmp_path):
+    builder = BookBuilder()
+    builder.add_games([x_wins(), x_wins(), o_wins()])
+    builder.write(tmp_path / 'book')
+    with OpeningBook(tmp_path / 'book') as book:
+        yield book
+
+
+@pytest.mark.unit
+class TestWinner:
+    def test_last_move_completes_five(self):
+        assert winner(x_wins()) is Player.x
+        assert winner(o_wins()) is Player.o
+
+    def test_unfinished_game(self):
+        assert winner(x_wins(moves=8)) is None
+        assert winner(game([])) is None
+
+
+@pytest.mark.unit
+class TestOpeningBook:
+    def test_best_move(self, book):
+        entry = book.lookup(Board((0, 14), (0, 14)), Player.x)
+        assert entry.move == Coord(3, 2)  # equivalent to (2, 3) on empty board, first of them in row order
+        assert (entry.games, entry.wins) == (2, 2)
+        assert repr(entry) == '<<3:2> won 2/2>'
+
+    def test_rotated_position(self, book):
+        b = Board((0, 14), (0, 14))
+        b[rotated(2, 3)] = Player.x
+        assert book.lookup(b, Player.o).move == rotated(2, 5)
+
+    def test_unknown_position(self, book):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        assert book.lookup(b, Player.o) is None
+
+    def test_other_player(self, book):
+        b = Board((0, 14), (0, 14))
+        b[Coord(2, 3)] = Player.x
+        assert book.lookup(b, Player.x) is None
+
+    def test_other_board_size(self, book):
+        assert book.lookup(Board((0, 18), (0, 18)), Player.x) is None
+
+    def test_lookup_leaves_board_untouched(self, book):
+        b = Board((0, 14), (0, 14))
+        b[Coord(2, 3)] = Player.x
+        book.lookup(b, Player.o)
+        assert b._listeners == []
+
+    def test_sparse_board(self, book):
+        with pytest.raises(ValueError):
+            book.lookup(SparseBoard(), Player.x)
+
+    def test_past_max_turns(self, tmp_path):
+        builder = BookBuilder(max_turns=2)
+        builder.add_game(x_wins())
+        builder.write(tmp_path / 'book')
+        b = Board((0, 14), (0, 14))
+        with OpeningBook(tmp_path / 'book') as book:
+            assert len(book) == 2
+            assert book.lookup(b, Player.x).move == Coord(3, 2)
+            b[Coord(2, 3)] = Player.x
+            b[Coord(2, 5)] = Player.o
+            assert book.lookup(b, Player.x) is None
+
+    def test_min_games(self, tmp_path):
+        builder = BookBuilder()
+        builder.add_games([x_wins(), x_wins(), o_wins()])
+        builder.write(tmp_path / 'book', min_games=2)
+        with OpeningBook(tmp_path / 'book') as book:
+            assert len(book) == 9
+            assert builder.games == 3
+
+    def test_given_result(self, tmp_path):
+        builder = BookBuilder()
+        builder.add_game(x_wins(), Player.o)
+        builder.write(tmp_path / 'book')
+        with OpeningBook(tmp_path / 'book') as book:
+            assert book.lookup(Board((0, 14), (0, 14)), Player.x).wins == 0
+
+    def test_symmetric_games_counted_together(self, tmp_path):
+        builder = BookBuilder()
+        builder.add_game(game([(2, 3), (2, 5)]))
+        builder.add_game(game([(3, 2), (5, 2)]))
+        builder.write(tmp_path / 'book')
+        b = Board((0, 14), (0, 14))
+        b[Coord(3, 2)] = Player.x
+        with OpeningBook(tmp_path / 'book') as book:
+            assert len(book) == 2
+            assert book.lookup(Board((0, 14), (0, 14)), Player.x).games == 2
+            assert book.lookup(b, Player.o).games == 2
+
+    def test_memory_mapped(self, book):
+        assert isinstance(book._entries, numpy.memmap)
+
+    def test_not_a_book(self, tmp_path):
+        (tmp_path / 'book').write_bytes(b'x' * 100)
+        with pytest.raises(ValueError, match='not an opening book'):
+            OpeningBook(tmp_path / 'book')
+
+    def test_truncated(self, tmp_path):
+        builder = BookBuilder()
+        builder.add_game(x_wins())
+        builder.write(tmp_path / 'book')
+        data = (tmp_path / 'book').read_bytes()
+        (tmp_path / 'book').write_bytes(data[:-1])
+        with pytest.raises(ValueError, match='truncated'):
+            OpeningBook(tmp_path / 'book')
+
+
+@pytest.mark.performance
+class TestBookPerformance:
+    def test_lookup(self, benchmark, tmp_path):
+        builder = BookBuilder()
+        builder.add_games(random_opening(seed) for seed in range(5000))
+        builder.write(tmp_path / 'book')
+        b = Board((0, 14), (0, 14))
+        for move, player in list(random_opening(1))[:3]:
+            b[move] = player
+        with OpeningBook(tmp_path / 'book') as book:
+            assert benchmark(book.lookup, b, Player.o) is not None
@@ -0,0 +1,55 @@
+import pytest
+from five_in_row.cache import LRUCache
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    def test_get_set_item(self):
+        cache = LRUCache()
+        cache['a'] = 1
+        assert cache['a'] == 1
+        assert 'a' in cache
+        assert len(cache) == 1
+
+    def test_missing_item(self):
+        cache = LRUCache()
+        with pytest.raises(KeyError):
+            cache['a']
+        assert 'a' not in cache
+
+    def test_counters(self):
+        cache = LRUCache()
+        cache['a'] = 1
+        cache['a']
+        cache['a']
+        with pytest.raises(KeyError):
+            cache['b']
+        assert cache.stats == {'size': 1, 'hits': 2, 'misses': 1, 'evictions': 0}
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache['a']
+        cache['c'] = 3
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.evictions == 1
+
+    def test_overwrite_marks_recently_used(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache['a'] = 3
+        cache['c'] = 4
+        assert cache['a'] == 3
+        assert 'b' not in cache
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache['a'] = 1
+        cache['a']
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats == {'size': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
@@ -1,5 +1,7 @@
 import pytest
-from five_in_row.client import Client
+import json
+import requests
+from five_in_row.client import Client, JsonAuth, PayloadEncoder
 from five_in_row.model import Coord
 
 
@@ -17,6 +19,8 @@ class TestClient:
         game_token = client.connect_game()
 
         assert game_token == '3824239b-0b7c-4690-84dd-5eed7d527f14'
+        assert requests_mock.last_request.json() == {'userToken': 'user_key'}
+        assert requests_mock.last_request.headers['Content-Type'] == 'application/json'
 
     def test_play_turn(self, requests_mock):
         requests_mock.post('https://piskvorky.jobs.cz/api/v1/play', text='''{
@@ -29,3 +33,85 @@ class TestClient:
         assert play_result == {
             'key': 'value'
         }
+        assert requests_mock.last_request.json() == {
+            'userToken': 'user_key',
+            'gameToken': 'game_token',
+            'positionX': 1,
+            'positionY': 1
+        }
+
+    def test_play_turn_does_not_reparse_body(self, requests_mock, mocker):
+        requests_mock.post('https://piskvorky.jobs.cz/api/v1/play', text='{}')
+        client = Client('user_key')
+        loads = mocker.spy(json, 'loads')
+        dumps = mocker.spy(json, 'dumps')
+
+        client.play_turn('game_token', Coord(1, 1))
+        client.play_turn('game_token', Coord(2, 1))
+
+        assert loads.call_count == 2  # only the responses
+        assert dumps.call_count == 1  # game token is encoded once per game
+
+
+@pytest.mark.unit
+class TestPayloadEncoder:
+    def test_connect(self):
+        assert json.loads(PayloadEncoder('user_key').connect) == {'userToken': 'user_key'}
+
+    @pytest.mark.parametrize('token, game_token', [
+        ('user_key', 'game_token'),
+        ('"quoted"', 'ünicode\\'),
+    ])
+    def test_play(self, token, game_token):
+        encoder = PayloadEncoder(token)
+        encoder.play('other_game', Coord(0, 0))
+        assert json.loads(encoder.play(game_token, Coord(-1, 20))) == {
+            'userToken': token,
+            'gameToken': game_token,
+            'positionX': -1,
+            'positionY': 20
+        }
+
+
+@pytest.mark.unit
+class TestJsonAuth:
+    def test_adds_token_to_body(self):
+        request = requests.Request('POST', 'http://localhost', json={'key': 'value'}).prepare()
+        assert json.loads(JsonAuth('user_key')(request).body) == {'key': 'value', 'userToken': 'user_key'}
+
+    def test_adds_token_to_empty_body(self):
+        request = requests.Request('POST', 'http://localhost').prepare()
+        assert json.loads(JsonAuth('user_key')(request).body) == {'userToken': 'user_key'}
+
+    def test_adds_token_to_text_body(self):
+        request = requests.Request('POST', 'http://localhost', data='{"key": "value"}').prepare()
+        assert json.loads(JsonAuth('user_key')(request).body) == {'key': 'value', 'userToken': 'user_key'}
+
+    def test_keeps_encoded_body(self):
+        body = PayloadEncoder('user_key').play('game_token', Coord(1, 1))
+        request = requests.Request('POST', 'http://localhost', data=body).prepare()
+        assert JsonAuth('user_key')(request).body is body
+
+
+@pytest.mark.performance
+class TestClientPerformance:
+    def test_json_auth_request_body(self, benchmark):
+        auth = JsonAuth('user_key')
+        request = requests.PreparedRequest()
+
+        def construct():
+            request.body = json.dumps({'gameToken': 'game_token', 'positionX': 1, 'positionY': 1}).encode('utf-8')
+            return auth(request)
+
+        benchmark(construct)
+
+    def test_encoded_request_body(self, benchmark):
+        auth = JsonAuth('user_key')
+        encoder = PayloadEncoder('user_key')
+        request = requests.PreparedRequest()
+
+        def construct():
+            request.body = encoder.play('game_token', Coord(1, 1))
+            return auth(request)
+
+        benchmark(construct)
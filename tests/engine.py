@@ -0,0 +1,236 @@
+import pytest
+from itertools import count
+from types import SimpleNamespace
+from five_in_row import engine as engine_module
+from five_in_row.model import Player, Coord, Board, Direction, SparseBoard
+from five_in_row.analysis import Sequence, Analysis
+from five_in_row.engine import (
+    Engine, TranspositionTable, Bound, WIN_SCORE, score_sequences, evaluate
+)
+from five_in_row.cache import LRUCache
+from five_in_row.threats import ThreatSearch
+from five_in_row.records import GameRecord
+from five_in_row.book import BookBuilder, OpeningBook
+from tests.factories import random_board
+
+
+def four_in_row_board():
+    b = Board((0, 14), (0, 14))
+    for x in range(4, 8):
+        b[Coord(x, 7)] = Player.x
+    b[Coord(3, 7)] = Player.o
+    b[Coord(5, 5)] = Player.o
+    b[Coord(6, 5)] = Player.o
+    b[Coord(9, 9)] = Player.o
+    return b
+
+
+@pytest.mark.unit
+class TestEvaluation:
+    def test_score_closed_sequence(self):
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 5)
+        assert score_sequences([s]) == WIN_SCORE
+
+    def test_score_ignores_not_closable_sequences(self):
+        s = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        assert score_sequences([s]) == 0
+
+    def test_score_prefers_open_sequences(self):
+        one_side = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        one_side.end_open_points = 3
+        both_sides = Sequence(Player.x, Direction.right, Coord(0, 0), 2)
+        both_sides.start_open_points = 1
+        both_sides.end_open_points = 2
+        assert score_sequences([both_sides]) > score_sequences([one_side]) > 0
+
+    def test_evaluate_is_symmetric(self):
+        a = Analysis(four_in_row_board())
+        assert evaluate(a, Player.x) == -evaluate(a, Player.o)
+        assert evaluate(a, Player.x) > 0
+
+    def test_evaluate_uses_analysis_cache(self):
+        cache = LRUCache()
+        a = Analysis(four_in_row_board(), cache)
+        assert evaluate(a, Player.x) == evaluate(a, Player.x) == evaluate(Analysis(four_in_row_board()), Player.x)
+        assert cache.hits == 1
+
+    def test_evaluate_won_position(self):
+        b = four_in_row_board()
+        b[Coord(8, 7)] = Player.x
+        a = Analysis(b)
+        assert evaluate(a, Player.x) == WIN_SCORE
+        assert evaluate(a, Player.o) == -WIN_SCORE
+
+
+@pytest.mark.unit
+class TestTranspositionTable:
+    def test_get_stored_entry(self):
+        table = TranspositionTable(16)
+        table.put(5, 2, 100, Bound.exact, Coord(1, 1))
+        entry = table.get(5)
+        assert (entry.depth, entry.score, entry.bound, entry.move) == (2, 100, Bound.exact, Coord(1, 1))
+
+    def test_get_missing_entry(self):
+        table = TranspositionTable(16)
+        table.put(5, 2, 100, Bound.exact, None)
+        assert table.get(6) is None
+        assert table.get(5 + 16) is None
+
+    def test_keeps_deeper_entry(self):
+        table = TranspositionTable(16)
+        table.put(5, 3, 100, Bound.exact, None)
+        table.put(5 + 16, 2, 200, Bound.exact, None)
+        assert table.get(5).score == 100
+        assert table.get(5 + 16) is None
+
+    def test_replaces_with_deeper_entry(self):
+        table = TranspositionTable(16)
+        table.put(5, 2, 100, Bound.exact, None)
+        table.put(5 + 16, 3, 200, Bound.exact, None)
+        assert table.get(5) is None
+        assert table.get(5 + 16).score == 200
+
+    def test_replaces_entry_from_older_search(self):
+        table = TranspositionTable(16)
+        table.put(5, 3, 100, Bound.exact, None)
+        table.new_search()
+        table.put(5 + 16, 1, 200, Bound.exact, None)
+        assert table.get(5 + 16).score == 200
+
+
+@pytest.mark.unit
+class TestEngine:
+    def test_completes_five(self):
+        engine = Engine(max_depth=3, time_limit=10)
+        assert engine.best_move(four_in_row_board(), Player.x) == Coord(8, 7)
+        assert engine.depth == 1
+
+    def test_blocks_opponents_five(self):
+        engine = Engine(max_depth=2, time_limit=10)
+        assert engine.best_move(four_in_row_board(), Player.o) == Coord(8, 7)
+
+    def test_leaves_board_unchanged(self):
+        b = four_in_row_board()
+        before = str(b)
+        Engine(max_depth=2, time_limit=10).best_move(b, Player.o)
+        assert str(b) == before
+
+    def test_empty_board(self):
+        assert Engine().best_move(Board((0, 2), (0, 2)), Player.x) == Coord(1, 1)
+
+    def test_empty_sparse_board(self):
+        assert Engine().best_move(SparseBoard(), Player.x) == Coord(0, 0)
+
+    def test_full_board(self):
+        b = Board((0, 1), (0, 1))
+        for coord, player in zip([Coord(0, 0), Coord(1, 0), Coord(0, 1), Coord(1, 1)], [Player.x, Player.o] * 2):
+            b[coord] = player
+        with pytest.raises(ValueError):
+            Engine().best_move(b, Player.x)
+
+    def test_respects_time_limit(self):
+        b = four_in_row_board()
+        engine = Engine(max_depth=10, time_limit=0)
+        assert engine.best_move(b, Player.o) == b.frontier().ordered()[0]
+        assert engine.depth == 0
+        assert str(b) == str(four_in_row_board())
+
+    def test_keeps_best_move_of_unfinished_iteration(self, monkeypatch):
+        b = four_in_row_board()
+        moves = b.frontier().ordered()
+        assert moves[0] != Coord(8, 7)
+        clock = count()
+        monkeypatch.setattr(engine_module, 'time', SimpleNamespace(monotonic=lambda: next(clock)))
+        engine = Engine(max_depth=10, time_limit=moves.index(Coord(8, 7)) + 1)
+        assert engine.best_move(b, Player.x) == Coord(8, 7)
+        assert engine.depth == 0
+
+    def test_follows_board_between_searches(self):
+        b = four_in_row_board()
+        engine = Engine(max_depth=1, time_limit=10)
+        engine.best_move(b, Player.o)
+        analysis = engine._followed
+        b[Coord(8, 7)] = Player.o
+        b[Coord(0, 0)] = Player.x
+        engine.best_move(b, Player.o)
+        assert engine._followed is analysis
+        for player in Player:
+            assert analysis.find_sequences(player) == Analysis(b).find_sequences(player)
+
+        engine.best_move(four_in_row_board(), Player.o)
+        assert engine._followed is not analysis
+        engine.close()
+        assert engine._followed is None
+
+    def test_reuses_transposition_table(self):
+        b = Board((0, 6), (0, 6))
+        b[Coord(3, 3)] = Player.x
+        engine = Engine(max_depth=2, time_limit=10)
+        engine.best_move(b, Player.o)
+        nodes = engine.nodes
+        engine.best_move(b, Player.o)
+        assert engine.nodes < nodes
+
+    def test_searches_both_players_on_same_position(self):
+        b = random_board(0, (0, 6), (0, 6), stones=4)
+        engine = Engine(max_depth=3, time_limit=10)
+        for player in [Player.x, Player.o]:
+            assert engine.best_move(b, player) == Engine(max_depth=3, time_limit=10).best_move(b, player)
+
+    def test_search_with_cache(self):
+        cache = LRUCache()
+        engine = Engine(max_depth=2, time_limit=10, cache=cache)
+        assert engine.best_move(four_in_row_board(), Player.o) == Coord(8, 7)
+        assert cache.hits > 0
+
+    def test_plays_forced_win_from_threat_search(self):
+        b = Board((0, 14), (0, 14))
+        for x, y in [(2, 2), (3, 2), (4, 2), (5, 4), (5, 5)]:
+            b[Coord(x, y)] = Player.x
+        b[Coord(1, 2)] = Player.o
+        engine = Engine(max_depth=4, time_limit=10, threat_search=ThreatSearch(time_limit=10))
+        assert engine.best_move(b, Player.x) == Coord(5, 2)
+        assert engine.nodes == 0
+        assert engine.threat_search._analysis is engine._followed
+        assert engine._followed.cache.misses > 0
+
+    def test_threat_search_within_time_limit(self):
+        b = Board((0, 14), (0, 14))
+        for x, y in [(2, 2), (3, 2), (4, 2), (5, 4), (5, 5)]:
+            b[Coord(x, y)] = Player.x
+        b[Coord(1, 2)] = Player.o
+        engine = Engine(max_depth=4, time_limit=0, threat_search=ThreatSearch(time_limit=10))
+        assert engine.best_move(b, Player.x) in Analysis(b).find_empty_adjacent_fields()
+        assert engine.threat_search.timed_out
+        assert engine.depth == 0
+
+    def test_searches_when_threat_search_fails(self):
+        engine = Engine(max_depth=2, time_limit=10, threat_search=ThreatSearch(time_limit=10))
+        assert engine.best_move(four_in_row_board(), Player.o) == Coord(8, 7)
+        assert engine.nodes > 0
+        assert not engine.threat_search.timed_out
+
+    def test_plays_book_move(self, tmp_path):
+        builder = BookBuilder()
+        builder.add_game(GameRecord.from_moves((0, 14), (0, 14), [(Coord(7, 7), Player.x), (Coord(8, 8), Player.o)]))
+        builder.write(tmp_path / 'book')
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        with OpeningBook(tmp_path / 'book') as book:
+            engine = Engine(max_depth=2, time_limit=10, book=book)
+            assert engine.best_move(b, Player.o) in {Coord(6, 6), Coord(8, 6), Coord(6, 8), Coord(8, 8)}
+            assert engine.nodes == 0
+            engine.best_move(four_in_row_board(), Player.o)
+            assert engine.nodes > 0
+
+    @pytest.mark.parametrize('bound, score, usable', [
+        (Bound.exact, 0, True),
+        (Bound.lower, 10, True),
+        (Bound.lower, 5, False),
+        (Bound.upper, -10, True),
+        (Bound.upper, -5, False),
+    ])
+    def test_usable_table_entry(self, bound, score, usable):
+        table = TranspositionTable(16)
+        table.put(1, 1, score, bound, None)
+        assert Engine._is_usable(table.get(1), -10, 10) is usable
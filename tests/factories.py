@@ -0,0 +1,22 @@
+from random import Random
+from five_in_row.model import Player, Coord, Board
+
+
+def random_stones(seed=0, x_bounds=(0, 14), y_bounds=(0, 14), stones=None, fill=0.5):
+    """Stones of alternating players, starting with o, on distinct random fields within bounds.
+
+    Number of stones is given by `stones`, or by `fill` as a ratio of all fields.
+    """
+    random = Random(seed)
+    fields = [Coord(x, y) for y in range(y_bounds[0], y_bounds[1] + 1) for x in range(x_bounds[0], x_bounds[1] + 1)]
+    random.shuffle(fields)
+    count = int(len(fields) * fill) if stones is None else stones
+    return [(coord, Player.x if i % 2 else Player.o) for i, coord in enumerate(fields[:count])]
+
+
+def random_board(seed=0, x_bounds=(0, 14), y_bounds=(0, 14), stones=None, fill=0.5, board_class=Board):
+    """Board of given class with `random_stones` placed on it."""
+    board = board_class(x_bounds, y_bounds)
+    for coord, player in random_stones(seed, x_bounds, y_bounds, stones, fill):
+        board[coord] = player
+    return board
@@ -0,0 +1,127 @@
+import pytest
+from five_in_row import instrumentation
+from five_in_row.instrumentation import Histogram, Registry, instrument
+from five_in_row.analysis import Analysis
+from five_in_row.cache import LRUCache
+from five_in_row.client import Client
+from five_in_row.model import Player, Coord, Board, Direction
+
+
+@pytest.mark.unit
+class TestHistogram:
+    def test_add(self):
+        histogram = Histogram()
+        for seconds in [0.000001, 0.000003, 0.002]:
+            histogram.add(seconds)
+        assert histogram.count == 3
+        assert histogram.mean == pytest.approx(0.002004 / 3)
+        assert (histogram.min, histogram.max) == (0.000001, 0.002)
+        assert histogram.as_dict()['buckets_us'] == {2: 1, 4: 1, 2048: 1}
+
+    def test_empty(self):
+        assert Histogram().as_dict() == {
+            'count': 0, 'total': 0.0, 'mean': 0.0, 'min': 0.0, 'max': 0.0, 'buckets_us': {}
+        }
+
+
+@pytest.mark.unit
+class TestRegistry:
+    def test_counters(self):
+        registry = Registry()
+        registry.count('b')
+        registry.count('a', 3)
+        registry.count('b')
+        assert registry.dump()['counters'] == {'a': 3, 'b': 2}
+
+    def test_timer(self):
+        registry = Registry()
+        with registry.timer('block'):
+            pass
+        with pytest.raises(ValueError):
+            with registry.timer('block'):
+                raise ValueError()
+        assert registry.dump()['timings']['block']['count'] == 2
+
+    def test_reset(self):
+        registry = Registry()
+        registry.count('a')
+        registry.time('b', 0.1)
+        registry.reset()
+        assert registry.dump() == {'counters': {}, 'timings': {}}
+
+
+@pytest.mark.unit
+class TestInstrument:
+    def test_disabled_by_default(self):
+        assert instrumentation.active is None
+
+    def test_activates_registry(self):
+        with instrument() as registry:
+            assert instrumentation.active is registry
+        assert instrumentation.active is None
+
+    def test_nested(self):
+        outer = Registry()
+        with instrument(outer):
+            with instrument() as inner:
+                assert instrumentation.active is inner
+            assert instrumentation.active is outer
+
+    def test_nothing_collected_after_block(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(5, 5)] = Player.x
+        with instrument() as registry:
+            pass
+        Analysis(b).find_sequences(Player.x)
+        assert registry.dump() == {'counters': {}, 'timings': {}}
+
+
+@pytest.mark.unit
+class TestInstrumentedCode:
+    def test_find_sequences(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(5, 5)] = Player.x
+        with instrument() as registry:
+            Analysis(b).find_sequences(Player.x)
+        stats = registry.dump()
+        assert stats['timings']['analysis.find_sequences']['count'] == 1
+        assert stats['counters']['analysis.sequences'] == 4
+        assert stats['counters']['analysis.open_end_steps'] == 4 * 2 * 4
+
+    def test_open_end_steps_stop_at_edge(self):
+        b = Board((0, 9), (0, 0))
+        b[Coord(1, 0)] = Player.x
+        b[Coord(6, 0)] = Player.o
+        analysis = Analysis(b)
+        with instrument() as registry:
+            assert analysis._count_open_end(4, Coord(1, 0), Direction.left) == 1
+            assert analysis._count_open_end(4, Coord(1, 0), Direction.right) == 4
+            assert analysis._count_open_end(0, Coord(1, 0), Direction.right) == 0
+        assert registry.counters['analysis.open_end_steps'] == 2 + 4
+
+    def test_cells_scanned(self):
+        b = Board((0, 9), (0, 4))
+        with instrument() as registry:
+            list(b.fields())
+            list(b.open_fields())
+            b.occupied_xy()
+        assert registry.counters['board.cells_scanned'] == 3 * 50
+
+    def test_cache(self):
+        b = Board((0, 9), (0, 9))
+        analysis = Analysis(b, LRUCache())
+        with instrument() as registry:
+            analysis.find_sequences(Player.x)
+            analysis.find_sequences(Player.x)
+        assert registry.counters['analysis.cache_misses'] == 1
+        assert registry.counters['analysis.cache_hits'] == 1
+
+    def test_play_turn(self, requests_mock):
+        requests_mock.post('https://piskvorky.jobs.cz/api/v1/play', text='{"key": "value"}')
+        with instrument() as registry:
+            assert Client('user_key').play_turn('game_token', Coord(1, 1)) == {'key': 'value'}
+        timings = registry.dump()['timings']
+        assert {name: timing['count'] for name, timing in timings.items()} == {
+            'client.play_turn': 1, 'client.play_turn.network': 1, 'client.play_turn.serialization': 1
+        }
+        assert timings['client.play_turn']['total'] >= timings['client.play_turn.network']['total']
@@ -0,0 +1,194 @@
+import pytest
+from five_in_row.analysis import Analysis
+from five_in_row.instrumentation import instrument
+from five_in_row.mcts import MCTS, Neighbourhood, Node, wins_at
+from five_in_row.model import Player, Coord, Board, SparseBoard, Direction
+
+
+def line(board, start, direction, length, player):
+    for step in range(length):
+        board[start.adjacent(direction, step)] = player
+    return board
+
+
+@pytest.mark.unit
+class TestWinsAt:
+    @pytest.mark.parametrize('direction', Direction.positive_directions())
+    def test_five(self, direction):
+        b = line(Board((0, 14), (0, 14)), Coord(5, 5), direction, 5, Player.x)
+        for step in range(5):
+            assert wins_at(b, Coord(5, 5).adjacent(direction, step), Player.x)
+        assert not wins_at(b, Coord(5, 5), Player.o)
+
+    def test_four(self):
+        b = line(Board((0, 14), (0, 14)), Coord(0, 0), Direction.right, 4, Player.x)
+        b[Coord(4, 0)] = Player.o
+        assert not wins_at(b, Coord(3, 0), Player.x)
+        assert wins_at(b, Coord(3, 0), Player.x, length=4)
+
+    def test_edge_of_board(self):
+        b = line(Board((0, 4), (0, 4)), Coord(4, 0), Direction.down_left, 5, Player.o)
+        assert wins_at(b, Coord(0, 4), Player.o)
+
+    def test_sparse_board(self):
+        b = line(SparseBoard(), Coord(-100, 50), Direction.down, 6, Player.x)
+        assert wins_at(b, Coord(-100, 52), Player.x)
+
+
+@pytest.mark.unit
+class TestNeighbourhood:
+    def test_same_as_analysis(self):
+        b = Board((0, 14), (0, 14))
+        for coord in [Coord(0, 0), Coord(7, 7), Coord(8, 7), Coord(14, 3)]:
+            b[coord] = Player.x
+        assert set(Neighbourhood(b).moves) == Analysis(b).find_empty_adjacent_fields()
+        assert set(Neighbourhood(b, radius=2).moves) == Analysis(b).find_empty_adjacent_fields(radius=2)
+
+    def test_play_undo(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        neighbourhood = Neighbourhood(b)
+        before, zobrist_hash = set(neighbourhood.moves), b.zobrist_hash
+
+        for move, player in [(Coord(8, 8), Player.o), (Coord(0, 0), Player.x), (Coord(9, 9), Player.o)]:
+            neighbourhood.play(move, player)
+            assert set(neighbourhood.moves) == Analysis(b).find_empty_adjacent_fields()
+        assert neighbourhood.depth == 3
+
+        neighbourhood.undo()
+        assert set(neighbourhood.moves) == Analysis(b).find_empty_adjacent_fields()
+        neighbourhood.rewind()
+        assert neighbourhood.depth == 0
+        assert set(neighbourhood.moves) == before
+        assert b.zobrist_hash == zobrist_hash
+        assert b.moves == []
+
+
+@pytest.mark.unit
+class TestNode:
+    def test_select(self):
+        root = Node(Player.o)
+        root.visits = 10
+        explored, unexplored = Node(Player.x, root), Node(Player.x, root)
+        explored.visits, explored.wins = 9, 9
+        unexplored.visits, unexplored.wins = 1, 0
+        root.children = {Coord(0, 0): explored, Coord(1, 1): unexplored}
+        assert root.select(exploration=0) == (Coord(0, 0), explored)
+        assert root.select(exploration=10) == (Coord(1, 1), unexplored)
+        assert root.most_visited() == (Coord(0, 0), explored)
+
+
+@pytest.mark.unit
+class TestMCTS:
+    def test_requires_budget(self):
+        with pytest.raises(ValueError):
+            MCTS(time_limit=None, iterations=None)
+
+    def test_empty_board(self):
+        assert MCTS(iterations=10).best_move(Board((0, 14), (0, 14)), Player.x) == Coord(7, 7)
+
+    def test_empty_sparse_board(self):
+        assert MCTS(iterations=10).best_move(SparseBoard(), Player.x) == Coord(0, 0)
+
+    def test_finishes_five(self):
+        b = line(Board((0, 14), (0, 14)), Coord(3, 7), Direction.right, 4, Player.x)
+        b[Coord(7, 7)] = Player.o
+        assert MCTS(time_limit=None, iterations=500, seed=1).best_move(b, Player.x) == Coord(2, 7)
+
+    def test_blocks_four(self):
+        b = line(Board((0, 14), (0, 14)), Coord(3, 7), Direction.right, 4, Player.x)
+        b[Coord(2, 7)] = Player.o
+        b[Coord(6, 9)] = Player.o
+        assert MCTS(time_limit=None, iterations=1000, seed=1).best_move(b, Player.o) == Coord(7, 7)
+
+    def test_iterations_budget(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=None, iterations=50, seed=1)
+        mcts.best_move(b, Player.o)
+        assert mcts.playouts == 50
+        assert mcts.playout_moves > 50
+        assert mcts.playouts_per_second > 0
+
+    def test_time_budget(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=0.05, seed=1)
+        mcts.best_move(b, Player.o)
+        assert mcts.playouts > 0
+        assert 0.05 <= mcts.elapsed < 1
+
+    @pytest.mark.parametrize('time_limit', [0.0, 1e-9])
+    def test_exhausted_time_budget(self, time_limit):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=time_limit, seed=1)
+        assert mcts.best_move(b, Player.o) in Analysis(b).find_empty_adjacent_fields()
+        assert mcts.playouts == 1
+
+    def test_leaves_board_unchanged(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        b[Coord(8, 7)] = Player.o
+        before, zobrist_hash = b.to_array().copy(), b.zobrist_hash
+        MCTS(time_limit=None, iterations=100, seed=1).best_move(b, Player.x)
+        assert (b.to_array() == before).all()
+        assert b.zobrist_hash == zobrist_hash
+
+    def test_draw_when_no_moves_left(self):
+        b = Board((0, 1), (0, 1))
+        b[Coord(0, 0)] = Player.x
+        mcts = MCTS(time_limit=None, iterations=30, seed=1)
+        assert mcts.best_move(b, Player.o) in {Coord(1, 0), Coord(0, 1), Coord(1, 1)}
+
+    def test_no_moves_next_to_stones(self):
+        b = Board((0, 2), (0, 1))
+        b[Coord(0, 0)] = Player.x
+        assert MCTS(iterations=10, radius=0).best_move(b, Player.o) == Coord(1, 0)
+
+    def test_full_board(self):
+        b = Board((0, 1), (0, 1))
+        for coord, player in zip(b.fields(), [Player.x, Player.o, Player.o, Player.x]):
+            b[coord[0]] = player
+        with pytest.raises(ValueError):
+            MCTS(iterations=10).best_move(b, Player.x)
+
+    def test_short_playouts(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=None, iterations=20, playout_depth=2, seed=1)
+        mcts.best_move(b, Player.o)
+        assert mcts.playout_moves <= 40
+
+    def test_reuses_tree(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=None, iterations=300, seed=1)
+        move = mcts.best_move(b, Player.o)
+        b[move] = Player.o
+        reply, child = mcts._root.most_visited()
+        b[reply] = Player.x
+        visits = child.visits
+
+        mcts.best_move(b, Player.o)
+        assert mcts.reused_visits == visits > 0
+        assert child.visits == visits + 300
+
+    def test_new_tree_after_unexplored_reply(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=None, iterations=100, seed=1)
+        b[mcts.best_move(b, Player.o)] = Player.o
+        b[Coord(0, 14)] = Player.x
+        mcts.best_move(b, Player.o)
+        assert mcts.reused_visits == 0
+
+    def test_instrumentation(self):
+        b = Board((0, 14), (0, 14))
+        b[Coord(7, 7)] = Player.x
+        mcts = MCTS(time_limit=None, iterations=20, seed=1)
+        with instrument() as registry:
+            mcts.best_move(b, Player.o)
+        assert registry.counters['mcts.playouts'] == 20
+        assert registry.counters['mcts.playout_moves'] == mcts.playout_moves
+        assert registry.timings['mcts.search'].count == 1
@@ -1,5 +1,13 @@
 import pytest
-from five_in_row.model import Coord, Player, Board, Direction
+import numpy
+import pickle
+from random import Random
+from five_in_row.analysis import Analysis
+from five_in_row.model import (
+    Coord, CoordPool, Player, Board, BitBoard, SparseBoard, Frontier, Direction, Symmetry, Symmetries, zobrist_key,
+    coord_pool
+)
+from tests.factories import random_board, random_stones
 
 
 @pytest.mark.unit
@@ -18,6 +26,32 @@ class TestCoord:
         c1 = Coord(1, 2)
         assert c1.__repr__() == '<1:2>'
 
+    def test_immutable(self):
+        c1 = Coord(1, 2)
+        with pytest.raises(AttributeError):
+            c1.x = 3
+        with pytest.raises(AttributeError):
+            c1.z = 3
+        assert not hasattr(c1, '__dict__')
+
+    def test_pickle(self):
+        c1 = pickle.loads(pickle.dumps(Coord(1, 2)))
+        assert c1 == Coord(1, 2)
+        assert hash(c1) == hash(Coord(1, 2))
+
+    def test_pooled_coord_equals_plain_coord(self):
+        pool = CoordPool((0, 2), (0, 2))
+        assert pool.get(1, 2) == Coord(1, 2)
+        assert hash(pool.get(1, 2)) == hash(Coord(1, 2))
+
+    def test_pooled_adjacent_is_interned(self):
+        pool = CoordPool((0, 2), (0, 2))
+        assert pool.get(1, 1).adjacent(Direction.up_left) is pool.get(0, 0)
+
+    def test_pooled_adjacent_out_of_bounds(self):
+        pool = CoordPool((0, 2), (0, 2))
+        assert pool.get(0, 0).adjacent(Direction.up_left) == Coord(-1, -1)
+
     @pytest.mark.parametrize('direction, result', [
         (Direction.up_right, (11, 19)),
         (Direction.right, (11, 20)),
@@ -48,6 +82,38 @@ class TestCoord:
         assert c1.distance(c2) == c2.distance(c1) == pytest.approx(distance)
 
 
+@pytest.mark.unit
+class TestCoordPool:
+    def test_get_is_interned(self):
+        pool = CoordPool((-1, 2), (3, 4))
+        assert pool.get(-1, 3) is pool.get(-1, 3)
+        assert pool.get(2, 4) is pool.get(2, 4)
+        assert pool.get(3, 4) is not pool.get(3, 4)
+
+    def test_iterate_row_by_row(self):
+        pool = CoordPool((-1, 0), (3, 4))
+        assert list(pool) == [Coord(-1, 3), Coord(0, 3), Coord(-1, 4), Coord(0, 4)]
+        assert len(pool) == 4
+
+    def test_coords_created_on_first_use(self):
+        pool = CoordPool((0, 999), (0, 999))
+        assert len(pool._coords) == 0
+        coord = pool.get(500, 600)
+        assert list(pool._coords.values()) == [coord]
+        assert next(iter(pool)) is pool.get(0, 0)
+        assert len(pool) == 1000 * 1000
+
+    def test_shared_pool(self):
+        assert coord_pool((0, 4), (0, 4)) is coord_pool((0, 4), (0, 4))
+        assert coord_pool((0, 4), (0, 4)) is not coord_pool((0, 5), (0, 4))
+
+    @pytest.mark.parametrize('board_class', [Board, BitBoard])
+    def test_board_with_list_bounds(self, board_class):
+        b = board_class([0, 4], [0, 4])
+        assert b._coords is coord_pool((0, 4), (0, 4))
+        assert b.coord(2, 3) is coord_pool((0, 4), (0, 4)).get(2, 3)
+
+
 @pytest.mark.unit
 class TestDirection:
     @pytest.mark.parametrize('direction, x, y', [
@@ -226,6 +292,76 @@ class TestBoard:
             Coord(1, 1)
         ]
 
+    def test_occupied_xy(self):
+        board = Board((0, 2), (0, 1))
+        board[Coord(2, 0)] = Player.x
+        board[Coord(0, 1)] = Player.o
+        board[Coord(1, 1)] = Player.x
+        assert [array.tolist() for array in board.occupied_xy()] == [[2, 0, 1], [0, 1, 1]]
+        assert [array.tolist() for array in board.occupied_xy(Player.x)] == [[2, 1], [0, 1]]
+        assert [array.tolist() for array in board.open_xy()] == [[0, 1, 2], [0, 0, 1]]
+
+    def test_xy_same_as_fields(self):
+        board = Board((0, 9), (0, 9))
+        random = Random(1)
+        for _ in range(40):
+            board[Coord(random.randrange(10), random.randrange(10))] = random.choice(list(Player))
+        for player in [None, Player.x, Player.o]:
+            xs, ys = board.occupied_xy(player)
+            assert [Coord(x, y) for x, y in zip(xs, ys)] == [coord for coord, _ in board.occupied_fields(player)]
+        assert [Coord(x, y) for x, y in zip(*board.open_xy())] == list(board.open_fields())
+
+    def test_fields_reuse_coords(self):
+        b1 = Board((0, 3), (0, 3))
+        b2 = Board((0, 3), (0, 3))
+        assert all(c1 is c2 for (c1, _), (c2, _) in zip(b1.fields(), b2.fields()))
+        assert b1.coord(2, 1) is next(coord for coord, _ in b2.fields() if coord == Coord(2, 1))
+
+    def test_to_array(self):
+        board = Board((0, 2), (0, 1))
+        board[Coord(0, 0)] = Player.x
+        board[Coord(2, 1)] = Player.o
+        assert board.to_array().tolist() == [[1, 0, 0], [0, 0, 2]]
+        assert board.to_array().dtype == numpy.int8
+        assert not board.to_array().flags.writeable
+
+    def test_subscribe_to_changes(self, mocker):
+        board = Board((0, 1), (0, 1))
+        listener = mocker.Mock()
+        board.subscribe(listener)
+        board[Coord(0, 1)] = Player.o
+        board[Coord(0, 1)] = Player.x
+        board.unsubscribe(listener)
+        board[Coord(0, 1)] = None
+
+        assert listener.call_args_list == [
+            mocker.call(Coord(0, 1), None, Player.o),
+            mocker.call(Coord(0, 1), Player.o, Player.x)
+        ]
+
+    def test_zobrist_hash_is_independent_of_move_order(self):
+        b1 = Board((0, 5), (0, 5))
+        b1[Coord(1, 1)] = Player.x
+        b1[Coord(2, 2)] = Player.o
+        b2 = BitBoard((0, 5), (0, 5))
+        b2[Coord(2, 2)] = Player.o
+        b2[Coord(1, 1)] = Player.x
+        assert b1.zobrist_hash == b2.zobrist_hash != 0
+
+    def test_zobrist_hash_follows_changes(self):
+        board = Board((0, 5), (0, 5))
+        board[Coord(1, 1)] = Player.x
+        x_hash = board.zobrist_hash
+        board[Coord(1, 1)] = Player.o
+        assert board.zobrist_hash not in (0, x_hash)
+        board[Coord(1, 1)] = None
+        assert board.zobrist_hash == 0
+
+    def test_zobrist_keys_differ(self):
+        keys = {zobrist_key(x, y, player) for x in range(-5, 5) for y in range(-5, 5) for player in Player}
+        assert len(keys) == 200
+        assert all(0 <= key < 2 ** 64 for key in keys)
+
     def test_open_field(self):
         board = Board((0, 1), (0, 1))
         assert board.is_open(Coord(0, 0))
@@ -234,3 +370,614 @@ class TestBoard:
         board = Board((0, 1), (0, 1))
         board[Coord(0, 0)] = Player.o
         assert not board.is_open(Coord(0, 0))
+
+
+BOUNDS = [((0, 9), (0, 9)), ((-7, 7), (-7, 7)), ((5, 14), (-20, -11))]
+
+
+def translated(board, dx, dy):
+    moved = Board((board.min_x + dx, board.max_x + dx), (board.min_y + dy, board.max_y + dy))
+    for coord, player in board.occupied_fields():
+        moved[Coord(coord.x + dx, coord.y + dy)] = player
+    return moved
+
+
+@pytest.mark.unit
+class TestBoardBounds:
+    @pytest.mark.parametrize('board_class', [Board, BitBoard])
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_get_what_was_set(self, board_class, x_bounds, y_bounds):
+        b = board_class(x_bounds, y_bounds)
+        corners = [Coord(x, y) for x in x_bounds for y in y_bounds]
+        for index, coord in enumerate(corners):
+            b[coord] = list(Player)[index % 2]
+        for index, coord in enumerate(corners):
+            assert b[coord] is list(Player)[index % 2]
+            assert b.get_xy(coord.x, coord.y) is b[coord]
+            assert b.to_array()[coord.y - y_bounds[0], coord.x - x_bounds[0]] == b[coord].code
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_set_xy(self, x_bounds, y_bounds):
+        b = Board(x_bounds, y_bounds)
+        changes = []
+        b.set_xy(x_bounds[1], y_bounds[0], Player.x)
+        b.subscribe(lambda coord, previous, value: changes.append((coord, previous, value)))
+        b.set_xy(x_bounds[1], y_bounds[0], Player.o)
+        assert b[Coord(x_bounds[1], y_bounds[0])] is Player.o
+        assert changes == [(Coord(x_bounds[1], y_bounds[0]), Player.x, Player.o)]
+        assert changes[0][0] is b.coord(b.width - 1, 0)
+        assert b.zobrist_hash == zobrist_key(x_bounds[1], y_bounds[0], Player.o)
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_out_of_bounds(self, x_bounds, y_bounds):
+        b = Board(x_bounds, y_bounds)
+        for x, y in [(x_bounds[0] - 1, y_bounds[0]), (x_bounds[1], y_bounds[1] + 1)]:
+            assert not b.contains_xy(x, y)
+            assert Coord(x, y) not in b
+            with pytest.raises(IndexError):
+                b.get_xy(x, y)
+            with pytest.raises(IndexError):
+                b.set_xy(x, y, Player.x)
+            with pytest.raises(IndexError):
+                b[Coord(x, y)]
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_fields_in_board_coords(self, x_bounds, y_bounds):
+        b = random_board(1, x_bounds, y_bounds, stones=30)
+        fields = list(b.fields())
+        assert fields[0][0] == Coord(x_bounds[0], y_bounds[0]) == b.coord(0, 0)
+        assert fields[-1][0] == Coord(x_bounds[1], y_bounds[1])
+        assert all(b[coord] is player for coord, player in fields)
+        assert list(b.occupied_fields()) == [(coord, player) for coord, player in fields if player]
+        assert list(b.open_fields()) == [coord for coord, player in fields if player is None]
+        xs, ys = b.occupied_xy()
+        assert [Coord(x, y) for x, y in zip(xs, ys)] == [coord for coord, _ in b.occupied_fields()]
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_bit_board_fields(self, x_bounds, y_bounds):
+        b = random_board(1, x_bounds, y_bounds, stones=30)
+        bit_board = random_board(1, x_bounds, y_bounds, stones=30, board_class=BitBoard)
+        assert list(bit_board.occupied_fields()) == list(b.occupied_fields())
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_frontier(self, x_bounds, y_bounds):
+        b = Board(x_bounds, y_bounds)
+        frontier = b.frontier()
+        for coord, player in random_stones(1, x_bounds, y_bounds, stones=30):
+            b[coord] = player
+        b[Coord(x_bounds[0], y_bounds[1])] = Player.x
+        assert set(frontier) == brute_force_frontier(b, 1)
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_analysis_independent_of_offset(self, x_bounds, y_bounds):
+        b = random_board(1, x_bounds, y_bounds, stones=30)
+        moved = translated(b, -x_bounds[0], -y_bounds[0])
+        for player in Player:
+            sequences = Analysis(b).find_sequences(player)
+            moved_sequences = Analysis(moved).find_sequences(player)
+            assert [
+                (Coord(s.start.x - x_bounds[0], s.start.y - y_bounds[0]), s.direction, len(s), s.start_open_points)
+                for s in sequences
+            ] == [(s.start, s.direction, len(s), s.start_open_points) for s in moved_sequences]
+            assert Analysis(b).get_average_center_distance(player) == \
+                pytest.approx(Analysis(moved).get_average_center_distance(player))
+
+    @pytest.mark.parametrize('x_bounds, y_bounds', BOUNDS)
+    def test_canonical_independent_of_offset(self, x_bounds, y_bounds):
+        b = random_board(1, x_bounds, y_bounds, stones=30)
+        moved = translated(b, -x_bounds[0], -y_bounds[0])
+        assert b.canonical() == moved.canonical()
+        _, symmetry = b.canonical()
+        corner = b.coord(b.width - 1, 0)
+        assert b.from_canonical(b.to_canonical(Coord(x_bounds[1], y_bounds[0]), symmetry), symmetry) is corner
+
+
+def brute_force_frontier(board, radius):
+    stones = {coord for coord, _ in board.occupied_fields()}
+    return {
+        coord for coord in board.open_fields()
+        if any(max(abs(coord.x - stone.x), abs(coord.y - stone.y)) <= radius for stone in stones)
+    }
+
+
+def new_board(board_class):
+    return SparseBoard() if board_class is SparseBoard else board_class((-7, 7), (-7, 7))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('board_class', [Board, BitBoard, SparseBoard])
+class TestMoveStack:
+    def test_push_pop(self, board_class):
+        b = new_board(board_class)
+        b[Coord(1, 1)] = Player.o
+        fields, zobrist_hash = b.to_array().copy(), b.zobrist_hash
+
+        b.push(Coord(2, 3), Player.x)
+        b.push(Coord(-7, 7), Player.o)
+        assert b[Coord(2, 3)] is Player.x
+        assert b.moves == [(Coord(2, 3), Player.x), (Coord(-7, 7), Player.o)]
+
+        assert b.pop() == (Coord(-7, 7), Player.o)
+        assert b.pop() == (Coord(2, 3), Player.x)
+        assert b.moves == []
+        assert (b.to_array() == fields).all()
+        assert b.zobrist_hash == zobrist_hash
+
+    def test_push_occupied(self, board_class):
+        b = new_board(board_class)
+        b.push(Coord(0, 0), Player.x)
+        with pytest.raises(ValueError):
+            b.push(Coord(0, 0), Player.o)
+        assert b.moves == [(Coord(0, 0), Player.x)]
+
+    def test_pop_empty(self, board_class):
+        with pytest.raises(IndexError):
+            new_board(board_class).pop()
+
+    def test_pop_keeps_frontier(self, board_class):
+        b = new_board(board_class)
+        b[Coord(0, 0)] = Player.x
+        frontier = b.frontier(radius=2)
+        expected = set(frontier)
+        for x in range(1, 4):
+            b.push(Coord(x, x), Player.o)
+        for _ in range(3):
+            b.pop()
+        assert set(frontier) == expected
+
+    def test_snapshot(self, board_class):
+        b = new_board(board_class)
+        b.push(Coord(2, 2), Player.x)
+        snapshot = b.snapshot()
+        assert type(snapshot) is board_class
+        assert (snapshot.to_array() == b.to_array()).all()
+        assert snapshot.zobrist_hash == b.zobrist_hash
+        assert snapshot.moves == b.moves
+
+        snapshot.push(Coord(3, 3), Player.o)
+        b.pop()
+        assert snapshot[Coord(2, 2)] is Player.x
+        assert snapshot[Coord(3, 3)] is Player.o
+        assert b[Coord(2, 2)] is None
+        assert b[Coord(3, 3)] is None
+        assert snapshot.pop() == (Coord(3, 3), Player.o)
+        assert snapshot.pop() == (Coord(2, 2), Player.x)
+
+    def test_snapshot_has_own_listeners(self, board_class):
+        b = new_board(board_class)
+        changes = []
+        b.subscribe(lambda *change: changes.append(change))
+        frontier = b.frontier()
+        snapshot = b.snapshot()
+        snapshot[Coord(0, 0)] = Player.x
+        assert changes == []
+        assert len(frontier) == 0
+        assert len(snapshot.frontier()) == 8
+
+
+@pytest.mark.unit
+class TestSnapshot:
+    def test_shares_storage_until_changed(self):
+        b = random_board(1, (0, 9), (0, 9), stones=30)
+        snapshot = b.snapshot()
+        assert numpy.shares_memory(b.to_array(), snapshot.to_array())
+
+        snapshot[Coord(0, 0)] = None
+        assert not numpy.shares_memory(b.to_array(), snapshot.to_array())
+
+    def test_original_copies_storage_on_change(self):
+        b = random_board(1, (0, 9), (0, 9), stones=30)
+        snapshot = b.snapshot()
+        before = snapshot.to_array().copy()
+        b[Coord(0, 0)] = Player.o if b[Coord(0, 0)] is Player.x else Player.x
+        assert (snapshot.to_array() == before).all()
+
+    def test_symmetries_of_snapshot(self):
+        b = random_board(1, (0, 9), (0, 9), stones=30)
+        b.canonical()
+        snapshot = b.snapshot()
+        snapshot[Coord(4, 4)] = Player.x
+        assert snapshot.symmetries().hashes == Symmetries(snapshot).hashes
+        assert b.symmetries().hashes == Symmetries(b).hashes
+
+
+@pytest.mark.unit
+class TestFrontier:
+    def test_empty_board(self):
+        b = Board((0, 9), (0, 9))
+        assert len(b.frontier()) == 0
+        assert list(b.frontier()) == []
+
+    def test_single_stone(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(5, 5)] = Player.x
+        assert set(b.frontier()) == {
+            Coord(4, 4), Coord(5, 4), Coord(6, 4),
+            Coord(4, 5), Coord(6, 5),
+            Coord(4, 6), Coord(5, 6), Coord(6, 6)
+        }
+        assert Coord(5, 5) not in b.frontier()
+
+    def test_clipped_by_bounds(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(0, 0)] = Player.x
+        assert set(b.frontier()) == {Coord(1, 0), Coord(0, 1), Coord(1, 1)}
+
+    def test_radius(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(5, 5)] = Player.x
+        assert len(b.frontier(2)) == 24
+        assert Coord(3, 7) in b.frontier(2)
+        assert Coord(3, 7) not in b.frontier(1)
+
+    def test_shared_per_radius(self):
+        b = Board((0, 9), (0, 9))
+        assert b.frontier() is b.frontier(1)
+        assert b.frontier(1) is not b.frontier(2)
+        assert b.frontier(2).radius == 2
+
+    def test_built_from_existing_stones(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(2, 2)] = Player.x
+        b[Coord(3, 3)] = Player.o
+        assert set(Frontier(b)) == brute_force_frontier(b, 1)
+
+    def test_count(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(2, 2)] = Player.x
+        b[Coord(4, 2)] = Player.o
+        frontier = b.frontier()
+        assert frontier.count(Coord(3, 2)) == 2
+        assert frontier.count(Coord(1, 1)) == 1
+        assert frontier.count(Coord(8, 8)) == 0
+
+    def test_ordered(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(2, 2)] = Player.x
+        b[Coord(4, 2)] = Player.o
+        ordered = b.frontier().ordered()
+        assert ordered[:3] == [Coord(3, 1), Coord(3, 2), Coord(3, 3)]
+        assert ordered[3:] == sorted(ordered[3:], key=lambda coord: (coord.y, coord.x))
+        assert set(ordered) == set(b.frontier())
+
+    def test_replacing_stone(self):
+        b = Board((0, 9), (0, 9))
+        b[Coord(5, 5)] = Player.x
+        b[Coord(5, 5)] = Player.o
+        assert b.frontier().count(Coord(5, 6)) == 1
+        b[Coord(5, 5)] = None
+        b[Coord(5, 5)] = None
+        assert len(b.frontier()) == 0
+
+    def test_removing_stones(self):
+        b = Board((0, 9), (0, 9))
+        frontier = b.frontier()
+        b[Coord(5, 5)] = Player.x
+        b[Coord(6, 5)] = Player.o
+        b[Coord(5, 5)] = None
+        assert Coord(5, 5) in frontier
+        assert Coord(4, 5) not in frontier
+        b[Coord(6, 5)] = None
+        assert len(frontier) == 0
+
+    @pytest.mark.parametrize('radius', [1, 2, 3])
+    def test_random_game(self, radius):
+        random = Random(radius)
+        b = Board((0, 14), (0, 14))
+        frontier = b.frontier(radius)
+        played = []
+        for turn in range(120):
+            if played and random.random() < 0.3:
+                b[played.pop(random.randrange(len(played)))] = None
+            else:
+                coord = Coord(random.randrange(15), random.randrange(15))
+                b[coord] = random.choice(list(Player))
+                played.append(coord)
+            assert set(frontier) == brute_force_frontier(b, radius)
+
+    def test_sparse_board(self):
+        b = SparseBoard()
+        b[Coord(-100, 50)] = Player.x
+        b[Coord(-98, 50)] = Player.o
+        assert len(b.frontier()) == 13
+        assert Coord(-101, 49) in b.frontier()
+
+
+def transformed_board(stones, symmetry, width=9, height=9):
+    new_width, new_height = symmetry.shape(width, height)
+    b = Board((0, new_width - 1), (0, new_height - 1))
+    for coord, player in stones.items():
+        b[Coord(*symmetry.apply(coord.x, coord.y, width, height))] = player
+    return b
+
+
+@pytest.mark.unit
+class TestSymmetry:
+    @pytest.mark.parametrize('symmetry', list(Symmetry))
+    def test_inverse(self, symmetry):
+        for x, y in [(0, 0), (3, 1), (6, 4)]:
+            assert symmetry.inverse.apply(*symmetry.apply(x, y, 7, 5), *symmetry.shape(7, 5)) == (x, y)
+        for direction in Direction:
+            assert symmetry.inverse.direction(symmetry.direction(direction)) is direction
+
+    def test_rotation(self):
+        assert Symmetry.rotate_90.apply(0, 0, 7, 5) == (4, 0)
+        assert Symmetry.rotate_90.direction(Direction.right) is Direction.down
+        assert Symmetry.rotate_90.inverse is Symmetry.rotate_270
+        assert Symmetry.flip_x.inverse is Symmetry.flip_x
+
+    @pytest.mark.parametrize('symmetry', list(Symmetry))
+    def test_direction_follows_coords(self, symmetry):
+        for direction in Direction:
+            x, y = symmetry.apply(2, 2, 5, 5)
+            moved = symmetry.direction(direction)
+            assert symmetry.apply(2 + direction.x, 2 + direction.y, 5, 5) == (x + moved.x, y + moved.y)
+
+    @pytest.mark.parametrize('symmetry', list(Symmetry))
+    def test_transform_array(self, symmetry):
+        array = numpy.arange(35).reshape(5, 7)
+        transformed = symmetry.transform(array)
+        assert transformed.base is not None
+        assert transformed.shape == symmetry.shape(7, 5)[::-1]
+        for y in range(5):
+            for x in range(7):
+                new_x, new_y = symmetry.apply(x, y, 7, 5)
+                assert transformed[new_y, new_x] == array[y, x]
+
+
+@pytest.mark.unit
+class TestSymmetries:
+    def test_empty_board(self):
+        b = Board((0, 9), (0, 9))
+        assert b.canonical() == (0, Symmetry.identity)
+        assert b.symmetries() is b.symmetries()
+
+    def test_identity_hash(self):
+        b = transformed_board(dict(random_stones(1, (0, 8), (0, 8), stones=12)), Symmetry.identity)
+        assert b.symmetries().hashes[0] == b.zobrist_hash
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_same_canonical_form(self, seed):
+        stones = dict(random_stones(seed, (0, 8), (0, 8), stones=12))
+        boards = [transformed_board(stones, symmetry) for symmetry in Symmetry]
+        assert len({b.zobrist_hash for b in boards}) > 1
+        assert len({b.canonical()[0] for b in boards}) == 1
+        for b in boards:
+            assert numpy.array_equal(b.canonical_array(), boards[0].canonical_array())
+
+    def test_non_square_board(self):
+        stones = dict(random_stones(1, (0, 8), (0, 5), stones=12))
+        boards = [transformed_board(stones, symmetry, 9, 6) for symmetry in Symmetry if not symmetry.swaps_axes]
+        assert len(boards[0].symmetries().hashes) == 4
+        assert len({b.canonical()[0] for b in boards}) == 1
+
+    def test_updated_incrementally(self):
+        random = Random(2)
+        b = Board((0, 8), (0, 8))
+        symmetries = b.symmetries()
+        for _ in range(60):
+            b[Coord(random.randrange(9), random.randrange(9))] = random.choice([Player.x, Player.o, None])
+            assert symmetries.hashes == Symmetries(b).hashes
+
+    def test_map_coords(self):
+        b = Board((10, 18), (-4, 4))
+        b[Coord(11, -3)] = Player.x
+        _, symmetry = b.canonical()
+        canonical = b.to_canonical(Coord(11, -3), symmetry)
+        assert b.canonical_array()[canonical.y, canonical.x] == Player.x.code
+        for coord in [Coord(11, -3), Coord(18, 4), Coord(14, 0)]:
+            assert b.from_canonical(b.to_canonical(coord, symmetry), symmetry) == coord
+
+    def test_sparse_board(self):
+        with pytest.raises(ValueError):
+            SparseBoard().symmetries()
+
+
+@pytest.mark.unit
+class TestBitBoard:
+    def test_empty_board_defaults_none(self):
+        board = BitBoard((0, 3), (0, 5))
+        for x in range(0, 4):
+            for y in range(0, 6):
+                assert board[Coord(x, y)] is None
+
+    def test_get_set_item(self):
+        board = BitBoard((0, 4), (0, 2))
+        board[Coord(2, 2)] = Player.x
+        board[Coord(4, 1)] = Player.o
+        assert board[Coord(2, 2)] is Player.x
+        assert board[Coord(4, 1)] is Player.o
+        assert board.bits(Player.x) == 1 << (2 * 6 + 2)
+        assert board.bits(Player.o) == 1 << (1 * 6 + 4)
+
+    def test_overwrite_and_clear_item(self):
+        board = BitBoard((0, 4), (0, 2))
+        board[Coord(2, 2)] = Player.x
+        board[Coord(2, 2)] = Player.o
+        assert board[Coord(2, 2)] is Player.o
+        assert board.bits(Player.x) == 0
+        board[Coord(2, 2)] = None
+        assert board.is_open(Coord(2, 2))
+        assert board.bits(Player.o) == 0
+
+    def test_to_array(self):
+        board = BitBoard((0, 2), (0, 1))
+        board[Coord(0, 0)] = Player.x
+        board[Coord(2, 1)] = Player.o
+        assert board.to_array().tolist() == [[1, 0, 0], [0, 0, 2]]
+        assert board.to_array().dtype == numpy.int8
+
+    def test_set_item_out_of_bounds(self):
+        board = BitBoard((0, 4), (0, 2))
+        with pytest.raises(IndexError):
+            board[Coord(5, 0)] = Player.x
+
+    def test_string_repr(self):
+        board = BitBoard((0, 4), (0, 2))
+        board[Coord(2, 2)] = Player.x
+        board[Coord(3, 0)] = Player.o
+        assert str(board) == (
+            '···o·\n'
+            '·····\n'
+            '··˟··\n'
+        )
+
+    def test_iterate_fields_same_as_board(self):
+        board = Board((0, 3), (0, 3))
+        bit_board = BitBoard((0, 3), (0, 3))
+        for coord, player in [(Coord(0, 0), Player.x), (Coord(3, 0), Player.o), (Coord(1, 2), Player.x)]:
+            board[coord] = player
+            bit_board[coord] = player
+
+        assert list(bit_board.fields()) == list(board.fields())
+        assert list(bit_board.occupied_fields()) == list(board.occupied_fields())
+        assert list(bit_board.occupied_fields(Player.x)) == list(board.occupied_fields(Player.x))
+        assert list(bit_board.occupied_fields(Player.o)) == list(board.occupied_fields(Player.o))
+        assert list(bit_board.open_fields()) == list(board.open_fields())
+
+    @pytest.mark.parametrize('coords, direction', [
+        ([(0, 1), (1, 1), (2, 1), (3, 1), (4, 1)], Direction.right),
+        ([(2, 0), (2, 1), (2, 2), (2, 3), (2, 4)], Direction.down),
+        ([(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)], Direction.down_right),
+        ([(0, 4), (1, 3), (2, 2), (3, 1), (4, 0)], Direction.up_right),
+    ])
+    def test_line_starts(self, coords, direction):
+        board = BitBoard((0, 4), (0, 4))
+        for x, y in coords:
+            board[Coord(x, y)] = Player.x
+
+        assert board.line_starts(Player.x, direction, 5) == 1 << (coords[0][1] * 6 + coords[0][0])
+        assert board.line_starts(Player.x, direction.reversed, 5) == 1 << (coords[-1][1] * 6 + coords[-1][0])
+        assert board.has_line(Player.x)
+        assert not board.has_line(Player.o)
+
+    def test_line_does_not_wrap_rows(self):
+        board = BitBoard((0, 2), (0, 2))
+        for coord in [Coord(1, 0), Coord(2, 0), Coord(0, 1), Coord(1, 1)]:
+            board[coord] = Player.x
+
+        assert not board.has_line(Player.x, 4)
+        assert board.has_line(Player.x, 2)
+
+
+@pytest.mark.unit
+class TestSparseBoard:
+    def test_empty_board(self):
+        board = SparseBoard()
+        assert board[Coord(-1000, 1000)] is None
+        assert (board.min_x, board.max_x, board.min_y, board.max_y) == (0, 0, 0, 0)
+        assert list(board.occupied_fields()) == []
+        assert board.stones == 0
+
+    def test_every_coord_is_on_board(self):
+        board = SparseBoard()
+        assert Coord(-1000000, 1000000) in board
+
+    def test_get_set_item(self):
+        board = SparseBoard(tile_size=4)
+        board[Coord(-5, 7)] = Player.x
+        board[Coord(100, -3)] = Player.o
+        assert board[Coord(-5, 7)] is Player.x
+        assert board[Coord(100, -3)] is Player.o
+        assert board.stones == 2
+
+    def test_clear_unallocated_field(self):
+        board = SparseBoard()
+        board[Coord(5, 5)] = None
+        assert board.stones == 0
+
+    def test_allocates_tiles_lazily(self):
+        board = SparseBoard(tile_size=4)
+        board[Coord(0, 0)] = Player.x
+        board[Coord(3, 3)] = Player.o
+        board[Coord(-1, 0)] = Player.o
+        board[Coord(4000, 0)] = Player.o
+        assert len(board._tiles) == 3
+
+    def test_bounds_track_occupied_extent(self):
+        board = SparseBoard(tile_size=4)
+        board[Coord(2, 3)] = Player.x
+        assert (board.min_x, board.max_x, board.min_y, board.max_y) == (2, 2, 3, 3)
+        board[Coord(-5, 10)] = Player.o
+        board[Coord(0, 0)] = Player.x
+        assert (board.min_x, board.max_x, board.min_y, board.max_y) == (-5, 2, 0, 10)
+        assert (board.width, board.height) == (8, 11)
+
+        board[Coord(-5, 10)] = None
+        assert (board.min_x, board.max_x, board.min_y, board.max_y) == (0, 2, 0, 3)
+        board[Coord(0, 0)] = Player.o
+        board[Coord(1, 1)] = Player.o
+        assert board.stones == 3
+        board[Coord(1, 1)] = None
+        assert (board.min_x, board.max_x, board.min_y, board.max_y) == (0, 2, 0, 3)
+        board[Coord(0, 0)] = None
+        board[Coord(2, 3)] = None
+        assert (board.min_x, board.max_x, board.min_y, board.max_y) == (0, 0, 0, 0)
+
+    def test_string_repr(self):
+        board = SparseBoard()
+        board[Coord(-1, -1)] = Player.x
+        board[Coord(1, 0)] = Player.o
+        assert str(board) == (
+            '˟··\n'
+            '··o\n'
+        )
+
+    def test_iterate_occupied_fields(self):
+        board = SparseBoard(tile_size=2)
+        board[Coord(5, 1)] = Player.x
+        board[Coord(-3, 1)] = Player.o
+        board[Coord(0, -4)] = Player.x
+
+        assert list(board.occupied_fields()) == [
+            (Coord(0, -4), Player.x),
+            (Coord(-3, 1), Player.o),
+            (Coord(5, 1), Player.x)
+        ]
+        assert list(board.occupied_fields(Player.o)) == [(Coord(-3, 1), Player.o)]
+        assert [array.tolist() for array in board.occupied_xy()] == [[0, -3, 5], [-4, 1, 1]]
+        assert [array.tolist() for array in board.occupied_xy(Player.o)] == [[-3], [1]]
+
+    def test_iterate_fields_with_margin(self):
+        board = SparseBoard()
+        board[Coord(10, 10)] = Player.x
+        fields = list(board.fields())
+        assert len(fields) == 9 * 9
+        assert fields[0] == (Coord(6, 6), None)
+        assert fields[40] == (Coord(10, 10), Player.x)
+        assert len(list(board.open_fields())) == 9 * 9 - 1
+        xs, ys = board.open_xy()
+        assert len(xs) == 9 * 9 - 1
+        assert (xs[0], ys[0]) == (6, 6)
+
+    def test_to_array(self):
+        board = SparseBoard(tile_size=4)
+        board[Coord(-1, 0)] = Player.x
+        board[Coord(1, 0)] = Player.o
+        board[Coord(200, 0)] = Player.o
+        board[Coord(200, 0)] = None
+
+        fields = board.to_array()
+        assert fields.shape == (9, 11)
+        assert fields[4].tolist() == [0, 0, 0, 0, 1, 0, 2, 0, 0, 0, 0]
+        assert fields.sum() == 3
+        assert board.coord(4, 4) == Coord(-1, 0)
+        assert board.coord(6, 4) == Coord(1, 0)
+
+    def test_same_analysis_as_dense_board(self):
+        dense = Board((0, 30), (0, 30))
+        sparse = SparseBoard(tile_size=4)
+        random = Random(1)
+        for i in range(60):
+            coord = Coord(random.randint(10, 20), random.randint(10, 20))
+            dense[coord] = sparse[coord] = Player.x if i % 2 else Player.o
+
+        for player in Player:
+            expected = Analysis(dense).find_sequences(player)
+            for vectorized in (False, True):
+                sequences = Analysis(sparse).find_sequences(player, vectorized)
+                assert sequences == expected
+                assert [(s.start_open_points, s.end_open_points) for s in sequences] == \
+                    [(s.start_open_points, s.end_open_points) for s in expected]
+        assert Analysis(sparse).find_empty_adjacent_fields() == Analysis(dense).find_empty_adjacent_fields()
+        assert sparse.zobrist_hash == dense.zobrist_hash
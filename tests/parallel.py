@@ -0,0 +1,72 @@
+import pytest
+from five_in_row.model import Player, Coord, Board, SparseBoard
+from five_in_row.analysis import Analysis
+from five_in_row.parallel import ParallelEvaluator, evaluate_moves, pack_board, unpack_board, _evaluate_packed_moves
+from tests.factories import random_board
+
+
+@pytest.mark.unit
+class TestPackBoard:
+    def test_pack_unpack(self):
+        b = random_board(1, (0, 9), (0, 9), stones=12)
+        packed = pack_board(b)
+        assert packed[:2] == ((0, 9), (0, 9))
+        assert len(packed[2]) == 10 * 10
+
+        unpacked = unpack_board(packed)
+        assert list(unpacked.fields()) == list(b.fields())
+        assert unpacked.zobrist_hash == b.zobrist_hash
+
+    def test_pack_unpack_sparse_board(self):
+        b = SparseBoard()
+        b[Coord(-30, 12)] = Player.x
+        b[Coord(-28, 13)] = Player.o
+        packed = pack_board(b)
+        assert packed[:2] == ((-34, -24), (8, 17))
+
+        unpacked = unpack_board(packed)
+        assert list(unpacked.occupied_fields()) == list(b.occupied_fields())
+        assert unpacked.zobrist_hash == b.zobrist_hash
+
+    def test_evaluate_packed_sparse_board(self):
+        b = SparseBoard()
+        for x in range(4):
+            b[Coord(x - 50, 7)] = Player.x
+        moves = [Coord(-51, 7), Coord(-46, 7), Coord(-48, 9)]
+        assert _evaluate_packed_moves(pack_board(b), Player.x, moves) == evaluate_moves(b, Player.x, moves)
+
+
+@pytest.mark.unit
+class TestEvaluateMoves:
+    def test_leaves_board_unchanged(self):
+        b = random_board(2, (0, 9), (0, 9), stones=12)
+        before = list(b.fields())
+        evaluate_moves(b, Player.x, sorted(Analysis(b).find_empty_adjacent_fields(), key=lambda c: (c.y, c.x)))
+        assert list(b.fields()) == before
+
+    def test_winning_move_scores_best(self):
+        b = Board((0, 9), (0, 9))
+        for x in range(4):
+            b[Coord(x, 0)] = Player.x
+        scores = evaluate_moves(b, Player.x, [Coord(4, 0), Coord(5, 5)])
+        assert scores[0] > scores[1]
+
+    def test_evaluate_packed_board(self):
+        b = random_board(3, (0, 9), (0, 9), stones=12)
+        moves = [coord for coord in b.open_fields()][:5]
+        assert _evaluate_packed_moves(pack_board(b), Player.x, moves) == evaluate_moves(b, Player.x, moves)
+
+    @pytest.mark.parametrize('chunksize', [None, 1, 7])
+    def test_parallel_same_as_serial(self, chunksize):
+        b = random_board(3, (0, 9), (0, 9), stones=12)
+        moves = sorted(Analysis(b).find_empty_adjacent_fields(), key=lambda c: (c.y, c.x))
+        with ParallelEvaluator(workers=2, chunksize=chunksize) as evaluator:
+            assert evaluator.evaluate_moves(b, Player.o, moves) == evaluate_moves(b, Player.o, moves)
+
+    def test_default_workers(self):
+        evaluator = ParallelEvaluator()
+        try:
+            assert evaluator.workers >= 1
+            assert evaluator.evaluate_moves(random_board(4, (0, 9), (0, 9), stones=12), Player.x, []) == []
+        finally:
+            evaluator.close()
@@ -0,0 +1,62 @@
+import pytest
+from five_in_row.patterns import (
+    Shape, SHAPE_SCORES, BLOCKED, OPEN, OWN, LENGTH, line_code, shape_table, score_table
+)
+
+STATES = {'.': OPEN, 'x': OWN, 'o': BLOCKED}
+
+
+def shape(line):
+    assert len(line) == LENGTH
+    return Shape(shape_table()[line_code([STATES[field] for field in line])])
+
+
+@pytest.mark.unit
+class TestPatterns:
+    @pytest.mark.parametrize('line, expected', [
+        ('oooo.oooo', Shape.none),
+        ('ooo.x.ooo', Shape.none),
+        ('....x....', Shape.one),
+        ('...xx....', Shape.two),
+        ('o.x.x...o', Shape.two),
+        ('oxx.x....', Shape.three),
+        ('..x.xx.oo', Shape.open_three),
+        ('...xxx...', Shape.open_three),
+        ('..x.xx...', Shape.open_three),
+        ('ooxxx..oo', Shape.three),
+        ('..oxxxx..', Shape.four),
+        ('.x.xxx...', Shape.four),
+        ('oxxxx.ooo', Shape.four),
+        ('...xxxx..', Shape.open_four),
+        ('oxxxxx...', Shape.five),
+        ('xxxx.xxxx', Shape.five),
+    ])
+    def test_shape_of_stone(self, line, expected):
+        assert shape(line) is expected
+
+    def test_empty_center_is_a_move(self):
+        assert shape('..xx.x...') is Shape.open_four
+        assert shape('oxxx..ooo') is Shape.four
+        assert shape('oxxx.ooo.') is Shape.none
+
+    def test_blocked_center(self):
+        assert shape('xxxxoxxxx') is Shape.none
+
+    def test_line_code(self):
+        assert line_code([OPEN] * LENGTH) == sum(3 ** index for index in range(LENGTH))
+        assert line_code([BLOCKED] * LENGTH) == 0
+        assert line_code([OWN] + [BLOCKED] * (LENGTH - 1)) == 2
+
+    def test_tables_built_once(self):
+        assert shape_table() is shape_table()
+        assert len(shape_table()) == 3 ** LENGTH
+        assert not shape_table().flags.writeable
+
+    def test_score_table(self):
+        scores = score_table()
+        assert scores[line_code([STATES[field] for field in '...xxxx..'])] == SHAPE_SCORES[Shape.open_four]
+        assert not scores.flags.writeable
+
+    def test_scores_grow_with_shape(self):
+        scores = [SHAPE_SCORES[shape] for shape in Shape]
+        assert scores == sorted(scores)
@@ -0,0 +1,92 @@
+import pytest
+from itertools import islice, repeat
+from five_in_row.model import Player, Board
+from five_in_row.analysis import Analysis, IncrementalAnalysis
+from five_in_row.records import GameRecord
+from five_in_row.pipeline import analyse_game, analyse_games, _analyse_chunk
+from tests.factories import random_stones
+
+
+BOUNDS = (0, 9)
+
+
+def expected_positions(moves, size=10):
+    b = Board((0, size - 1), (0, size - 1))
+    for move, player in moves:
+        b[move] = player
+        a = Analysis(b)
+        yield (
+            {p: a.find_sequences(p) for p in Player},
+            {p: a.get_average_center_distance(p) for p in Player}
+        )
+
+
+def summary(results):
+    return [(r.game, r.turn, r.move, r.player, r.sequences, r.center_distances) for r in results]
+
+
+@pytest.mark.unit
+class TestAnalyseGame:
+    def test_every_position(self):
+        moves = random_stones(1, BOUNDS, BOUNDS, stones=20)
+        analysis = IncrementalAnalysis(Board((0, 9), (0, 9)))
+        results = list(analyse_game(analysis, moves, game=7))
+        assert [(r.game, r.turn, r.move, r.player) for r in results] == [
+            (7, turn, move, player) for turn, (move, player) in enumerate(moves, 1)
+        ]
+        assert [(r.sequences, r.center_distances) for r in results] == list(expected_positions(moves))
+        assert repr(results[0]) == f'<game 7 turn 1: o {moves[0][0]}>'
+
+    def test_board_emptied_after_game(self):
+        analysis = IncrementalAnalysis(Board((0, 9), (0, 9)))
+        list(analyse_game(analysis, random_stones(1, BOUNDS, BOUNDS, stones=20)))
+        assert list(analysis.board.occupied_fields()) == []
+        assert analysis.board.zobrist_hash == 0
+
+    def test_board_emptied_when_closed(self):
+        analysis = IncrementalAnalysis(Board((0, 9), (0, 9)))
+        results = analyse_game(analysis, random_stones(1, BOUNDS, BOUNDS, stones=20))
+        next(results)
+        next(results)
+        results.close()
+        assert list(analysis.board.occupied_fields()) == []
+
+
+@pytest.mark.unit
+class TestAnalyseGames:
+    def test_games_in_order(self):
+        games = [random_stones(seed, BOUNDS, BOUNDS, stones=seed + 1) for seed in range(5)]
+        results = list(analyse_games(games, (0, 9), (0, 9)))
+        assert [(r.game, r.turn) for r in results] == [
+            (game, turn) for game in range(5) for turn in range(1, game + 2)
+        ]
+        assert [(r.sequences, r.center_distances) for r in results] == [
+            position for moves in games for position in expected_positions(moves)
+        ]
+
+    def test_game_records(self):
+        games = [
+            GameRecord.from_moves(BOUNDS, BOUNDS, random_stones(seed, BOUNDS, BOUNDS, stones=20)) for seed in range(3)
+        ]
+        results = list(analyse_games(games, (0, 9), (0, 9)))
+        assert [r.move for r in results] == [move for game in games for move, _ in game]
+
+    def test_lazy(self):
+        results = analyse_games(repeat(random_stones(1, BOUNDS, BOUNDS, stones=20)), (0, 9), (0, 9))
+        assert [(r.game, r.turn) for r in islice(results, 22)][-3:] == [(0, 20), (1, 1), (1, 2)]
+
+    def test_workers(self):
+        games = [random_stones(seed, BOUNDS, BOUNDS, stones=20) for seed in range(12)]
+        serial = summary(analyse_games(games, (0, 9), (0, 9)))
+        assert summary(analyse_games(iter(games), (0, 9), (0, 9), workers=2, chunksize=3)) == serial
+
+    def test_chunk(self):
+        games = [random_stones(seed, BOUNDS, BOUNDS, stones=3) for seed in range(2)]
+        serial = summary(analyse_games(games, (0, 9), (0, 9)))
+        assert summary(_analyse_chunk(games, (0, 9), (0, 9), 10)) == [(game + 10, *rest) for game, *rest in serial]
+
+    def test_workers_stop_with_consumer(self):
+        moves = random_stones(1, BOUNDS, BOUNDS, stones=5)
+        results = analyse_games(repeat(moves), BOUNDS, BOUNDS, workers=2, chunksize=2)
+        assert [(r.game, r.turn) for r in islice(results, 12)][-2:] == [(2, 1), (2, 2)]
+        results.close()
@@ -0,0 +1,205 @@
+import pytest
+import numpy
+from five_in_row.model import Player, Coord, Board, BitBoard, SparseBoard
+from five_in_row.records import (
+    dump_board, load_board, GameRecord, RecordWriter, RecordReader, BOARD_HEADER, PACKED, MOVES
+)
+from tests.factories import random_board, random_stones
+
+
+def random_game(seed, moves=40):
+    return GameRecord.from_moves((0, 14), (0, 14), random_stones(seed, stones=moves))
+
+
+def encoding(data):
+    return numpy.frombuffer(data, dtype=BOARD_HEADER, count=1)[0]['encoding']
+
+
+@pytest.mark.unit
+class TestBoardSerialization:
+    @pytest.mark.parametrize('seed', range(5))
+    def test_dense_board(self, seed):
+        b = random_board(seed)
+        data = dump_board(b)
+        assert encoding(data) == PACKED
+        assert len(data) == BOARD_HEADER.itemsize + (15 * 15 + 3) // 4
+        loaded = load_board(data)
+        assert str(loaded) == str(b)
+        assert loaded.zobrist_hash == b.zobrist_hash
+
+    def test_sparse_board(self):
+        b = random_board(0, (0, 49), (0, 49), fill=0.01)
+        data = dump_board(b)
+        assert encoding(data) == MOVES
+        assert len(data) < BOARD_HEADER.itemsize + (50 * 50 + 3) // 4
+        assert str(load_board(data)) == str(b)
+
+    def test_empty_board(self):
+        b = Board((0, 5), (0, 9))
+        data = dump_board(b)
+        assert len(data) == BOARD_HEADER.itemsize
+        loaded = load_board(data)
+        assert (loaded.width, loaded.height) == (6, 10)
+        assert list(loaded.occupied_fields()) == []
+
+    def test_bit_board(self):
+        b = random_board(1, board_class=BitBoard)
+        assert str(load_board(dump_board(b), BitBoard((0, 14), (0, 14)))) == str(b)
+
+    def test_unbounded_board(self):
+        b = SparseBoard()
+        b[Coord(-300, 20)] = Player.x
+        b[Coord(-296, 24)] = Player.o
+        loaded = load_board(dump_board(b), SparseBoard())
+        assert list(loaded.occupied_fields()) == list(b.occupied_fields())
+        assert loaded.zobrist_hash == b.zobrist_hash
+
+    def test_far_from_origin(self):
+        b = SparseBoard()
+        b[Coord(40000, 5)] = Player.x
+        b[Coord(40003, -7)] = Player.o
+        data = dump_board(b)
+        assert encoding(data) == MOVES
+        loaded = load_board(data, SparseBoard())
+        assert list(loaded.occupied_fields()) == list(b.occupied_fields())
+
+    def test_too_wide_for_moves(self):
+        b = SparseBoard()
+        b[Coord(0, 0)] = Player.x
+        b[Coord(70000, 0)] = Player.o
+        data = dump_board(b)
+        assert encoding(data) == PACKED
+        assert list(load_board(data, SparseBoard()).occupied_fields()) == list(b.occupied_fields())
+
+    def test_offset_bounds(self):
+        b = Board((-7, 7), (5, 14))
+        b[Coord(-7, 14)] = Player.x
+        b[Coord(3, 5)] = Player.o
+        loaded = load_board(dump_board(b))
+        assert (loaded.min_x, loaded.max_x, loaded.min_y, loaded.max_y) == (-7, 7, 5, 14)
+        assert list(loaded.occupied_fields()) == [(Coord(3, 5), Player.o), (Coord(-7, 14), Player.x)]
+
+    def test_not_a_board(self):
+        with pytest.raises(ValueError):
+            load_board(b'\0' * BOARD_HEADER.itemsize)
+
+
+@pytest.mark.unit
+class TestGameRecord:
+    def test_from_moves(self):
+        moves = [(Coord(3, 4), Player.x), (Coord(-1, 2), Player.o)]
+        record = GameRecord.from_moves((-5, 5), (0, 9), moves)
+        assert len(record) == 2
+        assert list(record) == moves
+
+    def test_far_from_origin(self):
+        moves = [(Coord(40000, 5), Player.x), (Coord(-20000, 9), Player.o)]
+        record = GameRecord.from_moves((-20000, 40000), (5, 9), moves)
+        assert list(record) == moves
+        assert list(record.replay(SparseBoard()).occupied_fields()) == moves
+
+    @pytest.mark.parametrize('move', [Coord(-6, 0), Coord(6, 0), Coord(0, 10), Coord(0, -1)])
+    def test_move_out_of_bounds(self, move):
+        with pytest.raises(ValueError):
+            GameRecord.from_moves((-5, 5), (0, 9), [(move, Player.x)])
+
+    def test_move_too_far_from_minimum_bounds(self):
+        with pytest.raises(ValueError):
+            GameRecord.from_moves((0, 70000), (0, 9), [(Coord(70000, 0), Player.x)])
+
+    def test_replay(self):
+        record = GameRecord.from_moves((0, 9), (0, 9), [(Coord(3, 4), Player.x), (Coord(5, 2), Player.o)])
+        b = record.replay()
+        assert (b.min_x, b.max_x, b.min_y, b.max_y) == (0, 9, 0, 9)
+        assert list(b.occupied_fields()) == [(Coord(5, 2), Player.o), (Coord(3, 4), Player.x)]
+
+    def test_replay_on_given_board(self):
+        record = GameRecord.from_moves((-30, 9), (0, 9), [(Coord(-30, 4), Player.x)])
+        assert list(record.replay(SparseBoard()).occupied_fields()) == [(Coord(-30, 4), Player.x)]
+
+    def test_equality(self):
+        assert random_game(1) == random_game(1)
+        assert random_game(1) != random_game(2)
+        assert random_game(1) != 'game'
+
+
+@pytest.mark.unit
+class TestRecordFiles:
+    def test_write_and_read(self, tmp_path):
+        games = [random_game(seed, moves=seed % 50) for seed in range(100)]
+        with RecordWriter(tmp_path / 'games') as writer:
+            for game in games:
+                writer.write(game)
+
+        with RecordReader(tmp_path / 'games') as reader:
+            assert len(reader) == 100
+            assert list(reader) == games
+            assert reader[42] == games[42]
+            assert reader[-1] == games[-1]
+
+    def test_far_from_origin(self, tmp_path):
+        game = GameRecord.from_moves((40000, 40010), (-50000, -49990), [(Coord(40010, -49990), Player.x)])
+        with RecordWriter(tmp_path / 'games') as writer:
+            writer.write(game)
+        with RecordReader(tmp_path / 'games') as reader:
+            assert list(reader[0]) == [(Coord(40010, -49990), Player.x)]
+
+    def test_records_outlive_reader(self, tmp_path):
+        with RecordWriter(tmp_path / 'games') as writer:
+            writer.write(random_game(3))
+        reader = RecordReader(tmp_path / 'games')
+        record = reader[0]
+        reader.close()
+        assert record == random_game(3)
+
+    def test_moves_are_memory_mapped(self, tmp_path):
+        with RecordWriter(tmp_path / 'games') as writer:
+            writer.write(random_game(3))
+        with RecordReader(tmp_path / 'games') as reader:
+            assert isinstance(reader[0].moves.base, numpy.memmap)
+
+    def test_empty_file(self, tmp_path):
+        RecordWriter(tmp_path / 'games').close()
+        with RecordReader(tmp_path / 'games') as reader:
+            assert len(reader) == 0
+            assert list(reader) == []
+
+    def test_close_twice(self, tmp_path):
+        writer = RecordWriter(tmp_path / 'games')
+        writer.close()
+        writer.close()
+        assert len(RecordReader(tmp_path / 'games')) == 0
+
+    def test_not_closed_writer(self, tmp_path):
+        writer = RecordWriter(tmp_path / 'games')
+        writer.write(random_game(1))
+        writer._file.flush()
+        with pytest.raises(ValueError, match='truncated'):
+            RecordReader(tmp_path / 'games')
+
+    def test_not_a_record_file(self, tmp_path):
+        (tmp_path / 'games').write_bytes(b'x' * 100)
+        with pytest.raises(ValueError, match='not a file of game records'):
+            RecordReader(tmp_path / 'games')
+
+
+@pytest.mark.performance
+class TestRecordsPerformance:
+    def test_dump_200x200(self, benchmark):
+        b = random_board(0, (0, 199), (0, 199))
+        benchmark(dump_board, b)
+
+    def test_load_200x200(self, benchmark):
+        data = dump_board(random_board(0, (0, 199), (0, 199)))
+        benchmark(load_board, data)
+
+    def test_read_records(self, benchmark, tmp_path):
+        with RecordWriter(tmp_path / 'games') as writer:
+            for seed in range(1000):
+                writer.write(random_game(seed))
+
+        def read():
+            with RecordReader(tmp_path / 'games') as reader:
+                return sum(len(record) for record in reader)
+
+        assert benchmark(read) == 40000
@@ -0,0 +1,238 @@
+import pytest
+import time
+from itertools import count
+from types import SimpleNamespace
+from five_in_row import threats
+from five_in_row.engine import SearchTimeout
+from five_in_row.model import Player, Coord, Board, SparseBoard, Direction
+from five_in_row.analysis import Analysis, IncrementalAnalysis
+from five_in_row.cache import LRUCache
+from five_in_row.threats import (
+    ThreatType, ThreatSearch, find_threats, winning_moves, four_moves, three_moves
+)
+
+
+def board_from_rows(rows, board=None):
+    b = board or Board((0, 14), (0, 14))
+    for y, row in enumerate(rows):
+        for x, field in enumerate(row):
+            if field in 'xo':
+                b[Coord(x, y)] = Player.x if field == 'x' else Player.o
+    return b
+
+
+def kinds(board, player):
+    return [(threat.kind, threat.direction) for threat in find_threats(Analysis(board), player)]
+
+
+@pytest.mark.unit
+class TestFindThreats:
+    def test_no_threats(self):
+        b = board_from_rows(['', '..xx..x', '', 'x', '', 'oxxx.o'])
+        assert kinds(b, Player.x) == []
+
+    def test_five(self):
+        b = board_from_rows(['xxxxx'])
+        threats = find_threats(Analysis(b), Player.x)
+        assert threats[0].kind is ThreatType.five
+        assert threats[0].stones == [Coord(x, 0) for x in range(5)]
+        assert threats[0].gains == set()
+
+    def test_open_four(self):
+        b = board_from_rows(['', '.xxxx.'])
+        threats = find_threats(Analysis(b), Player.x)
+        assert [threat.kind for threat in threats] == [ThreatType.open_four]
+        assert threats[0].gains == threats[0].defences == {Coord(0, 1), Coord(5, 1)}
+
+    def test_four_blocked_by_opponent(self):
+        b = board_from_rows(['', 'oxxxx.'])
+        threats = find_threats(Analysis(b), Player.x)
+        assert [threat.kind for threat in threats] == [ThreatType.four]
+        assert threats[0].gains == threats[0].defences == {Coord(5, 1)}
+
+    def test_four_blocked_by_edge(self):
+        b = board_from_rows(['xxxx.'])
+        assert kinds(b, Player.x) == [(ThreatType.four, Direction.right)]
+
+    def test_broken_four(self):
+        b = board_from_rows(['', '.x.xxx.'])
+        threats = find_threats(Analysis(b), Player.x)
+        assert threats[0].kind is ThreatType.four
+        assert threats[0].gains == {Coord(2, 1)}
+
+    def test_open_three(self):
+        b = board_from_rows(['', '', '..xxx..'])
+        threats = find_threats(Analysis(b), Player.x)
+        assert [threat.kind for threat in threats] == [ThreatType.open_three]
+        assert threats[0].gains == {Coord(1, 2), Coord(5, 2)}
+        assert threats[0].defences == {Coord(0, 2), Coord(1, 2), Coord(5, 2), Coord(6, 2)}
+
+    def test_broken_open_three(self):
+        b = board_from_rows(['', '', '..x.xx..'])
+        threats = find_threats(Analysis(b), Player.x)
+        assert [threat.kind for threat in threats] == [ThreatType.open_three]
+        assert threats[0].gains == {Coord(3, 2)}
+        assert threats[0].defences == {Coord(1, 2), Coord(3, 2), Coord(6, 2)}
+
+    def test_closed_three_is_not_threat(self):
+        b = board_from_rows(['', '', '.oxxx..'])
+        assert kinds(b, Player.x) == []
+
+    def test_vertical_and_diagonal(self):
+        b = board_from_rows(['.o', '.x...x', '.x..x', '.x.x', '.x'])
+        assert kinds(b, Player.x) == [
+            (ThreatType.four, Direction.down),
+            (ThreatType.open_three, Direction.up_right)
+        ]
+
+    def test_strongest_first(self):
+        b = board_from_rows(['', '..xxx..', '', '', '.xxxx.'])
+        assert [kind for kind, _ in kinds(b, Player.x)] == [ThreatType.open_four, ThreatType.open_three]
+
+    def test_opponent_threats(self):
+        b = board_from_rows(['', '..ooo..'])
+        assert kinds(b, Player.x) == []
+        assert kinds(b, Player.o) == [(ThreatType.open_three, Direction.right)]
+
+    def test_repr(self):
+        b = board_from_rows(['xxxxx'])
+        assert repr(find_threats(Analysis(b), Player.x)[0]) == '<five ˟ right: <0:0>,<1:0>,<2:0>,<3:0>,<4:0>>'
+
+    def test_sparse_board(self):
+        b = board_from_rows(['', '..xxx..'], SparseBoard())
+        assert kinds(b, Player.x) == [(ThreatType.open_three, Direction.right)]
+
+
+@pytest.mark.unit
+class TestThreatMoves:
+    def test_winning_moves(self):
+        b = board_from_rows(['', '.xxxx.', '', 'x.xxx'])
+        assert winning_moves(Analysis(b), Player.x) == {Coord(0, 1), Coord(5, 1), Coord(1, 3)}
+
+    def test_four_moves(self):
+        b = board_from_rows(['', 'oxxx..'])
+        assert four_moves(Analysis(b), Player.x) == {Coord(4, 1), Coord(5, 1)}
+
+    def test_three_moves(self):
+        b = board_from_rows(['', '', '...xx...'])
+        assert three_moves(Analysis(b), Player.x) == {Coord(1, 2), Coord(2, 2), Coord(5, 2), Coord(6, 2)}
+
+    def test_windows_cached(self):
+        b = board_from_rows(['', '..xxx..'])
+        a = Analysis(b, LRUCache())
+        assert three_moves(a, Player.x) == three_moves(a, Player.x)
+        assert a.cache.stats['hits'] == 1
+
+
+@pytest.mark.unit
+class TestThreatSearch:
+    def test_completes_five(self):
+        b = board_from_rows(['', '.oxxxx.'])
+        assert ThreatSearch(time_limit=10).find_win(b, Player.x) == Coord(6, 1)
+
+    def test_double_four(self):
+        b = board_from_rows(['', '', '', '', '', '', '', '', 'oxxx', '....x', '....x', '....x', '....o'])
+        search = ThreatSearch(max_depth=1, threes=False, time_limit=10)
+        assert search.find_win(b, Player.x) == Coord(4, 8)
+
+    def test_double_open_three(self):
+        b = board_from_rows(['', '', '', '.....x', '.....x', '...xx'])
+        search = ThreatSearch(threes=False, time_limit=10)
+        assert search.find_win(b, Player.x) is None
+        assert not search.timed_out
+        assert ThreatSearch(time_limit=10).find_win(b, Player.x) == Coord(5, 5)
+
+    def test_four_three(self):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        assert ThreatSearch(time_limit=10).find_win(b, Player.x) == Coord(5, 2)
+
+    def test_continuous_fours(self):
+        b = board_from_rows([
+            '',
+            '.oxxx',
+            '......x',
+            '......x',
+            '......x',
+            '...........',
+            '......o',
+        ])
+        b[Coord(9, 5)] = Player.o
+        search = ThreatSearch(threes=False, time_limit=10)
+        assert search.find_win(b, Player.x) is not None
+        assert search.nodes > 1
+
+    def test_no_win(self):
+        b = board_from_rows(['', '', '...x', '....x', '', '.....ooo', '', '.....x.x'])
+        search = ThreatSearch(time_limit=10)
+        assert search.find_win(b, Player.x) is None
+        assert not search.timed_out
+
+    def test_must_block_opponents_four(self):
+        b = board_from_rows(['', '..xxx..', '', '.oooo'])
+        search = ThreatSearch(time_limit=10)
+        assert search.find_win(b, Player.x) is None
+        assert not search.timed_out
+
+    def test_blocking_move_continues_attack(self):
+        b = board_from_rows(['', '', '', '', '', '', '....o', '....x', '....x', '....x', 'oooo'])
+        search = ThreatSearch(time_limit=10)
+        assert search.find_win(b, Player.x) is None
+        assert not search.timed_out
+        for step in range(1, 4):
+            b[Coord(4 + step, 10 + step)] = Player.x
+        assert ThreatSearch(time_limit=10).find_win(b, Player.x) == Coord(4, 10)
+
+    def test_opponent_has_two_fives(self):
+        b = board_from_rows(['', '.oooo.', '', '..xxx'])
+        search = ThreatSearch(time_limit=10)
+        assert search.find_win(b, Player.x) is None
+        assert not search.timed_out
+
+    def test_depth_limit(self):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        search = ThreatSearch(max_depth=1, time_limit=10)
+        assert search.find_win(b, Player.x) is None
+        assert not search.timed_out
+        assert ThreatSearch(max_depth=2, time_limit=10).find_win(b, Player.x) == Coord(5, 2)
+
+    def test_time_limit(self):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        search = ThreatSearch(time_limit=0)
+        assert search.find_win(b, Player.x) is None
+        assert search.timed_out
+
+    def test_deadline(self):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        search = ThreatSearch(time_limit=10)
+        assert search.find_win(b, Player.x, deadline=time.monotonic()) is None
+        assert search.timed_out
+        assert search.find_win(b, Player.x, deadline=time.monotonic() + 10) == Coord(5, 2)
+
+    def test_deadline_stops_scan_of_the_board(self, monkeypatch):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        clock = count()
+        monkeypatch.setattr(threats, 'time', SimpleNamespace(monotonic=lambda: next(clock)))
+        search = ThreatSearch(time_limit=3)
+        assert search.find_win(b, Player.x) is None
+        assert search.timed_out
+        assert search.nodes == 1
+
+    @pytest.mark.parametrize('scan', [winning_moves, four_moves, three_moves, find_threats])
+    def test_scan_past_deadline(self, scan):
+        b = board_from_rows(['', '..xxxx', '', '', '.....x.x'])
+        with pytest.raises(SearchTimeout):
+            scan(Analysis(b), Player.x, deadline=time.monotonic() - 1)
+        assert scan(Analysis(b), Player.x, deadline=time.monotonic() + 10)
+
+    def test_given_analysis(self):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        analysis = IncrementalAnalysis(b)
+        assert ThreatSearch(time_limit=10).find_win(b, Player.x, analysis=analysis) == Coord(5, 2)
+        b[Coord(5, 2)] = Player.o
+        assert analysis.find_sequences(Player.o) == Analysis(b).find_sequences(Player.o)
+
+    def test_leaves_board_unchanged(self):
+        b = board_from_rows(['', '', '.oxxx', '', '.....x', '.....x'])
+        before = str(b), b.zobrist_hash
+        ThreatSearch(time_limit=10).find_win(b, Player.x)
+        assert (str(b), b.zobrist_hash) == before